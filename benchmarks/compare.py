@@ -0,0 +1,73 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+"""
+Compare two sets of benchmark results (from run_benchmarks.py), e.g., from two versions of prog_models. Prints the change in time and peak memory for each case, and flags regressions (i.e., cases that are slower or use more memory than the baseline by more than the threshold).
+
+Usage:
+    python benchmarks/compare.py baseline.json results.json [--threshold 0.1]
+
+Exits with status 1 if any case regressed.
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare(baseline : dict, results : dict, threshold : float = 0.1) -> list:
+    """
+    Compare benchmark results
+
+    Args:
+        baseline (dict): Baseline results (from run_benchmarks)
+        results (dict): New results (from run_benchmarks)
+        threshold (float): Relative change considered a regression (e.g., 0.1 for 10%)
+
+    Returns:
+        list[tuple]: For each case in both results: (case name, relative change in time, relative change in peak memory, regressed). Changes are None for cases with errors
+    """
+    comparison = []
+    for (name, new) in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]
+        if 'error' in old or 'error' in new:
+            # Only a regression if it used to work
+            comparison.append((name, None, None, 'error' in new and 'error' not in old))
+            continue
+        time_change = new['time']/old['time'] - 1
+        memory_change = new['peak_memory']/old['peak_memory'] - 1 if old['peak_memory'] > 0 else 0
+        comparison.append((name, time_change, memory_change, time_change > threshold or memory_change > threshold))
+    return comparison
+
+
+def main(argv : list = None) -> int:
+    parser = argparse.ArgumentParser(description='Compare prog_models benchmark results')
+    parser.add_argument('baseline', help='Baseline results (json)')
+    parser.add_argument('results', help='New results (json)')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change considered a regression (default: 0.1)')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        results = json.load(f)
+
+    print(f'Baseline: prog_models {baseline["metadata"]["prog_models"]} ({baseline["metadata"]["date"]})')
+    print(f'Results:  prog_models {results["metadata"]["prog_models"]} ({results["metadata"]["date"]})\n')
+    print(f'{"case":<45} {"time":>8} {"memory":>8}')
+    comparison = compare(baseline, results, args.threshold)
+    for (name, time_change, memory_change, regressed) in comparison:
+        flag = ' REGRESSION' if regressed else ''
+        if time_change is None:
+            print(f'{name:<45} {"error":>8} {"":>8}{flag}')
+        else:
+            print(f'{name:<45} {time_change:>+8.1%} {memory_change:>+8.1%}{flag}')
+
+    n_regressed = sum(regressed for (_, _, _, regressed) in comparison)
+    print(f'\n{n_regressed} regression(s)')
+    return 1 if n_regressed > 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,328 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+"""
+Benchmark suite for prog_models. Measures the computational efficiency (steps/sec) and memory use of every built-in model and the main simulation modes, and saves the results as json so they can be compared between versions (see compare.py).
+
+Cases:
+    | <model>/simulate_to: simulate_to with default parameters (i.e., with noise)
+    | <model>/simulate_to/no_noise: simulate_to without process or measurement noise
+    | <model>/simulate_to_threshold: simulate_to_threshold (limited by horizon). Without noise, so thresholds are not met early because of noise
+    | <model>/vectorized: simulate_to with a vectorized state (vectorized models only)
+    | BatteryCircuit/save_freq_<n>: simulate_to saving every n steps
+    | LinearModel/simulate_to_threshold: simulate_to_threshold for a LinearModel
+    | Surrogate/generate and Surrogate/simulate_to: generate and simulate a DMD surrogate model
+    | ThrownObject/estimate_params: parameter estimation
+
+For each case the following are recorded:
+    | time: Median time to run the case (s)
+    | steps: Number of simulation steps in the case (if applicable)
+    | steps_per_sec: steps/time (if applicable)
+    | peak_memory: Peak memory allocated while running the case (bytes, measured using tracemalloc)
+    | result_memory: Memory used by the result of the case (e.g., SimulationResults) (bytes)
+    | result_blocks: Number of memory blocks used by the result of the case
+
+Usage:
+    python benchmarks/run_benchmarks.py [-o results.json] [--quick] [--repeat N] [--filter TEXT]
+"""
+
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime
+import io
+import json
+import numpy as np
+import platform
+import sys
+from time import perf_counter
+import tracemalloc
+import warnings
+
+import prog_models
+from prog_models import LinearModel
+from prog_models.models import BatteryCircuit, BatteryElectroChemEOD, BatteryElectroChemEOL, BatteryElectroChemEODEOL, CentrifugalPumpBase, CentrifugalPumpWithWear, PneumaticValveBase, PneumaticValveWithWear, DCMotor, ESC, Powertrain, ThrownObject
+from prog_models.utils.jit import JIT_AVAILABLE
+
+
+class LinearThrownObject(LinearModel):
+    """
+    Object thrown into the air without air resistance, as a LinearModel (see examples/linear_model.py)
+    """
+    inputs = []
+    states = ['x', 'v']
+    outputs = ['x']
+    events = ['impact']
+
+    A = np.array([[0, 1], [0, 0]])
+    E = np.array([[0], [-9.81]])
+    C = np.array([[1, 0]])
+    F = None
+
+    default_parameters = {
+        'thrower_height': 1.83,
+        'throwing_speed': 40,
+        'g': -9.81
+    }
+
+    def initialize(self, u=None, z=None):
+        return self.StateContainer({
+            'x': self.parameters['thrower_height'],
+            'v': self.parameters['throwing_speed']
+            })
+
+    def threshold_met(self, x):
+        return {
+            'impact': x['x'] <= 0
+        }
+
+    def event_state(self, x):
+        x_max = x['x'] + np.square(x['v'])/(-self.parameters['g']*2)
+        return {
+            'impact': np.maximum(x['x']/x_max, 0) if x['v'] < 0 else 1
+        }
+
+
+# Loading for each model
+def battery_load(m):
+    return lambda t, x=None: m.InputContainer({'i': 2 if t < 600 else 3})
+
+def pump_load(m):
+    return lambda t, x=None: m.InputContainer({'Tamb': 290, 'V': 471.2389, 'pdisch': 928654, 'psuc': 239179, 'wsync': 376.991})
+
+def valve_load(m):
+    def load(t, x=None):
+        open_valve = (t % 20) < 10
+        return m.InputContainer({'pL': 3.5e5, 'pR': 2.0e5, 'uTop': not open_valve, 'uBot': open_valve})
+    return load
+
+def no_load(m):
+    return lambda t, x=None: m.InputContainer({})
+
+# Models: name -> (model class, constructor kwargs, loading, dt, number of steps)
+MODELS = {
+    'BatteryCircuit': (BatteryCircuit, {}, battery_load, 1, 2000),
+    'BatteryElectroChemEOD': (BatteryElectroChemEOD, {}, battery_load, 1, 2000),
+    'BatteryElectroChemEOL': (BatteryElectroChemEOL, {}, battery_load, 1, 2000),
+    'BatteryElectroChemEODEOL': (BatteryElectroChemEODEOL, {}, battery_load, 1, 2000),
+    'CentrifugalPumpBase': (CentrifugalPumpBase, {}, pump_load, 1, 2000),
+    'CentrifugalPumpWithWear': (CentrifugalPumpWithWear, {}, pump_load, 1, 2000),
+    'PneumaticValveBase': (PneumaticValveBase, {}, valve_load, 0.01, 2000),
+    'PneumaticValveWithWear': (PneumaticValveWithWear, {}, valve_load, 0.01, 2000),
+    'DCMotor': (DCMotor, {}, lambda m: (lambda t, x=None: m.InputContainer({'v_a': 0, 'v_b': 10, 'v_c': -10, 't_l': 0})), 2e-5, 2000),
+    'ESC': (ESC, {}, lambda m: (lambda t, x=None: m.InputContainer({'duty': 1, 'theta': 0, 'v': 23})), 2e-5, 2000),
+    'Powertrain': (lambda **kwargs: Powertrain(ESC(), DCMotor(), **kwargs), {}, lambda m: (lambda t, x=None: m.InputContainer({'duty': 1, 'v': 23})), 2e-5, 2000),
+    'ThrownObject': (ThrownObject, {}, no_load, 0.01, 2000),
+}
+
+N_SAMPLES = 100  # Number of samples for vectorized cases
+
+
+def counted(load):
+    """
+    Wrap loading function to count calls (one call per simulation step)
+    """
+    def load_counted(t, x=None):
+        load_counted.calls += 1
+        return load(t, x)
+    load_counted.calls = 0
+    return load_counted
+
+
+def simulation_case(model_class, model_kwargs, load_fcn, method, **config):
+    """
+    Create case simulating the model. The case returns (number of steps, result)
+    """
+    def run():
+        m = model_class(**model_kwargs)
+        load = counted(load_fcn(m))
+        if 'x' in config and callable(config['x']):
+            sim_config = dict(config, x=config['x'](m, load))
+        else:
+            sim_config = config
+        if method == 'simulate_to':
+            result = m.simulate_to(sim_config['horizon'], load, **sim_config)
+        else:
+            result = m.simulate_to_threshold(load, **sim_config)
+        return (load.calls, result)
+    return run
+
+
+def vectorized_x0(m, load):
+    # Initial state with N_SAMPLES samples
+    x0 = m.initialize(load(0))
+    load.calls = 0
+    return m.StateContainer(np.tile(x0.matrix, (1, N_SAMPLES)))
+
+
+def surrogate_cases(scale):
+    batt = BatteryElectroChemEOD(process_noise=0)
+    loads = [
+        lambda t, x=None: batt.InputContainer({'i': 2 if t < 1000 else 4}),
+        lambda t, x=None: batt.InputContainer({'i': 3 if t < 500 else 1.5})]
+    options = {'save_freq': 1, 'dt': 0.1, 'horizon': 3000*scale}
+
+    def generate():
+        with redirect_stdout(io.StringIO()):  # Silence progress messages
+            return (None, batt.generate_surrogate(loads, **options))
+
+    surrogate = []  # Generated once (at warm-up), so it is not included in simulation time
+    def simulate():
+        if not surrogate:
+            surrogate.append(generate()[1])
+        load = counted(loads[0])
+        result = surrogate[0].simulate_to(2000*scale, load, dt=1, save_freq=1)
+        return (load.calls, result)
+
+    return {'Surrogate/generate': generate, 'Surrogate/simulate_to': simulate}
+
+
+def estimate_params_case():
+    times = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+    inputs = [{}]*9
+    outputs = [{'x': 1.83}, {'x': 36.95}, {'x': 62.36}, {'x': 77.81}, {'x': 83.45}, {'x': 79.28}, {'x': 65.3}, {'x': 41.51}, {'x': 7.91}]
+
+    def run():
+        m = ThrownObject(thrower_height=20)
+        m.estimate_params([(times, inputs, outputs)], ['thrower_height', 'throwing_speed'], dt=0.01)
+        return (None, dict(m.parameters))
+    return run
+
+
+def build_cases(quick : bool = False) -> dict:
+    """
+    Build all benchmark cases
+
+    Args:
+        quick (bool): Use fewer steps (for a quick check)
+
+    Returns:
+        dict[str, function]: Benchmark cases. Each case is a function () -> (number of steps, result)
+    """
+    scale = 0.1 if quick else 1
+    cases = {}
+    for (name, (model_class, model_kwargs, load_fcn, dt, n_steps)) in MODELS.items():
+        n_steps = int(n_steps*scale)
+        horizon = n_steps*dt
+        cases[f'{name}/simulate_to'] = simulation_case(model_class, model_kwargs, load_fcn, 'simulate_to', horizon=horizon, dt=dt)
+        cases[f'{name}/simulate_to/no_noise'] = simulation_case(model_class, dict(model_kwargs, process_noise=0, measurement_noise=0), load_fcn, 'simulate_to', horizon=horizon, dt=dt)
+        cases[f'{name}/simulate_to_threshold'] = simulation_case(model_class, dict(model_kwargs, process_noise=0, measurement_noise=0), load_fcn, 'simulate_to_threshold', horizon=horizon, dt=dt)
+        if getattr(model_class, 'is_vectorized', False):
+            cases[f'{name}/vectorized'] = simulation_case(model_class, model_kwargs, load_fcn, 'simulate_to', horizon=horizon, dt=dt, x=vectorized_x0)
+
+    # Save frequency
+    (model_class, model_kwargs, load_fcn, dt, n_steps) = MODELS['BatteryCircuit']
+    n_steps = int(n_steps*scale)
+    for save_every in [1, 10, 100]:
+        cases[f'BatteryCircuit/save_freq_{save_every}'] = simulation_case(model_class, model_kwargs, load_fcn, 'simulate_to', horizon=n_steps*dt, dt=dt, save_freq=save_every*dt)
+
+    cases['LinearModel/simulate_to_threshold'] = simulation_case(LinearThrownObject, {}, no_load, 'simulate_to_threshold', dt=0.001*(10 if quick else 1))
+    cases.update(surrogate_cases(scale))
+    cases['ThrownObject/estimate_params'] = estimate_params_case()
+    return cases
+
+
+def measure(case, repeat : int = 3) -> dict:
+    """
+    Run a single benchmark case
+
+    Args:
+        case (function): Case to run, () -> (number of steps, result)
+        repeat (int): Number of timed runs
+
+    Returns:
+        dict: Measurements
+    """
+    case()  # Warm-up (e.g., imports, compilation)
+
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        (steps, _) = case()
+        times.append(perf_counter() - start)
+    time = float(np.median(times))
+
+    # Memory is measured separately, because tracing slows down execution
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    baseline = tracemalloc.get_traced_memory()[0]
+    (_, result) = case()
+    peak = tracemalloc.get_traced_memory()[1]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+    del result
+
+    return {
+        'time': time,
+        'steps': steps,
+        'steps_per_sec': steps/time if steps else None,
+        'peak_memory': peak - baseline,
+        'result_memory': sum(stat.size_diff for stat in diff),
+        'result_blocks': sum(stat.count_diff for stat in diff)
+    }
+
+
+def metadata() -> dict:
+    return {
+        'prog_models': prog_models.__version__,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': JIT_AVAILABLE,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'date': datetime.now().isoformat(timespec='seconds')
+    }
+
+
+def run_benchmarks(quick : bool = False, repeat : int = 3, filter : str = None, verbose : bool = True) -> dict:
+    """
+    Run the benchmark suite
+
+    Args:
+        quick (bool): Use fewer steps (for a quick check)
+        repeat (int): Number of timed runs for each case
+        filter (str): Only run cases with this text in their name
+        verbose (bool): Print results as they are run
+
+    Returns:
+        dict: Results, of the form {'metadata': {...}, 'results': {case name: measurements}}. Cases that raise an exception are recorded as {'error': message}
+    """
+    results = {}
+    for (name, case) in build_cases(quick).items():
+        if filter is not None and filter not in name:
+            continue
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                results[name] = measure(case, repeat)
+        except Exception as e:
+            results[name] = {'error': f'{type(e).__name__}: {e}'}
+        if verbose:
+            print(format_result(name, results[name]), flush=True)
+    return {'metadata': metadata(), 'results': results}
+
+
+def format_result(name : str, result : dict) -> str:
+    if 'error' in result:
+        return f'{name:<45} ERROR {result["error"]}'
+    steps_per_sec = '' if result['steps_per_sec'] is None else f'{result["steps_per_sec"]:>12.0f} steps/s'
+    return f'{name:<45} {result["time"]*1e3:>10.2f} ms {steps_per_sec:>20} {result["peak_memory"]/1024:>10.0f} KiB peak'
+
+
+def main(argv : list = None):
+    parser = argparse.ArgumentParser(description='Run prog_models benchmarks')
+    parser.add_argument('-o', '--output', help='File to save results (json)')
+    parser.add_argument('--quick', action='store_true', help='Use fewer steps')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs for each case')
+    parser.add_argument('--filter', help='Only run cases with this text in their name')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.quick, args.repeat, args.filter)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResults saved to {args.output}')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -2,30 +2,42 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 """
-Example benchmarking the computational efficiency of models. 
+Example benchmarking the computational efficiency of models. For the full benchmark suite (every model and simulation mode), see benchmarks/run_benchmarks.py
 """
 
 from timeit import timeit
 from prog_models.models import BatteryCircuit
+from prog_models.utils.jit import JIT_AVAILABLE
 
 def run_example():
     # Step 1: Create a model object
     batt = BatteryCircuit()
-    
-    # Step 2: Define future loading function 
+
+    # Step 2: Define future loading function
     def future_loading(t, x=None):
         # Constant Loading
         return batt.InputContainer({'i': 2})
 
     # Step 3: Benchmark simulation of 600 seconds
     print('Benchmarking...')
-    def sim():  
+    def sim():
         results = batt.simulate_to(600, future_loading)
     time = timeit(sim, number=500)
 
     # Print results
     print('Simulation Time: {} ms/sim'.format(time*2))
 
-# This allows the module to be executed directly 
+    # Step 4: Compare steps/sec with and without kernels for the model equations
+    # The kernels are compiled if numba is installed (see prog_models.utils.jit). Without numba, the python implementation is used by default
+    print('\nNumba installed: {}'.format(JIT_AVAILABLE))
+    n_steps = 600  # simulate_to(600) with default dt of 1
+    for use_jit in [False, True]:
+        batt.use_jit = use_jit
+        sim()  # First run (e.g., for compilation)
+        time = timeit(sim, number=100)
+        print('Steps/sec (use_jit={}): {:.0f}'.format(use_jit, n_steps*100/time))
+    batt.use_jit = JIT_AVAILABLE
+
+# This allows the module to be executed directly
 if __name__=='__main__':
     run_example()
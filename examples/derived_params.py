@@ -40,6 +40,13 @@ def run_example():
     print("\nUpdated Settings:\n\tthrower_height: {}\n\tthowing_speed: {}".format(obj.parameters['thrower_height'], obj.parameters['throwing_speed']))
     print("Notice how speed changed automatically with height")
 
+    # Step 4 (optional): Change several parameters at once
+    # Within batch_update, callbacks are run once at the end (instead of after every change), in order of their dependencies
+    with obj.parameters.batch_update():
+        obj.parameters['thrower_height'] = 1.9
+        obj.parameters['g'] = -9.8
+    print("\nUpdated Settings:\n\tthrower_height: {}\n\tthowing_speed: {}".format(obj.parameters['thrower_height'], obj.parameters['throwing_speed']))
+
 
 # This allows the module to be executed directly 
 if __name__ == '__main__':
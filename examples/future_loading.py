@@ -167,6 +167,24 @@ def run_example():
 
     # In this example future_loading.t has to be updated with current time before each prediction.
 
+    # Example 6: Loading profiles
+    # Loading that depends only on time (like examples 1, 3, and 4) can be defined using the loading profiles in prog_models.loading
+    # Simulations with a fixed step size calculate loading profiles for many steps at once, which is more efficient than calling a function each step
+    from prog_models.loading import PiecewiseConstant, GaussianNoise
+
+    # Same loading as Example 1: i is 2 until t=600, 1 until t=900, etc.
+    future_loading = PiecewiseConstant(m.InputContainer, [600, 900, 1800, 3000], {'i': [2, 1, 4, 2, 3]})
+
+    # Same loading as Example 3: gaussian noise with a standard deviation of 0.2 (see GaussianNoise for increasing standard deviation, like Example 4)
+    future_loading = GaussianNoise(future_loading, 0.2)
+
+    # Simulate to threshold
+    simulated_results = m.simulate_to_threshold(future_loading, **options)
+
+    # Now lets plot the inputs and event_states
+    simulated_results.inputs.plot(ylabel = 'Loading Profile Current (amps)')
+    simulated_results.event_states.plot(ylabel = 'Loading Profile Event State')
+
     # Show plots
     import matplotlib.pyplot as plt
     plt.show()
@@ -48,5 +48,21 @@ def run_example():
     
     # Sure enough- parameter estimation determined that the thrower's height wasn't 20 m, instead was closer to 1.9m, a much more reasonable height!
 
+    # Step 5 (optional): Search within bounds, with a global (population-based) optimizer
+    # Candidates are evaluated in parallel (here, 2 worker processes). The result can be used to warm start later estimation (e.g., with new data)
+    m = ThrownObject(thrower_height=20)
+    result = m.estimate_params([(times, inputs, outputs)], keys, dt=0.01, method='differential_evolution', bounds={'thrower_height': (0, 4), 'throwing_speed': (20, 60)}, workers=2)
+    print('\nOptimized configuration (differential evolution)')
+    for key in keys:
+        print("-", key, m.parameters[key])
+    # e.g., m.estimate_params(new_runs, keys, dt=0.01, warm_start=result)
+
+    # Step 6 (optional): Use a gradient-based optimizer. jac='batch' calculates the error and its gradient together, in one vectorized simulation
+    m = ThrownObject(thrower_height=20)
+    result = m.estimate_params([(times, inputs, outputs)], keys, dt=0.01, method='L-BFGS-B', jac='batch')
+    print('\nOptimized configuration (L-BFGS-B, {} evaluations)'.format(result.nfev))
+    for key in keys:
+        print("-", key, m.parameters[key])
+
 if __name__=='__main__':
     run_example()
@@ -9,25 +9,29 @@ Example performing a sensitivity analysis on a new model.
 from prog_models.models.thrown_object import ThrownObject
 import numpy as np
 
-def run_example():
-    # Demo model
-    # Step 1: Create instance of model
-    m = ThrownObject()
+# Demo model
+# Step 1: Create instance of model
+# Note: Model and load are defined at the module level so the load can be sent to worker processes (see step 4)
+m = ThrownObject()
+
+# Step 2: Setup for simulation
+def future_load(t, x=None):
+    return m.InputContainer({})  # No load for thrown objects
 
-    # Step 2: Setup for simulation 
-    def future_load(t, x=None):
-        return m.InputContainer({})
+# Number of worker processes- a few are enough for these small simulations
+MAX_WORKERS = 4
 
+def run_example():
     # Step 3: Setup range on parameters considered
     thrower_height_range = np.arange(1.2, 2.1, 0.1)
 
     # Step 4: Sim for each 
+    # Each simulation is independent, so they are distributed across processes using simulate_many
+    # Each job is a tuple of (future_load, parameter_overrides)
     event = 'impact'
-    eods = np.empty(len(thrower_height_range))
-    for (i, thrower_height) in zip(range(len(thrower_height_range)), thrower_height_range):
-        m.parameters['thrower_height'] = thrower_height
-        simulated_results = m.simulate_to_threshold(future_load, threshold_keys=[event], dt =1e-3, save_freq =10)
-        eods[i] = simulated_results.times[-1]
+    jobs = [(future_load, {'thrower_height': thrower_height}) for thrower_height in thrower_height_range]
+    results = m.simulate_many(jobs, max_workers=MAX_WORKERS, threshold_keys=[event], dt =1e-3, save_freq =10)
+    eods = np.array([simulated_results.times[-1] for simulated_results in results])
 
     # Step 5: Analysis
     print('For a reasonable range of heights, impact time is between {} and {}'.format(round(eods[0],3), round(eods[-1],3)))
@@ -37,11 +41,9 @@ def run_example():
 
     # Now lets repeat for throw speed
     throw_speed_range = np.arange(20, 40, 1)
-    eods = np.empty(len(throw_speed_range))
-    for (i, throw_speed) in zip(range(len(throw_speed_range)), throw_speed_range):
-        m.parameters['throwing_speed'] = throw_speed
-        simulated_results = m.simulate_to_threshold(future_load, threshold_keys=[event], options={'dt':1e-3, 'save_freq':10})
-        eods[i] = simulated_results.times[-1]
+    jobs = [(future_load, {'throwing_speed': throw_speed}) for throw_speed in throw_speed_range]
+    results = m.simulate_many(jobs, max_workers=MAX_WORKERS, threshold_keys=[event], dt =1e-3, save_freq =10)
+    eods = np.array([simulated_results.times[-1] for simulated_results in results])
 
     print('\nFor a reasonable range of throwing speeds, impact time is between {} and {}'.format(round(eods[0],3), round(eods[-1],3)))
     sensitivity = (eods[-1]-eods[0])/(throw_speed_range[-1] - throw_speed_range[0])
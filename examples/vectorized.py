@@ -31,6 +31,12 @@ def run_example():
 
     simulated_results = m.simulate_to_threshold(future_load, x = first_state, thresholds_met_eqn=thresholds_met_eqn, print = True, dt=0.1, save_freq=2)
 
+    # Step 4: Batch simulation
+    # Alternately, each thrower can be simulated until their own impact. Samples that have impacted stop being simulated while the rest continue
+    (times_of_event, results) = m.batch_simulate_to_threshold(future_load, x = first_state, threshold_keys=['impact'], dt=0.1, save_freq=2)
+    for i, (toe, result) in enumerate(zip(times_of_event, results)):
+        print('Thrower {} impacted at {:.1f}s (final state: {})'.format(i+1, toe, result.states[-1]))
+
 # This allows the module to be executed directly 
 if __name__=='__main__':
     run_example()
@@ -0,0 +1,209 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
+
+# On-disk cache of downloaded datasets, shared by the dataset modules
+# Layout: <cache dir>/<dataset>/<hash of url>/
+#   source.zip, source.zip.sha256: Downloaded file and its hash
+#   parsed/<name>.json, parsed/<name>.<array>.npy: Parsed data (loaded memory-mapped). The json file is written last, so parsed data is only used if complete
+#   parsed/<name>.npy: Single parsed array (see save_array), e.g., data for one run, saved when it is first decoded
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+import zipfile
+
+import numpy as np
+
+CACHE_DIR_ENV = 'PROG_MODELS_CACHE_DIR'
+_DEFAULT = object()
+_cache_dir = _DEFAULT
+_CONNECTION_ERROR_MESSAGE = "Data download failed. This may be because of issues with your internet connection or the datasets may have moved. Please check your internet connection and make sure you're using the latest version of prog_models. If the problem persists, please submit an issue on the prog_models issue page (https://github.com/nasa/prog_models/issues) for further investigation."
+
+
+def set_cache_dir(path : Optional[str]) -> None:
+    """
+    Set the directory where downloaded and parsed datasets are cached. Once cached, datasets are loaded from disk (without internet access) in later sessions
+
+    The default is the environment variable PROG_MODELS_CACHE_DIR if set, otherwise ~/.cache/prog_models
+
+    Args:
+        path (str or None): Cache directory. None disables the on-disk cache (downloads are only cached in memory)
+    """
+    global _cache_dir
+    _cache_dir = path
+
+
+def get_cache_dir() -> Optional[str]:
+    """
+    Get the directory where downloaded and parsed datasets are cached (see set_cache_dir)
+
+    Returns:
+        str or None: Cache directory, or None if the on-disk cache is disabled
+    """
+    if _cache_dir is not _DEFAULT:
+        return _cache_dir
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    return os.path.join(os.path.expanduser('~'), '.cache', 'prog_models')
+
+
+def _source_dir(dataset : str, url : str) -> Optional[str]:
+    # Cache directory for data downloaded from url, or None if disabled
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, dataset, hashlib.sha256(url.encode()).hexdigest()[:16])
+
+
+def _sha256(f) -> str:
+    h = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1 << 20), b''):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_atomic(path : str, write) -> None:
+    # Write file using write(f), so the file only exists once complete
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    (fd, tmp) = tempfile.mkstemp(dir = os.path.dirname(path), suffix = '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _download(url : str) -> bytes:
+    # Download url. Local files can be used as file:// urls (e.g., a copy of the dataset)
+    if urlparse(url).scheme == 'file':
+        try:
+            with open(url2pathname(urlparse(url).path), 'rb') as f:
+                return f.read()
+        except OSError:
+            raise ConnectionRefusedError(_CONNECTION_ERROR_MESSAGE)
+
+    import requests
+    try:
+        response = requests.get(url, allow_redirects=True)
+        response.raise_for_status()
+    except requests.exceptions.RequestException: # handle chain of errors
+        raise ConnectionRefusedError(_CONNECTION_ERROR_MESSAGE)
+    return response.content
+
+
+def fetch(dataset : str, url : str) -> zipfile.ZipFile:
+    """
+    Open the zip file at url, from the on-disk cache if available (after verifying its hash). Otherwise the file is downloaded (and cached, replacing any parsed data)
+
+    Raises:
+        ConnectionRefusedError: Download failed, or the downloaded file is not a zip file
+    """
+    source_dir = _source_dir(dataset, url)
+    if source_dir is not None:
+        path = os.path.join(source_dir, 'source.zip')
+        try:
+            with open(path + '.sha256', 'r') as f:
+                digest = f.read().strip()
+            with open(path, 'rb') as f:
+                if _sha256(f) == digest:
+                    return zipfile.ZipFile(path)
+        except OSError:
+            pass  # Not cached
+
+    content = _download(url)
+    if not zipfile.is_zipfile(io.BytesIO(content)):
+        raise ConnectionRefusedError(_CONNECTION_ERROR_MESSAGE)
+
+    if source_dir is not None:
+        try:
+            # Parsed data is from the previous download
+            shutil.rmtree(os.path.join(source_dir, 'parsed'), ignore_errors = True)
+            _write_atomic(path, lambda f: f.write(content))
+            _write_atomic(path + '.sha256', lambda f: f.write(hashlib.sha256(content).hexdigest().encode()))
+            return zipfile.ZipFile(path)
+        except OSError:
+            pass  # Cache directory not writable- only cached in memory
+    return zipfile.ZipFile(io.BytesIO(content))
+
+
+def load_parsed(dataset : str, url : str, name : str) -> Optional[tuple]:
+    """
+    Load parsed data saved with save_parsed
+
+    Returns:
+        tuple[dict, dict[str, np.ndarray]] or None: Metadata and arrays (memory-mapped), or None if not cached
+    """
+    source_dir = _source_dir(dataset, url)
+    if source_dir is None:
+        return None
+    path = os.path.join(source_dir, 'parsed', name)
+    try:
+        with open(path + '.json', 'r') as f:
+            meta = json.load(f)
+        arrays = {key: np.load('{}.{}.npy'.format(path, key), mmap_mode = 'r') for key in meta['arrays']}
+    except (OSError, ValueError, KeyError):
+        return None
+    return (meta['meta'], arrays)
+
+
+def save_parsed(dataset : str, url : str, name : str, meta : dict, arrays : dict) -> None:
+    """
+    Save parsed data (metadata and arrays) to the on-disk cache, if enabled. Failures to write are ignored
+    """
+    source_dir = _source_dir(dataset, url)
+    if source_dir is None:
+        return
+    path = os.path.join(source_dir, 'parsed', name)
+    try:
+        for (key, array) in arrays.items():
+            _write_atomic('{}.{}.npy'.format(path, key), lambda f: np.save(f, np.ascontiguousarray(array)))
+        content = json.dumps({'meta': meta, 'arrays': list(arrays.keys())}).encode()
+        _write_atomic(path + '.json', lambda f: f.write(content))
+    except OSError:
+        pass
+
+
+def load_array(dataset : str, url : str, name : str) -> Optional[np.ndarray]:
+    """
+    Load array saved with save_array
+
+    Returns:
+        np.ndarray or None: Array (memory-mapped), or None if not cached
+    """
+    source_dir = _source_dir(dataset, url)
+    if source_dir is None:
+        return None
+    try:
+        return np.load(os.path.join(source_dir, 'parsed', name + '.npy'), mmap_mode = 'r')
+    except (OSError, ValueError):
+        return None
+
+
+def save_array(dataset : str, url : str, name : str, array : np.ndarray) -> None:
+    """
+    Save a single parsed array to the on-disk cache, if enabled. Failures to write are ignored
+    """
+    source_dir = _source_dir(dataset, url)
+    if source_dir is None:
+        return
+    try:
+        _write_atomic(os.path.join(source_dir, 'parsed', name + '.npy'), lambda f: np.save(f, np.ascontiguousarray(array)))
+    except OSError:
+        pass
+
+
+def clear(dataset : str) -> None:
+    """
+    Remove the dataset from the on-disk cache
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is not None:
+        shutil.rmtree(os.path.join(cache_dir, dataset), ignore_errors = True)
@@ -1,11 +1,10 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
-import io
-import requests
 import numpy as np
 import pandas as pd
 from scipy.io import loadmat
-import zipfile
+
+from . import _cache
 
 # Map of battery to url for data
 urls = {
@@ -40,7 +39,9 @@ urls = {
 }
 
 cache = {}  # Cache for downloaded data
-# Cache is used to prevent files from being downloaded twice
+# Cache is used to prevent files from being downloaded twice. Downloaded and parsed data is also cached on disk (see prog_models.datasets.set_cache_dir)
+
+COLUMNS = ('relativeTime', 'current', 'voltage', 'temperature')
 
 def load_data(batt_id : str) -> tuple:
     """Loads data for one or more batteries from NASA's PCoE Dataset, '11. Randomized Battery Usage Data Set'
@@ -57,12 +58,41 @@ def load_data(batt_id : str) -> tuple:
 
     Raises:
         ValueError: Battery id must be a string or int
-        ConnectionError: Failed to download data. This may be because of issues with your internet connection or the datasets may have moved. Please check your internet connection and make sure you're using the latest version of prog_models.
+        ConnectionRefusedError: Failed to download data. This may be because of issues with your internet connection or the datasets may have moved. Please check your internet connection and make sure you're using the latest version of prog_models.
 
     Note:
         Due to the NASA web modernization effort the dataset may be moved to a different URL. If that happens, this feature will break and the user will get a connection error. When/if that happens, we will quickly release an updated version with the new dataset URL. Update to the latest version.
     
         In all other instances of connection error or failed downloading, please submit an issue on the repository page (https://github.com/nasa/prog_models/issues) for our team to look into.
+
+        Downloaded and parsed data are cached on disk (see :py:func:`prog_models.datasets.set_cache_dir`), so later loads (including in new sessions) do not require an internet connection.
+
+        To load only some runs, or decode runs as they are used, see :py:func:`load_runs`
+    """
+    runs = load_runs(batt_id)
+    return runs.desc, list(runs)
+
+def load_runs(batt_id : str, run_type : str = None, desc : str = None) -> "BatteryRuns":
+    """Loads data for a battery from NASA's PCoE Dataset, '11. Randomized Battery Usage Data Set' (see load_data), where runs are parsed on demand. Use this instead of load_data when only some runs are needed (e.g., only reference discharges)
+
+    Only the description of the runs is parsed when loading. The data of each run is decoded when it is first accessed, and then saved to the on-disk cache (if enabled), so runs that are not used (e.g., excluded by run_type or desc) are never decoded
+
+    Args:
+        batt_id (str): Battery name from dataset (RW1-28)
+        run_type (str, optional): Only include runs of this type (e.g., 'D' for discharge), from the run description
+        desc (str, optional): Only include runs with this description (e.g., 'reference discharge')
+
+    Returns:
+        BatteryRuns: Runs of the battery
+
+    Raises:
+        ValueError: Battery id must be a string or int
+        ConnectionRefusedError: Failed to download data (see load_data)
+
+    Example:
+        | runs = nasa_battery.load_runs('RW1', desc = 'reference discharge')
+        | for run in runs:
+        |     print(run['voltage'].min())
     """
     if isinstance(batt_id, int):
         # Convert to string
@@ -75,17 +105,85 @@ def load_data(batt_id : str) -> tuple:
 
     url = urls[batt_id]
 
-    if url not in cache:
-        # Download data
-        try:
-            response = requests.get(url, allow_redirects=True)
-        except requests.exceptions.RequestException as e: # handle chain of errors
-            raise ConnectionRefusedError("Data download failed. This may be because of issues with your internet connection or the datasets may have moved. Please check your internet connection and make sure you're using the latest version of prog_models. If the problem persists, please submit an issue on the prog_models issue page (https://github.com/nasa/prog_models/issues) for further investigation.")
+    parsed = _cache.load_parsed('nasa_battery', url, batt_id)
+    if parsed is None:
+        (battery_desc, step) = _parse(_fetch(url), batt_id)
+        _cache.save_parsed('nasa_battery', url, batt_id, {'desc': battery_desc}, {})
+    else:
+        battery_desc = parsed[0]['desc']
+        step = None
+    steps = [step]  # Matlab structure of the runs- only parsed (again) if a run that is not cached on disk is used
+
+    def run_array(i : int) -> np.ndarray:
+        # Data for run i: from the on-disk cache (memory-mapped), otherwise decoded and saved to the on-disk cache
+        name = '{}/run{}'.format(batt_id, i)
+        data = _cache.load_array('nasa_battery', url, name)
+        if data is None:
+            if steps[0] is None:
+                steps[0] = _parse(_fetch(url), batt_id)[1]
+            data = _run_array(steps[0], i)
+            _cache.save_array('nasa_battery', url, name, data)
+        return data
+    runs = BatteryRuns(battery_desc, run_array)
+
+    if run_type is not None or desc is not None:
+        runs = runs.filter(run_type, desc)
+    return runs
+
+class BatteryRuns():
+    """
+    Runs of a battery from the nasa_battery dataset, where the data for each run is only decoded into a pandas DataFrame when accessed. Returned by :py:func:`load_runs`
 
-        # Unzip response
-        cache[url] = zipfile.ZipFile(io.BytesIO(response.content))
+    Runs are accessed by index (runs[i]), or iterated over (for run in runs), without holding every run in memory
 
-    f = cache[url].open(f'{cache[url].infolist()[0].filename}Matlab/{batt_id}.mat')
+    Attributes:
+        desc (dict): Description of the battery, where desc['runs'] is the description of the runs included (see load_data)
+        indices (list[int]): Index of each run among all the runs of the battery
+    """
+    def __init__(self, desc : dict, run_array, indices : list = None):
+        if indices is None:
+            indices = list(range(len(desc['runs'])))
+        self._run_array = run_array
+        self.indices = indices
+        all_runs = desc['runs']
+        self.desc = dict(desc)
+        self.desc['runs'] = [all_runs[i] for i in indices]
+        self._all_runs = all_runs
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, i : int) -> pd.DataFrame:
+        return pd.DataFrame(np.array(self._run_array(self.indices[i])), columns = COLUMNS)
+
+    def __iter__(self):
+        for i in range(len(self.indices)):
+            yield self[i]
+
+    def filter(self, run_type : str = None, desc : str = None) -> "BatteryRuns":
+        """
+        Select runs by their description. The data of the runs is not decoded
+
+        Args:
+            run_type (str, optional): Only include runs of this type (e.g., 'D' for discharge)
+            desc (str, optional): Only include runs with this description (e.g., 'reference discharge')
+
+        Returns:
+            BatteryRuns: Selected runs
+        """
+        indices = [i for i in self.indices
+            if (run_type is None or self._all_runs[i]['type'] == run_type) and (desc is None or self._all_runs[i]['desc'] == desc)]
+        return BatteryRuns(dict(self.desc, runs = self._all_runs), self._run_array, indices)
+
+def _fetch(url : str):
+    # Downloaded zip file (cached in memory, and on disk, see _cache.fetch)
+    if url not in cache:
+        cache[url] = _cache.fetch('nasa_battery', url)
+    return cache[url]
+
+def _parse(zip_file, batt_id : str) -> tuple:
+    # Parse data for battery from zip file. Returns (description, step), where step is the matlab structure of the runs (see _run_array)
+    f = zip_file.open(f'{zip_file.infolist()[0].filename}Matlab/{batt_id}.mat')
 
     # Load matlab file
     result = loadmat(f)['data']
@@ -104,17 +202,20 @@ def load_data(batt_id : str) -> tuple:
         ]
     }
 
-    result = result['step'][0,0]
-    result = [
-        pd.DataFrame(np.array([
-            result[key][0, i][0] for key in ('relativeTime', 'current', 'voltage', 'temperature')
-        ], np.float64).T, columns = ('relativeTime', 'current', 'voltage', 'temperature')) for i in range(result.shape[1])
-    ]
-    for r in result:
-        r.set_index('relativeTime')
+    return desc, result['step'][0,0]
 
-    return desc, result
+def _run_array(step, i : int) -> np.ndarray:
+    # Data for run i (n x 4), with COLUMNS
+    return np.array([
+        step[key][0, i][0] for key in COLUMNS
+    ], np.float64).T
 
-def clear_cache() -> None:
-    """Clears the cache of downloaded data"""
+def clear_cache(disk : bool = False) -> None:
+    """Clears the cache of downloaded data
+
+    Args:
+        disk (bool, optional): If True, also remove downloaded and parsed data from the on-disk cache. Default is False
+    """
     cache.clear()
+    if disk:
+        _cache.clear('nasa_battery')
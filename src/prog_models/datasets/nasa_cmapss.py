@@ -1,13 +1,13 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
-import io
 import numpy as np
 import pandas as pd
-import requests
-import zipfile
 
-cache = None
+from . import _cache
+
+cache = None  # Cache for downloaded data. Downloaded and parsed data is also cached on disk (see prog_models.datasets.set_cache_dir)
 URL = "https://ti.arc.nasa.gov/c/6/"
+COLUMNS = ['unit', 'cycle', 'setting1', 'setting2', 'setting3'] + [f'sensor{i}' for i in range(1,22)]
 
 
 def load_data(dataset_id : int) -> tuple:
@@ -75,44 +75,132 @@ def load_data(dataset_id : int) -> tuple:
         Due to the NASA web modernization effort the dataset may be moved to a different URL. If that happens, this feature will break and the user will get a connection error. When/if that happens, we will quickly release an updated version with the new dataset URL. Update to the latest version.
 
         In all other instances of connection error or failed downloading, please submit an issue on the repository page (https://github.com/nasa/prog_models/issues) for our team to look into.
+
+        Downloaded and parsed data are cached on disk (see :py:func:`prog_models.datasets.set_cache_dir`), so later loads (including in new sessions) do not require an internet connection.
+    """
+    arrays = _load_arrays(dataset_id)
+    test = pd.DataFrame(np.array(arrays['test']), columns=COLUMNS)
+    train = pd.DataFrame(np.array(arrays['train']), columns=COLUMNS)
+    rul = np.array(arrays['rul'])
+
+    # Return results 
+    return (test, train, rul)
+
+def load_trajectories(dataset_id : int) -> tuple:
+    """
+    Loads the testing and training data of a CMAPSS data set from NASA's PCoE Dataset (see load_data) as the trajectories of every unit, indexed by unit. The trajectory of a unit is a slice of the data (without copying), and units can be iterated over (e.g., in training loops)
+
+    Args:
+        dataset_id (int): Dataset id
+
+    Returns:
+        tuple[UnitTrajectories, UnitTrajectories, np.array]: Tuple of data: testing data, training data, time of end of life (same order as load_data)
+
+    Raises:
+        ValueError: Data not in dataset (should be 1-4)
+        ConnectionError: Failed to download data (see load_data)
+
+    Example:
+        | (test, train, rul) = nasa_cmapss.load_trajectories(1)
+        | x = train[5]  # Trajectory of unit 5 (cycles x 26)
+        | for (unit, x) in train:
+        |     ...
+    """
+    arrays = _load_arrays(dataset_id)
+    return (
+        UnitTrajectories(arrays['test'], arrays['test_units']),
+        UnitTrajectories(arrays['train'], arrays['train_units']),
+        np.array(arrays['rul']))
+
+class UnitTrajectories():
+    """
+    Trajectories of the units in a CMAPSS data subset (train or test). Returned by :py:func:`load_trajectories`
+
+    The trajectory of a unit is data[start:end] (rows for each cycle of the unit, with columns COLUMNS), where the start and end of each unit are calculated once when the data is parsed
+
+    Attributes:
+        data (np.ndarray): Data for every unit (rows x 26), with columns COLUMNS
+        units (list[int]): Unit numbers, in order
     """
+    def __init__(self, data : np.ndarray, index : np.ndarray):
+        self.data = data
+        self.units = [int(unit) for unit in index[:, 0]]
+        self._slices = {int(unit): slice(int(start), int(end)) for (unit, start, end) in index}
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def __getitem__(self, unit : int) -> np.ndarray:
+        return self.data[self._slices[unit]]
+
+    def __iter__(self):
+        # (unit, trajectory) for each unit
+        for unit in self.units:
+            yield (unit, self.data[self._slices[unit]])
+
+    def bounds(self, unit : int) -> tuple:
+        """
+        Rows of the data for the unit
+
+        Returns:
+            tuple[int, int]: (start, end), such that the trajectory is data[start:end]
+        """
+        return (self._slices[unit].start, self._slices[unit].stop)
+
+    def to_dataframe(self, unit : int = None) -> pd.DataFrame:
+        """
+        Trajectory of the unit (or every unit, if None) as a DataFrame (same format as load_data)
+        """
+        data = self.data if unit is None else self[unit]
+        return pd.DataFrame(np.array(data), columns=COLUMNS)
+
+def _load_arrays(dataset_id : int) -> dict:
+    # Load arrays for dataset (test, train, rul, and unit index of test and train), from the disk cache if available
     global cache
 
     if dataset_id not in range(1, 5):
         raise ValueError(f"Invalid dataset id {dataset_id}")
 
     dataset_id = f"FD0{dataset_id:02d}"
-    if cache is None:
-        # Download data
-        try:
-            response = requests.get(URL, allow_redirects=True)
-        except requests.exceptions.RequestException as e: # handle chain of errors
-            raise ConnectionError("Data download failed. This may be because of issues with your internet connection or the datasets may have moved. Please check your internet connection and make sure you're using the latest version of prog_models. If the problem persists, please submit an issue on the prog_models issue page (https://github.com/nasa/prog_models/issues) for further investigation.")
-
-        # Unzip response
-        cache = zipfile.ZipFile(io.BytesIO(response.content))
-
-    # Read Files
-    with cache.open(f'test_{dataset_id}.txt', mode='r') as f:
-        with io.BufferedReader(f) as f2:
-            test = np.loadtxt(f2)
-            test = pd.DataFrame(test, columns=['unit', 'cycle', 'setting1', 'setting2', 'setting3'] + [f'sensor{i}' for i in range(1,22)])
-
-    with cache.open(f'train_{dataset_id}.txt', mode='r') as f:
-        with io.BufferedReader(f) as f2:
-            train = np.loadtxt(f2)
-            train = pd.DataFrame(train, columns=['unit', 'cycle', 'setting1', 'setting2', 'setting3'] + [f'sensor{i}' for i in range(1,22)])
-
-    with cache.open(f'RUL_{dataset_id}.txt', mode='r') as f:
-        with io.BufferedReader(f) as f2:
-            rul = np.loadtxt(f2)
-
-    # Return results 
-    return (test, train, rul)
-
-def clear_cache() -> None:
+    parsed = _cache.load_parsed('nasa_cmapss', URL, dataset_id)
+    if parsed is None:
+        if cache is None:
+            # Download data (or load from disk cache)
+            cache = _cache.fetch('nasa_cmapss', URL)
+        arrays = _parse(cache, dataset_id)
+        _cache.save_parsed('nasa_cmapss', URL, dataset_id, {}, arrays)
+    else:
+        arrays = parsed[1]
+    return arrays
+
+def _parse(zip_file, dataset_id : str) -> dict:
+    # Parse files for dataset from zip file. Returns arrays (test, train, rul), and the unit index of test and train (see _unit_index)
+    arrays = {}
+    for (key, name) in (('test', 'test'), ('train', 'train'), ('rul', 'RUL')):
+        with zip_file.open(f'{name}_{dataset_id}.txt', mode='r') as f:
+            # Files are whitespace separated numbers (C parser, with trailing whitespace ignored)
+            arrays[key] = pd.read_csv(f, sep=r'\s+', header=None, dtype=np.float64).to_numpy()
+    arrays['rul'] = arrays['rul'].reshape(-1)
+    for key in ('test', 'train'):
+        arrays[key + '_units'] = _unit_index(arrays[key])
+    return arrays
+
+def _unit_index(data : np.ndarray) -> np.ndarray:
+    # Rows of each unit, as array of (unit, start, end). Rows of each unit are contiguous
+    if len(data) == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(data[:, 0])) + 1))
+    ends = np.append(starts[1:], len(data))
+    return np.column_stack((data[starts, 0].astype(np.int64), starts, ends))
+
+def clear_cache(disk : bool = False) -> None:
     """
     Clears the cache of downloaded data
+
+    Args:
+        disk (bool, optional): If True, also remove downloaded and parsed data from the on-disk cache. Default is False
     """
     global cache
     cache = None
+    if disk:
+        _cache.clear('nasa_cmapss')
@@ -23,3 +23,9 @@ class ProgModelStateLimitWarning(Warning):
     """
     Prognostics State Limit Warning - indicates the model state was outside the limits, and was adjusted
     """
+
+
+class ProgModelIntegrationWarning(Warning):
+    """
+    Prognostics Integration Warning - indicates the integration method could not meet the requested tolerance for a step
+    """
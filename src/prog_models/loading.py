@@ -0,0 +1,265 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+from abc import ABC, abstractmethod
+from typing import Callable, Union
+import numpy as np
+
+from .exceptions import ProgModelInputException
+
+
+class LoadingProfile(ABC):
+    """
+    Future loading equation that is a function of time only (i.e., does not depend on state). A loading profile can be used as the future_loading_eqn in simulation (i.e., called as profile(t, x=None)).
+
+    Because the load does not depend on state, simulations with a fixed step size (dt) evaluate the profile for chunks of upcoming steps at once (see :py:meth:`evaluate`), instead of once per step.
+
+    Args:
+        container (type): Input container of the model (i.e., model.InputContainer)
+
+    Example:
+        | m = BatteryCircuit()
+        | future_loading = PiecewiseConstant(m.InputContainer, [600, 900], {'i': [2, 1, 4]})
+        | results = m.simulate_to_threshold(future_loading, dt = 2)
+    """
+    def __init__(self, container : type):
+        self.container = container
+        self.keys = list(container._keys)
+
+    @abstractmethod
+    def evaluate(self, times : np.ndarray) -> np.ndarray:
+        """
+        Calculate the load at many times at once
+
+        Args:
+            times (np.ndarray): Times at which to calculate the load
+
+        Returns:
+            np.ndarray: Load matrix (n_inputs x len(times)), with rows in the order of the input container keys
+        """
+
+    def __call__(self, t : float, x = None):
+        return self._input(self.evaluate(np.array([t], dtype=np.float64)))
+
+    def _input(self, column : np.ndarray):
+        # Input container for a column of the load matrix (without copying)
+        u = self.container.__new__(self.container)
+        u.matrix = column
+        return u
+
+    def _values(self, values : dict, n : int) -> np.ndarray:
+        # Matrix of values (n_inputs x n), rows in the order of the input container keys
+        if not isinstance(values, dict):
+            raise ProgModelInputException("values must be a dictionary of input key to values, was a {}".format(type(values)))
+        for key in self.keys:
+            if key not in values:
+                raise ProgModelInputException("values missing input '{}'".format(key))
+        matrix = np.zeros((len(self.keys), n))
+        for (i, key) in enumerate(self.keys):
+            row = np.asarray(values[key], dtype=np.float64).reshape(-1)
+            if len(row) != n:
+                raise ProgModelInputException("Expected {} values for input '{}', was {}".format(n, key, len(row)))
+            matrix[i] = row
+        return matrix
+
+    @staticmethod
+    def _times(times) -> np.ndarray:
+        times = np.asarray(times, dtype=np.float64).reshape(-1)
+        if np.any(np.diff(times) < 0):
+            raise ProgModelInputException("times must be in increasing order")
+        return times
+
+    def chunked(self, dt : float) -> Callable:
+        """
+        Future loading equation that evaluates the profile for chunks of upcoming times, for a simulation with step size dt. Used by the simulation methods.
+
+        Args:
+            dt (float): Simulation step size
+
+        Returns:
+            Callable: Future loading equation (t, x=None) -> u
+        """
+        return _ChunkedLoading(self, dt)
+
+
+class PiecewiseConstant(LoadingProfile):
+    """
+    Loading profile that is constant between switching times
+
+    Args:
+        container (type): Input container of the model (i.e., model.InputContainer)
+        times (list[float]): Times at which the load changes, in increasing order
+        values (dict[str, list[float]]): Load for each input, with one more value than times. values[key][i] is the load before times[i] (and after times[i-1]). The last value is the load after the last time
+
+    Example:
+        | # i = 2 until t=600, 1 until t=900, 4 after
+        | future_loading = PiecewiseConstant(m.InputContainer, [600, 900], {'i': [2, 1, 4]})
+    """
+    def __init__(self, container : type, times : list, values : dict):
+        super().__init__(container)
+        self.times = self._times(times)
+        self.values = self._values(values, len(self.times) + 1)
+
+    def evaluate(self, times : np.ndarray) -> np.ndarray:
+        return self.values[:, np.searchsorted(self.times, times, side='right')]
+
+
+class PiecewiseLinear(LoadingProfile):
+    """
+    Loading profile that is linearly interpolated between points. Before the first time and after the last time, the load is the first and last value, respectively
+
+    Args:
+        container (type): Input container of the model (i.e., model.InputContainer)
+        times (list[float]): Times of points, in increasing order
+        values (dict[str, list[float]]): Load for each input, one value for each time
+
+    Example:
+        | # i ramps from 0 to 4 over the first 100 seconds
+        | future_loading = PiecewiseLinear(m.InputContainer, [0, 100], {'i': [0, 4]})
+    """
+    def __init__(self, container : type, times : list, values : dict):
+        super().__init__(container)
+        self.times = self._times(times)
+        if len(self.times) == 0:
+            raise ProgModelInputException("times must have at least one value")
+        self.values = self._values(values, len(self.times))
+
+    def evaluate(self, times : np.ndarray) -> np.ndarray:
+        return np.array([np.interp(times, self.times, row) for row in self.values]).reshape((len(self.keys), -1))
+
+
+class Tabulated(PiecewiseLinear):
+    """
+    Loading profile from a table of loads (e.g., a pandas DataFrame or dictionary of arrays) with a time column, and a column for each input. Additional columns are ignored
+
+    Args:
+        container (type): Input container of the model (i.e., model.InputContainer)
+        table (pandas.DataFrame or dict): Table of loads
+        time_key (str, optional): Column with the time of each row. Default: 'time'
+        method (str, optional): 'linear' to interpolate between rows, or 'previous' to use the most recent row (i.e., the load is constant from each row until the next). Default: 'linear'
+
+    Example:
+        | data = pd.read_csv('loading.csv')  # columns time, i
+        | future_loading = Tabulated(m.InputContainer, data)
+    """
+    METHODS = ('linear', 'previous')
+
+    def __init__(self, container : type, table, time_key : str = 'time', method : str = 'linear'):
+        if method not in self.METHODS:
+            raise ProgModelInputException("method must be one of {}, was {}".format(self.METHODS, method))
+        if time_key not in table:
+            raise ProgModelInputException("table missing time column '{}'".format(time_key))
+        for key in container._keys:
+            if key not in table:
+                raise ProgModelInputException("table missing input column '{}'".format(key))
+        self.method = method
+        super().__init__(
+            container,
+            np.asarray(table[time_key]),
+            {key: np.asarray(table[key]) for key in container._keys})
+
+    def evaluate(self, times : np.ndarray) -> np.ndarray:
+        if self.method == 'previous':
+            return self.values[:, np.maximum(np.searchsorted(self.times, times, side='right') - 1, 0)]
+        return super().evaluate(times)
+
+
+class Periodic(LoadingProfile):
+    """
+    Loading profile that repeats another profile. The load at time t is the load of the profile at time (t - t0) mod period
+
+    Args:
+        profile (LoadingProfile): Profile for one period (from 0 to period)
+        period (float): Period (s)
+        t0 (float, optional): Start time of the first period. Default: 0
+
+    Example:
+        | # i = 4 for 10 seconds, then 1 for 20 seconds, repeating
+        | cycle = PiecewiseConstant(m.InputContainer, [10], {'i': [4, 1]})
+        | future_loading = Periodic(cycle, 30)
+    """
+    def __init__(self, profile : LoadingProfile, period : float, t0 : float = 0):
+        if period <= 0:
+            raise ProgModelInputException("period must be positive, was {}".format(period))
+        super().__init__(profile.container)
+        self.profile = profile
+        self.period = period
+        self.t0 = t0
+
+    def evaluate(self, times : np.ndarray) -> np.ndarray:
+        return self.profile.evaluate(np.mod(np.asarray(times) - self.t0, self.period))
+
+
+class GaussianNoise(LoadingProfile):
+    """
+    Loading profile that adds gaussian noise to another profile. The standard deviation can increase with time (e.g., to represent increasing uncertainty in load further into the future)
+
+    Args:
+        profile (LoadingProfile): Profile without noise
+        std (float or dict[str, float]): Standard deviation of the noise at time t0, for every input or each input
+        std_slope (float or dict[str, float], optional): Increase of standard deviation per second after t0. Default: 0
+        t0 (float, optional): Time at which the standard deviation is std. Default: 0
+        rng (np.random.Generator or int, optional): Random number generator (or seed) used for the noise. Default: new generator
+
+    Example:
+        | future_loading = GaussianNoise(PiecewiseConstant(m.InputContainer, [600, 900], {'i': [2, 1, 4]}), 0.2)
+    """
+    def __init__(self, profile : LoadingProfile, std : Union[float, dict], std_slope : Union[float, dict] = 0, t0 : float = 0, rng = None):
+        super().__init__(profile.container)
+        self.profile = profile
+        self.std = self._per_input(std)
+        self.std_slope = self._per_input(std_slope)
+        self.t0 = t0
+        self.rng = np.random.default_rng(rng)
+
+    def _per_input(self, value : Union[float, dict]) -> np.ndarray:
+        # Column vector of value for each input
+        if isinstance(value, dict):
+            return self._values(value, 1)
+        return np.full((len(self.keys), 1), value, dtype=np.float64)
+
+    def evaluate(self, times : np.ndarray) -> np.ndarray:
+        times = np.asarray(times, dtype=np.float64)
+        load = self.profile.evaluate(times)
+        std = self.std + self.std_slope*(times - self.t0)
+        return load + std*self.rng.standard_normal(load.shape)
+
+
+class _ChunkedLoading():
+    # Future loading equation for simulation with a fixed step size. Loads are calculated for a chunk of upcoming times at once: the midpoints of the steps, calculated the same way as the simulation loop (t + dt/2 + dt/2), so they match exactly.
+    # A chunk is only calculated once calls follow the fixed step size- other calls (e.g., initial load, or variable step size) calculate the load for that time only
+    CHUNK_MIN = 16
+    CHUNK_MAX = 4096
+
+    def __init__(self, profile : LoadingProfile, dt : float):
+        self.profile = profile
+        self.half_dt = dt/2
+        self.chunk_size = self.CHUNK_MIN
+        self._times = []  # Times of current chunk
+        self._load = None  # Load matrix of current chunk (n_inputs x chunk_size)- a new matrix for each chunk, so returned inputs are never changed
+        self._i = 0  # Index of next time in chunk
+        self._last = None  # Last time that was not in a chunk (or last time of chunk)
+
+    def __call__(self, t : float, x = None):
+        i = self._i
+        if i < len(self._times) and t == self._times[i]:
+            self._i = i + 1
+            return self.profile._input(self._load[:, i:i+1])
+
+        last = self._last
+        self._last = t
+        half_dt = self.half_dt
+        if last is None or t != (last + half_dt) + half_dt:
+            return self.profile(t)
+
+        # Calls follow fixed step size- calculate chunk of upcoming times. cumsum adds in order, so times are the same as the simulation loop
+        n = self.chunk_size
+        self.chunk_size = min(2*n, self.CHUNK_MAX)
+        steps = np.full(2*n - 1, half_dt)
+        steps[0] = t
+        times = np.cumsum(steps)[::2]
+        self._load = self.profile.evaluate(times)
+        self._times = times.tolist()
+        self._last = self._times[-1]
+        self._i = 1
+        return self.profile._input(self._load[:, 0:1])
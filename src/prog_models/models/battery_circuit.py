@@ -2,11 +2,38 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 from .. import PrognosticsModel
+from ..utils.jit import jit, kernel_args, param_vector
 
 from math import inf
 import numpy as np
 
 
+# Parameters used by _dx_kernel, in order
+_DX_PARAMETERS = ('Rs', 'Cs', 'Ccp', 'CMax', 'qMax', 'Cbp0', 'Cbp1', 'Cbp2', 'Cbp3', 'Rcp0', 'Rcp1', 'Rcp2', 'ha', 'Ta', 'hcs', 'hcp', 'Jt', 'Rp')
+
+@jit
+def _dx_kernel(x, u, p):
+    # Array implementation of BatteryCircuit.dx. x: state matrix, u: input matrix, p: vector of _DX_PARAMETERS
+    Rs = p[0]
+    Vcs = x[3]/p[1]
+    Vcp = x[2]/p[2]
+    SOC = (p[3] - p[4] + x[1])/p[3]
+    Cb = p[5]*SOC**3 + p[6]*SOC**2 + p[7]*SOC + p[8]
+    Rcp = p[9] + p[10]*np.exp(p[11]*(-SOC + 1))
+    Vb = x[1]/Cb
+    Tbdot = (Rcp*Rs*p[12]*(p[13] - x[0]) + Rcp*Vcs**2*p[14] + Rs*Vcp**2*p[15]) \
+        / (p[16]*Rcp*Rs)
+    Vp = Vb - Vcp - Vcs
+    ip = Vp/p[17]
+    ib = u[0] + ip
+    dx = np.empty((4, x.shape[1]))
+    dx[0] = Tbdot
+    dx[1] = -ib
+    dx[2] = ib - Vcp/Rcp
+    dx[3] = ib - Vcs/Rs
+    return dx
+
+
 class BatteryCircuit(PrognosticsModel):
     """
     Vectorized prognostics model for a battery, represented by an equivilant circuit model as described in the following paper:
@@ -123,6 +150,12 @@ class BatteryCircuit(PrognosticsModel):
         return self.StateContainer(self.parameters['x0'])
 
     def dx(self, x : dict, u : dict):
+        if self.use_jit:
+            args = kernel_args(x, u, BatteryCircuit.states, BatteryCircuit.inputs)
+            p = param_vector(self, _DX_PARAMETERS)
+            if args is not None and p is not None:
+                return self.StateContainer(_dx_kernel(*args, p))
+
         # Keep this here- accessing member can be expensive in python- this optimization reduces runtime by almost half!
         parameters = self.parameters
         Rs = parameters['Rs']
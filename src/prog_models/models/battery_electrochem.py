@@ -2,8 +2,10 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 from .. import PrognosticsModel
+from ..utils.jit import jit, kernel_args, param_vector
 
 from copy import deepcopy
+from numbers import Number
 import numpy as np
 import warnings
 
@@ -15,6 +17,56 @@ R_F = R / F    # Optimization - R / F
 mC = 37.04 # kg/m2/(K-s^2)
 tau = 100
 
+# Parameters used by _eod_dx_kernel, in order
+_EOD_DX_PARAMETERS = ('VolB', 'VolS', 'qSMax', 'tDiffusion', 'Sn', 'kn', 'alpha', 'tsn', 'Sp', 'kp', 'tsp', 'Ro', 'to')
+
+@jit
+def _eod_dx_kernel(x, u, p, tb0):
+    # Array implementation of BatteryElectroChemEOD.dx. x: state matrix, u: input matrix, p: vector of _EOD_DX_PARAMETERS, tb0: initial temperature (x0['tb'])
+    i = u[0]
+    # Negative Surface
+    CnBulk = x[4]/p[0]
+    CnSurface = x[5]/p[1]
+    xnS = x[5]/p[2]
+
+    qdotDiffusionBSn = (CnBulk-CnSurface)/p[3]
+
+    Jn = i/p[4]
+    Jn0 = p[5]*((1-xnS)*xnS)**p[6]
+
+    v_part = R_F*x[0]/p[6]
+
+    VsnNominal = v_part*np.arcsinh(Jn/(Jn0 + Jn0))
+
+    # Positive Surface
+    CpBulk = x[6]/p[0]
+    CpSurface = x[7]/p[1]
+    xpS = x[7]/p[2]
+
+    qdotDiffusionBSp = (CpBulk-CpSurface)/p[3]
+
+    Jp = i/p[8]
+    Jp0 = p[9]*((1-xpS)*xpS)**p[6]
+
+    VspNominal = v_part*np.arcsinh(Jp/(Jp0+Jp0))
+
+    # Combined
+    VoNominal = i*p[11]
+
+    # Thermal Effects
+    voltage_eta = x[1] + x[2] + x[3]
+
+    dx = np.empty((8, x.shape[1]))
+    dx[0] = voltage_eta*i/mC + (tb0 - x[0])/tau  # tb
+    dx[1] = (VoNominal-x[1])/p[12]  # Vo
+    dx[2] = (VsnNominal-x[2])/p[7]  # Vsn
+    dx[3] = (VspNominal-x[3])/p[10]  # Vsp
+    dx[4] = -qdotDiffusionBSn  # qnB
+    dx[5] = qdotDiffusionBSn - i  # qnS
+    dx[6] = -qdotDiffusionBSp  # qpB
+    dx[7] = i + qdotDiffusionBSp  # qpS
+    return dx
+
 def update_qmax(params : dict) -> dict:
     # note qMax = qn+qp
     return {
@@ -262,6 +314,13 @@ class BatteryElectroChemEOD(PrognosticsModel):
         return self.StateContainer(self.parameters['x0'])
 
     def dx(self, x : dict, u : dict):
+        if self.use_jit:
+            args = kernel_args(x, u, BatteryElectroChemEOD.states, BatteryElectroChemEOD.inputs)
+            p = param_vector(self, _EOD_DX_PARAMETERS)
+            tb0 = self.parameters['x0']['tb']
+            if args is not None and p is not None and isinstance(tb0, Number):
+                return self.StateContainer(_eod_dx_kernel(*args, p, float(tb0)))
+
         params = self.parameters
         # Negative Surface
         CnBulk = x['qnB']/params['VolB']
@@ -594,7 +653,7 @@ class BatteryElectroChemEODEOL(BatteryElectroChemEOL, BatteryElectroChemEOD):
 
     def dx(self, x : dict, u : dict):
         # Set EOD Parameters (corresponding to health)
-        with warnings.catch_warnings():
+        with warnings.catch_warnings(), self.parameters.batch_update():
             warnings.simplefilter("ignore")
             self.parameters['qMobile'] = x['qMax']
             self.parameters['Ro'] = x['Ro']
@@ -2,12 +2,66 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 from .. import prognostics_model
+from ..utils.jit import jit, kernel_args, param_vector
 
 from copy import deepcopy
 import numpy as np
 import warnings
 
 
+# Parameters used by _next_state_kernel, in order
+_NEXT_STATE_PARAMETERS = ('mcOil', 'HOil1', 'HOil2', 'HOil3', 'mcThrust', 'HThrust1', 'HThrust2', 'wA', 'wRadial', 'wThrust', 'r', 'cLeak', 'ALeak', 'mcRadial', 'HRadial1', 'HRadial2', 'b', 'n', 'p', 'R1', 'R2', 'L1', 'a0', 'a1', 'a2', 'c', 'I', 'FluidI')
+
+@jit
+def _next_state_kernel(x, u, p, dt):
+    # Array implementation of CentrifugalPumpBase.next_state. x: state matrix, u: input matrix, p: vector of _NEXT_STATE_PARAMETERS
+    w = x[0]
+    Q = x[1]
+    Tt = x[2]
+    Tr = x[3]
+    To = x[4]
+    A = x[5]
+    rRadial = x[6]
+    rThrust = x[7]
+    Tamb = u[0]
+    V = u[1]
+    pdisch = u[2]
+    psuc = u[3]
+    wsync = u[4]
+
+    Todot = 1/p[0] * (p[1]*(Tt-To) + p[2]*(Tr-To) + p[3]*(Tamb-To))
+    Ttdot = 1/p[4] * (rThrust*w*w - p[5]*(Tt-Tamb) - p[6]*(Tt-To))
+    Adot = -p[7]*Q*Q
+    rRadialdot = p[8]*rRadial*w*w
+    rThrustdot = p[9]*rThrust*w*w
+    friction = (p[10]+rThrust+rRadial)*w
+    QLeak = p[11]*p[12]*np.sqrt(np.abs(psuc-pdisch)) * np.sign(psuc-pdisch)
+    Trdot = 1/p[13] * (rRadial*w*w - p[14]*(Tr-Tamb) - p[15]*(Tr-To))
+    slipn = (wsync-w)/(wsync)
+    ppump = A*w*w + p[16]*w*Q
+    Qout = np.maximum(0, Q-x[8])
+    slip = np.maximum(-1, (np.minimum(1, slipn)))
+    deltaP = ppump+psuc-pdisch
+    Te = p[17]*p[18]*p[20]/(slip*(wsync+0.00001)) * V**2 \
+        /((p[19]+p[20]/slip)**2+(wsync*p[21])**2)
+    backTorque = -p[24]*Qout**2 + p[23]*w*Qout + p[22]*w**2
+    Qo = p[25]*np.sqrt(np.abs(deltaP)) * np.sign(deltaP)
+    wdot = (Te-friction-backTorque)/p[26]
+    Qdot = 1/p[27]*(Qo-Q)
+
+    x_next = np.empty((9, x.shape[1]))
+    x_next[0] = w + wdot * dt
+    x_next[1] = Q + Qdot * dt
+    x_next[2] = Tt + Ttdot * dt
+    x_next[3] = Tr + Trdot * dt
+    x_next[4] = To + Todot * dt
+    x_next[5] = A + Adot * dt
+    x_next[6] = rRadial + rRadialdot * dt
+    x_next[7] = rThrust + rThrustdot * dt
+    x_next[8] = QLeak
+    return x_next
+
+
 class CentrifugalPumpBase(prognostics_model.PrognosticsModel):
     """
     Prognostics model for a Centrifugal Pump as described in the following paper:
@@ -192,6 +246,12 @@ class CentrifugalPumpBase(prognostics_model.PrognosticsModel):
         return self.StateContainer(x0)
 
     def next_state(self, x : dict, u : dict, dt : float):
+        if self.use_jit:
+            args = kernel_args(x, u, CentrifugalPumpBase.states, CentrifugalPumpBase.inputs)
+            p = param_vector(self, _NEXT_STATE_PARAMETERS)
+            if args is not None and p is not None:
+                return self.StateContainer(_next_state_kernel(*args, p, float(dt)))
+
         params = self.parameters
         Todot = 1/params['mcOil'] * (params['HOil1']*(x['Tt']-x['To']) + params['HOil2']*(x['Tr']-x['To'])\
             + params['HOil3']*(u['Tamb']-x['To']))
@@ -316,7 +376,7 @@ class CentrifugalPumpWithWear(CentrifugalPumpBase):
     }
 
     def next_state(self, x : dict, u : dict, dt : float) -> dict:
-        with warnings.catch_warnings():
+        with warnings.catch_warnings(), self.parameters.batch_update():
             warnings.simplefilter("ignore")
             self.parameters['wA'] = x['wA']
             self.parameters['wRadial'] = x['wRadial']
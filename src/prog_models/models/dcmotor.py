@@ -164,7 +164,7 @@ class DCMotor(PrognosticsModel):
     def initialize(self, u=None, z=None):
         return self.StateContainer(self.parameters['x0'])
 
-    def next_state(self, x, u, dt):
+    def next_state_inplace(self, x, u, dt, out):
         (F_a, F_b, F_c) = backemf(x['theta'])
 
         Ac = self.parameters['Ac'].copy()
@@ -177,10 +177,10 @@ class DCMotor(PrognosticsModel):
         # TODO(CT): Move F_* to U_vector
 
         dxdt = np.dot(Ac, x.matrix) + np.dot(self.parameters['Bc'], u.matrix) 
-        x.matrix +=  dxdt * dt  # Update inplace
-        x.matrix[4] %= PI2  # Wrap angle
+        np.add(x.matrix, dxdt * dt, out=out.matrix)  # Update inplace (next_state returns a new state)
+        out.matrix[4] %= PI2  # Wrap angle
 
-        return x
+        return out
 
     def output(self, x):
         return self.OutputContainer(x.matrix[3:])
@@ -404,7 +404,7 @@ class PneumaticValveWithWear(PneumaticValveBase):
     }
 
     def next_state(self, x : dict, u : dict, dt : float) -> dict:
-        with warnings.catch_warnings():
+        with warnings.catch_warnings(), self.parameters.batch_update():
             warnings.simplefilter("ignore")
             self.parameters['wb'] = x['wb']
             self.parameters['wi'] = x['wi']
@@ -8,13 +8,35 @@ from numbers import Number
 import numpy as np
 from scipy.interpolate import interp1d
 from copy import deepcopy
+from functools import partial
+from inspect import signature
 import itertools
 from warnings import warn
 from collections import abc, namedtuple
-from .sim_result import SimResult, LazySimResult
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import threading
+from .loading import LoadingProfile
+from .sim_result import SimResult, LazySimResult, ColumnarSimResult
 from .utils import ProgressBar
 from .utils.containers import DictLikeMatrixWrapper
+from .utils.integration import integration_methods
+from .utils.jit import JIT_AVAILABLE
+from .utils.noise_functions import normal_measurement_noise, normal_process_noise, measurement_noise_functions, process_noise_functions
 from .utils.parameters import PrognosticsModelParameters
+from .utils.profiling import SimulationProfile
+
+# Built-in noise functions, which accept a random number generator and can add noise in place (see noise_functions)
+_BUILTIN_NOISE_FUNCTIONS = set(process_noise_functions.values()) | set(measurement_noise_functions.values())
+
+
+class _SimulationContext():
+    # State local to a single simulation: the random number generator for noise (None for model.rng) and the number of times each state limit (lower, upper) is applied, reported at the end of the simulation
+    __slots__ = ('rng', 'limit_counts')
+
+    def __init__(self, rng, n_states : int):
+        self.rng = None if rng is None else np.random.default_rng(rng)
+        self.limit_counts = np.zeros((n_states, 2), dtype=int)
 
 
 class PrognosticsModel(ABC):
@@ -77,8 +99,14 @@ class PrognosticsModel(ABC):
             Class for output container - used for representing output
         InputContainer : DictLikeMatrixWrapper
             Class for input container - used for representing input
+        rng : numpy.random.Generator, optional
+            Random number generator used for noise. Default is the global numpy random state (i.e., np.random), so noise can be seeded using np.random.seed. Set to a Generator (e.g., m.rng = np.random.default_rng(42)) for reproducible noise independent of the global state. A Generator is copied with the model (e.g., by deepcopy or pickle), so a copy draws the same random numbers as the model, independently. Can also be set for a single simulation using the `rng` simulation option
+        use_jit : bool, optional
+            For models with array kernels (e.g., BatteryCircuit), True to use the kernels for the model equations (compiled with numba, if installed), False to use the python implementation. Default is True if numba is installed. Without numba the kernels are only faster for large numbers of samples (i.e., vectorized states)
     """
     is_vectorized = False
+    use_jit = JIT_AVAILABLE  # Use kernels for model equations, where available
+    rng = np.random  # Random number generator used for noise
 
     # Configuration Parameters for model
     default_parameters = {
@@ -99,7 +127,10 @@ class PrognosticsModel(ABC):
     param_callbacks = {}  # Callbacks for derived parameters
 
     observables_keys = performance_metric_keys # for backwards compatability        
-    SimulationResults = namedtuple('SimulationResults', ['times', 'inputs', 'states', 'outputs', 'event_states'])
+    class SimulationResults(namedtuple('SimulationResults', ['times', 'inputs', 'states', 'outputs', 'event_states'])):
+        # Results of a simulation. If the simulation was profiled (see the `profile` simulation option), the profile is set as attribute `profile`
+        profile = None
+    BatchSimulationResults = namedtuple('BatchSimulationResults', ['times_of_event', 'results'])
 
     def __init__(self, **kwargs):
         if not hasattr(self, 'inputs'):
@@ -145,9 +176,16 @@ class PrognosticsModel(ABC):
         return "{} Prognostics Model (Events: {})".format(type(self).__name__, self.events)
 
     def __getstate__(self) -> dict:
+        self.parameters.refresh()  # Lazy derived parameters
+        if self.rng is not np.random:
+            # Random number generator set for this model is copied with it (the global random state, np.random, is not)
+            return (self.parameters.data, self.rng)
         return self.parameters.data
 
     def __setstate__(self, state : dict) -> None:
+        if isinstance(state, tuple):
+            # Parameters and random number generator
+            (state, self.rng) = state
         self.parameters = PrognosticsModelParameters(self, state, self.param_callbacks)
 
         self.n_inputs = len(self.inputs)
@@ -158,20 +196,27 @@ class PrognosticsModel(ABC):
 
         # Setup Containers 
         # These containers should be used instead of dictionaries for models that use the internal matrix state
-        states = self.states
+        # Keys and key index (key: row) are shared by every container of a class, so key lookup is constant time
+        states = list(self.states)
         class StateContainer(DictLikeMatrixWrapper):
+            _keys = states
+            _key_index = {key: i for i, key in enumerate(states)}
             def __init__(self, data):
                 super().__init__(states, data)
         self.StateContainer = StateContainer
 
-        inputs = self.inputs
+        inputs = list(self.inputs)
         class InputContainer(DictLikeMatrixWrapper):
+            _keys = inputs
+            _key_index = {key: i for i, key in enumerate(inputs)}
             def __init__(self, data):
                 super().__init__(inputs, data)
         self.InputContainer = InputContainer
 
-        outputs = self.outputs
+        outputs = list(self.outputs)
         class OutputContainer(DictLikeMatrixWrapper):
+            _keys = outputs
+            _key_index = {key: i for i, key in enumerate(outputs)}
             def __init__(self, data):
                 super().__init__(outputs, data)
         self.OutputContainer = OutputContainer
@@ -231,11 +276,7 @@ class PrognosticsModel(ABC):
         ----
         Configured using parameters `measurement_noise` and `measurement_noise_dist`
         """
-        return self.OutputContainer({key: z[key] \
-            + np.random.normal(
-                0, self.parameters['measurement_noise'][key],
-                size=None if np.isscalar(z[key]) else len(z[key]))
-                for key in z.keys()})
+        return normal_measurement_noise(self, z)
         
     def apply_process_noise(self, x : dict, dt : int =1) -> dict:
         """
@@ -267,11 +308,7 @@ class PrognosticsModel(ABC):
         ----
         Configured using parameters `process_noise` and `process_noise_dist`
         """
-        return self.StateContainer({key: x[key] +
-                dt*np.random.normal(
-                    0, self.parameters['process_noise'][key],
-                    size=None if np.isscalar(x[key]) else len(x[key]))
-                    for key in x.keys()})
+        return normal_process_noise(self, x, dt)
 
     def dx(self, x : dict, u : dict) -> dict:
         """
@@ -344,16 +381,150 @@ class PrognosticsModel(ABC):
         
         See Also
         --------
-        dx
+        dx, next_state_inplace
 
         Note
         ----
-        A model should overwrite either `next_state` or `dx`. Override `dx` for continuous models, and `next_state` for discrete, where the behavior cannot be described by the first derivative
+        A model should overwrite either `next_state` or `dx`. Override `dx` for continuous models, and `next_state` (or `next_state_inplace`) for discrete, where the behavior cannot be described by the first derivative
         """
         
         # Note: Default is to use the dx method (continuous model) - overwrite next_state for continuous
+        if isinstance(x, DictLikeMatrixWrapper) and len(x.matrix) == len(self.states):
+            out = self.StateContainer(np.empty(x.matrix.shape))
+        else:
+            out = {}
+        if 'next_state_inplace' in self.__dict__ or type(self).next_state_inplace is not PrognosticsModel.next_state_inplace:
+            out = self.next_state_inplace(x, u, dt, out)
+        else:
+            out = self.__dx_step(x, u, dt, out)
+        if isinstance(out, DictLikeMatrixWrapper):
+            return out
+        return self.StateContainer(out)
+
+    def next_state_inplace(self, x : dict, u : dict, dt : int, out : dict) -> dict:
+        """
+        State transition equation: Calculate next state, writing it into out. Used by the simulation methods (in place of next_state) to step without creating a new state each step
+
+        Parameters
+        ----------
+        x : dict
+            state, with keys defined by model.states \n
+            e.g., x = {'abc': 332.1, 'def': 221.003} given states = ['abc', 'def']
+        u : dict
+            Inputs, with keys defined by model.inputs \n
+            e.g., u = {'i':3.2} given inputs = ['i']
+        dt : number
+            Timestep size in seconds (≥ 0) \n
+            e.g., dt = 0.1
+        out : dict
+            State container into which the next state is written. May be x (i.e., update x in place)
+
+        Returns
+        -------
+        out : dict
+            Next state (out), with keys defined by model.states
+            e.g., x = {'abc': 332.1, 'def': 221.003} given states = ['abc', 'def']
+
+        Example
+        -------
+        | m = PrognosticsModel() # Replace with specific model being simulated
+        | u = {'u1': 3.2}
+        | z = {'z1': 2.2}
+        | x = m.initialize(u, z) # Initialize first state
+        | x_next = m.StateContainer(x)
+        | m.next_state_inplace(x, u, 0.1, x_next) # Writes state at 3.1 seconds given input u into x_next
+
+        See Also
+        --------
+        next_state
+
+        Note
+        ----
+        The default implementation uses dx for continuous models, and copies the result of next_state otherwise. Discrete models can override next_state_inplace instead of next_state (next_state then calls next_state_inplace with a new state container). x must not be changed, unless it is out
+        """
+        if 'next_state' in self.__dict__ or type(self).next_state is not PrognosticsModel.next_state:
+            # Model defines next_state- copy result
+            x_next = self.next_state(x, u, dt)
+            if isinstance(out, DictLikeMatrixWrapper) and isinstance(x_next, DictLikeMatrixWrapper) and x_next._keys == out._keys:
+                if out.matrix.shape == x_next.matrix.shape and out.matrix.dtype == np.float64:
+                    np.copyto(out.matrix, x_next.matrix)
+                else:
+                    out.matrix = x_next.matrix.copy()
+            else:
+                for key in x_next.keys():
+                    out[key] = x_next[key]
+            return out
+        return self.__dx_step(x, u, dt, out)
+
+    def __dx_step(self, x : dict, u : dict, dt : int, out : dict) -> dict:
+        # Euler step using dx, written into out
         dx = self.dx(x, u)
-        return self.StateContainer({key: x[key] + dx[key]*dt for key in dx.keys()})
+        if isinstance(out, DictLikeMatrixWrapper) and isinstance(x, DictLikeMatrixWrapper) and isinstance(dx, DictLikeMatrixWrapper) \
+                and out.matrix.dtype == np.float64 and x.matrix.shape == out.matrix.shape and dx.matrix.shape == out.matrix.shape \
+                and (dx._keys is out._keys or dx._keys == out._keys):
+            np.add(x.matrix, dx.matrix*dt, out=out.matrix)
+            return out
+        for key in dx.keys():
+            out[key] = x[key] + dx[key]*dt
+        return out
+
+    def __inplace_supported(self) -> bool:
+        # Does the model step using next_state_inplace (i.e., next_state_inplace is the most derived of next_state and next_state_inplace)
+        if 'next_state_inplace' in self.__dict__:
+            return True
+        if 'next_state' in self.__dict__:
+            return False
+        for cls in type(self).__mro__:
+            if 'next_state_inplace' in cls.__dict__:
+                return True
+            if 'next_state' in cls.__dict__:
+                return False
+        return False
+
+    def __inplace_next_state(self, x : DictLikeMatrixWrapper) -> tuple:
+        # Configure stepping in place, alternating between two preallocated state buffers (so the state passed to next_state_inplace is never written)
+        # Returns (x, next_state), where x is a copy of x in the first buffer, or None if the model cannot step in place
+        if not isinstance(x, DictLikeMatrixWrapper) or x._keys != self.states or not self.__inplace_supported():
+            return None
+        buffers = (self.StateContainer(np.array(x.matrix, dtype=np.float64)), self.StateContainer(np.empty(x.matrix.shape)))
+        (buffer_a, buffer_b) = buffers
+        next_state_inplace = self.next_state_inplace
+        def next_state(x, u, dt):
+            return next_state_inplace(x, u, dt, buffer_b if x is buffer_a else buffer_a)
+        return (buffer_a, next_state)
+
+    @staticmethod
+    def __noise_function(fcn : Callable, context : _SimulationContext, inplace : bool = False) -> Callable:
+        # Noise function fcn (e.g., model.apply_process_noise) drawing from the random number generator of the simulation context
+        # Built-in noise functions add noise in place if inplace (i.e., for state buffers owned by the simulation) instead of copying the state
+        # Custom noise functions are passed the random number generator if they accept rng
+        if getattr(fcn, '__func__', None) in _BUILTIN_NOISE_FUNCTIONS:
+            if context.rng is None and not inplace:
+                return fcn
+            return partial(fcn, inplace=inplace, rng=context.rng)
+        if context.rng is not None and 'rng' in signature(fcn).parameters:
+            return partial(fcn, rng=context.rng)
+        return fcn
+
+    def __limits_function(self, context : _SimulationContext) -> Callable:
+        # Function applying state limits, counting limits applied in the simulation context (unless apply_limits is overridden)
+        if 'apply_limits' in self.__dict__ or type(self).apply_limits is not PrognosticsModel.apply_limits:
+            return self.apply_limits
+        apply_limits = self.__apply_limits
+        counts = context.limit_counts
+        def apply_limits_counted(x):
+            return apply_limits(x, counts)
+        return apply_limits_counted
+
+    def __step_function(self, step : Callable, context : _SimulationContext, inplace : bool = False, profile : SimulationProfile = None) -> Callable:
+        # next_state function (x, u, dt) -> x for simulation: step, then apply process noise and limits
+        apply_process_noise = self.__noise_function(self.apply_process_noise, context, inplace)
+        apply_limits = self.__limits_function(context)
+        if profile is not None:
+            return profile.next_state(step, apply_process_noise, apply_limits)
+        def next_state(x, u, dt):
+            return apply_limits(apply_process_noise(step(x, u, dt), dt))
+        return next_state
 
     def apply_limits(self, x : dict) -> dict:
         """
@@ -370,17 +541,96 @@ class PrognosticsModel(ABC):
         x : dict
             Bounded state, with keys defined by model.states
             e.g., x = {'abc': 332.1, 'def': 221.003} given states = ['abc', 'def']
+
+        Note
+        ----
+        During simulation, the number of times each limit is applied is counted and reported in a single warning at the end of the simulation, instead of a warning each time a limit is applied.
         """
-        for (key, limit) in self.state_limits.items():
-            if x[key] < limit[0]:
-                warn("State {} limited to {} (was {})".format(key, limit[0], x[key]), ProgModelStateLimitWarning)
-                x[key] = limit[0]
-            elif x[key] > limit[1]:
-                warn("State {} limited to {} (was {})".format(key, limit[1], x[key]), ProgModelStateLimitWarning)
-                x[key] = limit[1]
+        return self.__apply_limits(x)
+
+    def __apply_limits(self, x : dict, counts : np.array = None) -> dict:
+        # Apply state limits, counting limits applied in counts (if provided) instead of warning
+        (lower, upper, limited) = self.__state_limit_bounds()
+        if isinstance(x, DictLikeMatrixWrapper) and x._keys == self.states:
+            mat = x.matrix
+            if mat.shape[1] == 1:
+                # Single sample- quicker to check limited states individually
+                for (i, lower_i, upper_i) in limited:
+                    value = mat[i, 0]
+                    if value < lower_i or value > upper_i:
+                        break
+                else:
+                    return x  # Within limits
+
+            # Clip every state (and sample) at once
+            below = mat < lower
+            above = mat > upper
+            if np.count_nonzero(below) or np.count_nonzero(above):
+                self.__state_limit_hit(np.count_nonzero(below, axis=1), np.count_nonzero(above, axis=1), mat, counts)
+                if mat.dtype == np.float64:
+                    np.clip(mat, lower, upper, out=mat)
+                else:
+                    x.matrix = np.clip(mat, lower, upper)
+            return x
+
+        # Dictionary (or other) state
+        below = np.zeros(len(self.states), dtype=int)
+        above = np.zeros(len(self.states), dtype=int)
+        values = {}
+        for (i, key) in enumerate(self.states):
+            if key not in self.state_limits:
+                continue
+            value = x[key]
+            values[key] = value
+            below[i] = np.count_nonzero(value < lower[i, 0])
+            above[i] = np.count_nonzero(value > upper[i, 0])
+            if below[i] or above[i]:
+                x[key] = np.clip(value, lower[i, 0], upper[i, 0])
+        if below.any() or above.any():
+            self.__state_limit_hit(below, above, values, counts)
         return x
 
-    
+    def __state_limit_bounds(self) -> tuple:
+        # Lower and upper state limits as column vectors aligned to model.states (-inf/inf if a state is not limited), and (index, lower, upper) for each limited state
+        # Cached until state_limits changes
+        limits = tuple(self.state_limits.items())
+        cache = self.__dict__.get('_PrognosticsModel__limit_bounds')
+        if cache is not None and cache[0] == limits:
+            return cache[1]
+        lower = np.array([[self.state_limits[key][0] if key in self.state_limits else -np.inf] for key in self.states], dtype=np.float64)
+        upper = np.array([[self.state_limits[key][1] if key in self.state_limits else np.inf] for key in self.states], dtype=np.float64)
+        limited = [(i, float(lower[i, 0]), float(upper[i, 0])) for (i, key) in enumerate(self.states) if key in self.state_limits]
+        self.__limit_bounds = (limits, (lower.reshape((len(self.states), 1)), upper.reshape((len(self.states), 1)), limited))
+        return self.__limit_bounds[1]
+
+    def __state_limit_hit(self, below : np.array, above : np.array, x, counts : np.array = None) -> None:
+        # Record limits applied (before x is limited). During simulation, these are counted and reported at the end
+        if counts is not None:
+            counts[:, 0] += below
+            counts[:, 1] += above
+            return
+        (lower, upper, _) = self.__state_limit_bounds()
+        for (i, key) in enumerate(self.states):
+            if below[i] or above[i]:
+                if isinstance(x, dict):
+                    value = x[key]
+                else:
+                    value = x[i, 0] if x.shape[1] == 1 else x[i]
+                warn("State {} limited to {} (was {})".format(key, lower[i, 0] if below[i] else upper[i, 0], value), ProgModelStateLimitWarning)
+
+    def __report_state_limits(self, counts : np.array) -> None:
+        # Report state limits applied during a simulation in a single warning (instead of a warning each time)
+        if not counts.any():
+            return
+        (lower, upper, _) = self.__state_limit_bounds()
+        messages = []
+        for (i, key) in enumerate(self.states):
+            if counts[i, 0]:
+                messages.append("{} limited to {} ({} times)".format(key, lower[i, 0], counts[i, 0]))
+            if counts[i, 1]:
+                messages.append("{} limited to {} ({} times)".format(key, upper[i, 0], counts[i, 1]))
+        warn("State limits applied during simulation: {}".format(', '.join(messages)), ProgModelStateLimitWarning)
+
     def __next_state(self, x : dict, u : dict, dt : int) -> dict:
         """
         State transition equation: Calls next_state(), calculating the next state, and then adds noise
@@ -651,7 +901,7 @@ class PrognosticsModel(ABC):
         Parameters
         ----------
         future_loading_eqn : callable
-            Function of (t) -> z used to predict future loading (output) at a given time (t)
+            Function of (t) -> z used to predict future loading (output) at a given time (t). Can be a :py:class:`prog_models.loading.LoadingProfile`, which is calculated for many steps at once when dt is fixed
 
         Keyword Arguments
         -----------------
@@ -679,6 +929,19 @@ class PrognosticsModel(ABC):
             e.g., m.simulate_to_threshold(eqn, z, dt=0.1, save_pts=[1, 2])
         progress : bool, optional
             toggle progress bar printing, e.g., progress = True\n
+        rng : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+            Random number generator (or seed for one) used for noise during this simulation, instead of model.rng. Custom noise functions are passed it if they accept an rng keyword argument. e.g., rng = 42\n
+        columnar_results : bool, optional
+            If true, results are saved into preallocated arrays (see :py:class:`prog_models.sim_result.ColumnarSimResult`) instead of lists of dictionaries. This avoids copying the state at every save point, and allows direct access to results as arrays (e.g., result.states.to_numpy()). Outputs and event states are calculated when saved. Default: False\n
+        integration_method : str, optional
+            Method used to integrate dx for continuous models (i.e., models that define dx), one of 'euler', 'rk4', 'rk45' (adaptive step size), or 'implicit' (backward euler, for stiff models). Default uses model.next_state\n
+            For 'rk45' the step size is adjusted to meet the integration tolerance, with dt used as the maximum step size\n
+        integration_rtol : float, optional
+            Relative tolerance for adaptive and implicit integration methods (default: 1e-3)\n
+        integration_atol : float, optional
+            Absolute tolerance for adaptive and implicit integration methods (default: 1e-6)\n
+        profile : bool or int, optional
+            If set, the wall time and number of calls of each phase of the simulation (e.g., future loading, next_state, saving) are recorded and returned as the `profile` attribute of the results (see :py:class:`prog_models.utils.profiling.SimulationProfile`). If an int, the timings of each step are also kept for that number of most recent steps. There is no overhead when not set. Default: False\n
     
         Returns
         -------
@@ -716,6 +979,14 @@ class PrognosticsModel(ABC):
         ----
         configuration of the model is set through model.parameters.\n
         """
+        context = _SimulationContext(kwargs.pop('rng', None), len(self.states))
+        try:
+            return self.__simulate_to_threshold(context, future_loading_eqn, first_output, threshold_keys, **kwargs)
+        finally:
+            # Report state limits applied once, at end of simulation
+            self.__report_state_limits(context.limit_counts)
+
+    def __simulate_to_threshold(self, context : _SimulationContext, future_loading_eqn : Callable, first_output : dict = None, threshold_keys : list = None, **kwargs) -> namedtuple:
         # Input Validation
         if first_output and not all(key in first_output for key in self.outputs):
             raise ProgModelInputException("Missing key in 'first_output', must have every key in model.outputs")
@@ -738,7 +1009,12 @@ class PrognosticsModel(ABC):
             'save_freq': 10.0,
             'horizon': 1e100, # Default horizon (in s), essentially inf
             'print': False,
-            'progress': False
+            'progress': False,
+            'columnar_results': False,
+            'integration_method': None,
+            'integration_rtol': 1e-3,
+            'integration_atol': 1e-6,
+            'profile': False
         }
         config.update(kwargs)
         
@@ -766,18 +1042,40 @@ class PrognosticsModel(ABC):
             raise ProgModelInputException("'thresholds_met_eqn' must accept one argument (thresholds)-> bool")
         if not isinstance(config['print'], bool):
             raise ProgModelInputException("'print' must be a bool, was a {}".format(type(config['print'])))
+        if not isinstance(config['columnar_results'], bool):
+            raise ProgModelInputException("'columnar_results' must be a bool, was a {}".format(type(config['columnar_results'])))
+        self.__validate_integration_config(config)
+        if not isinstance(config['profile'], (bool, int)) or config['profile'] < 0:
+            raise ProgModelInputException("'profile' must be a bool or a positive int, was {}".format(config['profile']))
 
         # Setup
+        if isinstance(future_loading_eqn, LoadingProfile) and not callable(config['dt']):
+            # Load does not depend on state- calculate for chunks of upcoming steps at once
+            future_loading_eqn = future_loading_eqn.chunked(config['dt'])
+        if config['profile']:
+            profile = SimulationProfile(0 if config['profile'] is True else config['profile'])
+            future_loading_eqn = profile.timed('future_loading', future_loading_eqn)
+        else:
+            profile = None
         t = config['t0']
         u = future_loading_eqn(t)
         if 'x' in config:
-            x = deepcopy(config['x'])
+            x = config['x']
         else:
             x = self.initialize(u, first_output)
         
         # Optimization
-        next_state = self.__next_state
-        output = self.__output
+        step = self.next_state
+        inplace = None if config['integration_method'] is not None else self.__inplace_next_state(x)
+        if inplace is not None:
+            # Step in place (x is copied into the first state buffer)
+            (x, step) = inplace
+        elif 'x' in config:
+            x = deepcopy(config['x'])
+        apply_measurement_noise = self.__noise_function(self.apply_measurement_noise, context)
+        calc_output = self.output
+        def output(x):
+            return apply_measurement_noise(calc_output(x))
         thresthold_met_eqn = self.threshold_met
         event_state = self.event_state
         progress = config['progress']
@@ -818,11 +1116,32 @@ class PrognosticsModel(ABC):
         save_pts.append(1e99)  # Add last endpoint
 
         # confgure optional intermediate printing
-        if config['print']:
+        if config['columnar_results']:
+            # Save into preallocated arrays
+            saved_inputs = ColumnarSimResult(self.inputs, container=self.InputContainer)
+            saved_states = ColumnarSimResult(self.states, container=self.StateContainer)
+            saved_outputs = ColumnarSimResult(self.outputs, container=self.OutputContainer)
+            saved_event_states = ColumnarSimResult(self.events)
+            print_results = config['print']
+            def update_all():
+                saved_times.append(t)
+                saved_inputs.record(t, u)
+                saved_states.record(t, x)  # Copied into array
+                saved_outputs.record(t, output(x))
+                saved_event_states.record(t, event_state(x))
+                if print_results:
+                    print("Time: {}\n\tInput: {}\n\tState: {}\n\tOutput: {}\n\tEvent State: {}\n"\
+                        .format(
+                            saved_times[-1],
+                            saved_inputs[-1],
+                            saved_states[-1],
+                            saved_outputs[-1],
+                            saved_event_states[-1]))
+        elif config['print']:
             def update_all():
                 saved_times.append(t)
                 saved_inputs.append(u)
-                saved_states.append(deepcopy(x))  # Avoid optimization where x is not copied
+                saved_states.append(x.copy() if isinstance(x, DictLikeMatrixWrapper) else deepcopy(x))  # Copied, x is updated in place
                 saved_outputs.append(output(x))
                 saved_event_states.append(event_state(x))
                 print("Time: {}\n\tInput: {}\n\tState: {}\n\tOutput: {}\n\tEvent State: {}\n"\
@@ -836,7 +1155,7 @@ class PrognosticsModel(ABC):
             def update_all():
                 saved_times.append(t)
                 saved_inputs.append(u)
-                saved_states.append(deepcopy(x))  # Avoid optimization where x is not copied
+                saved_states.append(x.copy() if isinstance(x, DictLikeMatrixWrapper) else deepcopy(x))  # Copied, x is updated in place
 
         # configuring next_time function to define prediction time step, default is constant dt
         if callable(config['dt']):
@@ -845,6 +1164,16 @@ class PrognosticsModel(ABC):
             dt = config['dt']  # saving to optimize access in while loop
             def next_time(t, x):
                 return dt
+
+        if config['integration_method'] is not None:
+            (step, next_time) = self.__configure_integration(config, next_time)
+        next_state = self.__step_function(step, context, inplace is not None, profile)
+
+        if profile is not None:
+            # Replace functions in loop with profiled versions. Checking thresholds is last in each step
+            thresthold_met_eqn = profile.timed('threshold_met', thresthold_met_eqn, end_step=True)
+            update_all = profile.timed('save', update_all)
+            profile.start()
         
         # Simulate
         update_all()
@@ -885,7 +1214,21 @@ class PrognosticsModel(ABC):
         if saved_times[-1] != t:
             # This check prevents double recording when the last state was a savepoint
             update_all()
+
+        if profile is not None:
+            profile.stop()
         
+        if config['columnar_results']:
+            results = self.SimulationResults(
+                saved_times,
+                saved_inputs,
+                saved_states,
+                saved_outputs,
+                saved_event_states
+            )
+            results.profile = profile
+            return results
+
         if not saved_outputs:
             # saved_outputs is empty, so it wasn't calculated in simulation - used cached result
             saved_outputs = LazySimResult(self.output, saved_times, saved_states) 
@@ -894,13 +1237,387 @@ class PrognosticsModel(ABC):
             saved_outputs = SimResult(saved_times, saved_outputs)
             saved_event_states = SimResult(saved_times, saved_event_states)
         
-        return self.SimulationResults(
+        results = self.SimulationResults(
             saved_times, 
             SimResult(saved_times, saved_inputs), 
             SimResult(saved_times, saved_states), 
             saved_outputs, 
             saved_event_states
         )
+        results.profile = profile
+        return results
+
+    def __validate_integration_config(self, config : dict) -> None:
+        if config['integration_method'] is None:
+            return
+        if config['integration_method'] not in integration_methods:
+            raise ProgModelInputException("'integration_method' must be one of {}, was {}".format(list(integration_methods.keys()), config['integration_method']))
+        if 'dx' not in self.__dict__ and type(self).dx is PrognosticsModel.dx:
+            raise ProgModelInputException("'integration_method' can only be used with models that define dx")
+        for key in ['integration_rtol', 'integration_atol']:
+            if not isinstance(config[key], Number) or config[key] <= 0:
+                raise ProgModelInputException("'{}' must be a positive number, was {}".format(key, config[key]))
+
+    def __configure_integration(self, config : dict, next_time : Callable) -> tuple:
+        # Configure step (without noise) and next_time functions for simulation using the integration method in config 
+        integrator = integration_methods[config['integration_method']](self, config['integration_rtol'], config['integration_atol'])
+
+        def next_time_integrator(t, x):
+            # User dt is the maximum step size (for adaptive methods)
+            return integrator.next_time(t, x, next_time(t, x))
+        return (integrator.step, next_time_integrator)
+
+    def batch_simulate_to_threshold(self, future_loading_eqn : Callable, first_output : dict = None, threshold_keys : list = None, **kwargs) -> namedtuple:
+        """
+        Simulate an ensemble of samples (e.g., Monte Carlo trajectories) until specified threshold(s) have been met for every sample. 
+        
+        All samples are advanced together as a single (n_states x n_samples) state matrix. Once a sample reaches its threshold it stops stepping and is recorded at its own time of event. Requires a vectorized model (i.e., `model.is_vectorized == True`).
+
+        Parameters
+        ----------
+        future_loading_eqn : callable
+            Function of (t, x) -> u used to predict future loading (input) at a given time (t) and state (x). Can return a single input (applied to every sample) or a vectorized input (one value per sample)
+        first_output : dict, optional
+            First measured output, needed to initialize state for some classes. Can be omitted for classes that dont use this
+        threshold_keys: List[str] or str, optional
+            Keys for events that will trigger the end of simulation for a sample.
+            If blank, a sample stops when any event is met
+
+        Keyword Arguments
+        -----------------
+        x : dict, optional
+            Initial state, where each value is an array with one element per sample, e.g., x= {'x1': np.array([10, 11]), 'x2': np.array([-5.3, -5.1])}. A scalar-valued state is repeated for `n_samples` samples \n
+        n_samples : int, optional
+            Number of samples to simulate. Required if the initial state is not vectorized (e.g., if `x` is not provided)\n
+        t0 : Number, optional
+            Starting time for simulation in seconds (default: 0.0) \n
+        dt : Number or function, optional
+            time step (s), e.g. dt = 0.1 or function (t, x) -> dt\n
+        save_freq : Number, optional
+            Frequency at which output is saved (s), e.g., save_freq = 10 \n
+        save_pts : List[Number], optional
+            Additional ordered list of custom times where output is saved (s), e.g., save_pts= [50, 75] \n
+        horizon : Number, optional
+            maximum time that the model will be simulated forward (s), e.g., horizon = 1000 \n
+        integration_method : str, optional
+            Method used to integrate dx for continuous models. See :py:meth:`simulate_to_threshold`\n
+        rng : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+            Random number generator (or seed for one) used for noise during this simulation, instead of model.rng\n
+
+        Returns
+        -------
+        times_of_event : np.array
+            Time at which threshold was met for each sample (nan if not met before horizon)
+        results : List[SimulationResults]
+            Simulation results (times, inputs, states, outputs, event_states) for each sample, ending at that sample's time of event
+
+        Raises
+        ------
+        ProgModelInputException, ProgModelTypeError
+
+        See Also
+        --------
+        simulate_to_threshold
+
+        Example
+        -------
+        | m = ThrownObject()
+        | x0 = {'x': np.array([1.75, 1.8, 1.85]), 'v': np.array([35, 39, 22])}
+        | (times_of_event, results) = m.batch_simulate_to_threshold(future_load, x = x0, threshold_keys = ['impact'])
+        """
+        context = _SimulationContext(kwargs.pop('rng', None), len(self.states))
+        try:
+            return self.__batch_simulate_to_threshold(context, future_loading_eqn, first_output, threshold_keys, **kwargs)
+        finally:
+            # Report state limits applied once, at end of simulation
+            self.__report_state_limits(context.limit_counts)
+
+    def __batch_simulate_to_threshold(self, context : _SimulationContext, future_loading_eqn : Callable, first_output : dict = None, threshold_keys : list = None, **kwargs) -> tuple:
+        # Input Validation
+        if not self.is_vectorized:
+            raise ProgModelTypeError("Batch simulation requires a vectorized model (is_vectorized == True)")
+
+        if first_output and not all(key in first_output for key in self.outputs):
+            raise ProgModelInputException("Missing key in 'first_output', must have every key in model.outputs")
+
+        if not (callable(future_loading_eqn)):
+            raise ProgModelInputException("'future_loading_eqn' must be callable f(t)")
+        
+        if isinstance(threshold_keys, str):
+            # A single threshold key
+            threshold_keys = [threshold_keys]
+
+        if threshold_keys and not all([key in self.events for key in threshold_keys]):
+            raise ProgModelInputException("threshold_keys must be event names")
+        
+        if threshold_keys is None:
+            threshold_keys = self.events
+
+        # Configure
+        config = { # Defaults
+            't0': 0.0,
+            'dt': 1.0,
+            'save_pts': [],
+            'save_freq': 10.0,
+            'horizon': 1e100, # Default horizon (in s), essentially inf
+            'n_samples': None,
+            'integration_method': None,
+            'integration_rtol': 1e-3,
+            'integration_atol': 1e-6
+        }
+        config.update(kwargs)
+
+        # Configuration validation
+        if not isinstance(config['dt'], Number) and not callable(config['dt']):
+            raise ProgModelInputException("'dt' must be a number or function, was a {}".format(type(config['dt'])))
+        if isinstance(config['dt'], Number) and config['dt'] < 0:
+            raise ProgModelInputException("'dt' must be positive, was {}".format(config['dt']))
+        if not isinstance(config['save_freq'], Number) or config['save_freq'] <= 0:
+            raise ProgModelInputException("'save_freq' must be a positive number, was {}".format(config['save_freq']))
+        if not isinstance(config['save_pts'], abc.Iterable):
+            raise ProgModelInputException("'save_pts' must be list or array, was a {}".format(type(config['save_pts'])))
+        if not isinstance(config['horizon'], Number) or config['horizon'] < 0:
+            raise ProgModelInputException("'horizon' must be a positive number, was {}".format(config['horizon']))
+        if 'x' in config and not all([state in config['x'] for state in self.states]):
+            raise ProgModelInputException("'x' must contain every state in model.states")
+        if config['n_samples'] is not None and (not isinstance(config['n_samples'], Number) or config['n_samples'] < 1):
+            raise ProgModelInputException("'n_samples' must be a positive integer, was {}".format(config['n_samples']))
+        self.__validate_integration_config(config)
+
+        # Setup
+        if isinstance(future_loading_eqn, LoadingProfile) and not callable(config['dt']):
+            # Load does not depend on state- calculate for chunks of upcoming steps at once
+            future_loading_eqn = future_loading_eqn.chunked(config['dt'])
+        t = config['t0']
+        u = future_loading_eqn(t)
+        if 'x' in config:
+            x = self.StateContainer(config['x'])
+        else:
+            x = self.StateContainer(self.initialize(u, first_output))
+        if x.n_samples == 1:
+            if config['n_samples'] is None:
+                raise ProgModelInputException("'n_samples' must be provided when initial state is not vectorized")
+            x.matrix = np.repeat(x.matrix, int(config['n_samples']), axis=1)
+        else:
+            x.matrix = x.matrix.copy()  # Avoid changing user's state
+        n_samples = x.n_samples
+        if config['n_samples'] is not None and n_samples != config['n_samples']:
+            raise ProgModelInputException("'n_samples' ({}) does not match number of samples in 'x' ({})".format(config['n_samples'], n_samples))
+
+        # Optimization
+        threshold_met = self.threshold_met
+        horizon = t + config['horizon']
+        save_freq = config['save_freq']
+        next_save = t + save_freq
+        save_pts = sorted(config['save_pts'])
+        save_pts.append(1e99)  # Add last endpoint
+        save_pt_index = 0
+        if callable(config['dt']):
+            next_time = config['dt']
+        else:
+            dt = config['dt']  # saving to optimize access in while loop
+            def next_time(t, x):
+                return dt
+        if config['integration_method'] is not None:
+            (step, next_time) = self.__configure_integration(config, next_time)
+            inplace = None
+        else:
+            inplace = self.__inplace_next_state(x)
+            if inplace is not None:
+                (x, step) = inplace
+            else:
+                step = self.next_state
+
+        # Per-sample status
+        active = np.ones(n_samples, dtype=bool)
+
+        # Process noise and limits are only applied to active samples, so finished samples do not draw noise or count limits
+        # Note: The model equations step every sample, because parameters and inputs can have a value for each sample
+        apply_process_noise = self.__noise_function(self.apply_process_noise, context, inplace is not None)
+        apply_process_noise_active = self.__noise_function(self.apply_process_noise, context, inplace=True)  # Active samples are a copy
+        apply_limits = self.__limits_function(context)
+        def next_state(x, u, dt):
+            x = step(x, u, dt)
+            if active.all():
+                return apply_limits(apply_process_noise(x, dt))
+            if not isinstance(x, DictLikeMatrixWrapper):
+                x = self.StateContainer(x)
+            x_active = apply_limits(apply_process_noise_active(self.StateContainer(x.matrix[:, active]), dt))
+            if x.matrix.dtype != np.float64:
+                x.matrix = x.matrix.astype(np.float64)
+            x.matrix[:, active] = x_active.matrix
+            return x
+        times_of_event = np.full(n_samples, np.nan)
+        # Final record (time, input, state) for each sample
+        final = [None] * n_samples
+
+        # Saved points are shared by all samples- they are split into per-sample results at the end
+        saved_times = [t]
+        saved_inputs = [u]
+        saved_states = [x.matrix.copy()]
+
+        while t < horizon and active.any():
+            dt = next_time(t, x)
+            t = t + dt/2
+            # Use state at midpoint of step to best represent the load during the duration of the step
+            u = future_loading_eqn(t, x)
+            t = t + dt/2
+            # Stepping in place never writes the current state buffer- otherwise copy, in case next_state updates in place
+            x_prev = x.matrix if inplace is not None else x.matrix.copy()
+            x = next_state(x, u, dt)
+            if not isinstance(x, DictLikeMatrixWrapper):
+                x = self.StateContainer(x)
+
+            # Finished samples stop stepping
+            x.matrix[:, ~active] = x_prev[:, ~active]
+
+            # Check thresholds
+            thresholds_met = threshold_met(x)
+            met = np.zeros(n_samples, dtype=bool)
+            for key in threshold_keys:
+                met |= np.broadcast_to(thresholds_met[key], (n_samples, ))
+            newly_met = met & active
+            if newly_met.any():
+                times_of_event[newly_met] = t
+                for i in np.flatnonzero(newly_met):
+                    final[i] = (t, u, x.matrix[:, i:i+1].copy())
+                active &= ~met
+
+            # Save if at appropriate time
+            if (t >= next_save) or (t >= save_pts[save_pt_index]):
+                if t >= next_save:
+                    next_save += save_freq
+                if t >= save_pts[save_pt_index]:
+                    save_pt_index += 1
+                saved_times.append(t)
+                saved_inputs.append(u)
+                saved_states.append(x.matrix.copy())
+
+        # Samples that did not reach threshold end at final time
+        for i in np.flatnonzero(active):
+            final[i] = (t, u, x.matrix[:, i:i+1].copy())
+
+        # Split into per-sample results
+        def input_sample(u, i):
+            if isinstance(u, DictLikeMatrixWrapper) and u.n_samples > 1:
+                return self.InputContainer(u.matrix[:, i:i+1])
+            if isinstance(u, dict) and any(not np.isscalar(value) for value in u.values()):
+                return {key: np.atleast_1d(value)[i] if len(np.atleast_1d(value)) > 1 else value for key, value in u.items()}
+            return u
+
+        results = []
+        for i in range(n_samples):
+            (t_end, u_end, x_end) = final[i]
+            times = []
+            inputs = []
+            states = []
+            for (t_i, u_i, x_i) in zip(saved_times, saved_inputs, saved_states):
+                if t_i >= t_end:
+                    break
+                times.append(t_i)
+                inputs.append(input_sample(u_i, i))
+                states.append(self.StateContainer(x_i[:, i:i+1]))
+            times.append(t_end)
+            inputs.append(input_sample(u_end, i))
+            states.append(self.StateContainer(x_end))
+
+            results.append(self.SimulationResults(
+                times,
+                SimResult(times, inputs),
+                SimResult(times, states),
+                LazySimResult(self.output, times, states),
+                LazySimResult(self.event_state, times, states)
+            ))
+        
+        return self.BatchSimulationResults(times_of_event, results)
+
+    def simulate_many(self, jobs : list, max_workers : int = None, chunksize : int = None, **kwargs) -> list:
+        """
+        Simulate many independent jobs until threshold(s) have been met, distributed across a pool of processes.
+
+        Each job is simulated using :py:meth:`simulate_to_threshold` on a copy of the model (so the model itself is not changed). Results are returned in the same order as jobs.
+
+        Parameters
+        ----------
+        jobs : List[tuple]
+            Jobs to simulate. Each job is a tuple (future_loading_eqn, parameter_overrides, x0), where parameter_overrides (dict) and x0 (initial state) are optional or None, e.g., [(load, {'thrower_height': 1.5}), (load, None, x0)] \n
+            Note: future_loading_eqn must be picklable (e.g., a function defined at the module level) when using more than one worker
+        max_workers : int, optional
+            Maximum number of worker processes. Default is the number of processors on the machine. If 1, jobs are simulated serially in this process
+        chunksize : int, optional
+            Number of jobs sent to a worker at a time. Larger chunks reduce communication overhead. Default splits the jobs into about 4 chunks per worker
+
+        Keyword Arguments
+        -----------------
+        rng : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+            Seed for noise. Each job uses an independent random number stream spawned from this seed, so noise is not correlated between jobs and results are reproducible regardless of the number of workers. Default is a random seed\n
+        Configuration options for each simulation (e.g., dt, save_freq, threshold_keys). See :py:meth:`simulate_to_threshold`
+
+        Returns
+        -------
+        results : List[SimulationResults]
+            Simulation results (times, inputs, states, outputs, event_states) for each job
+
+        Raises
+        ------
+        ProgModelInputException
+
+        See Also
+        --------
+        simulate_to_threshold
+
+        Example
+        -------
+        | m = ThrownObject()
+        | jobs = [(future_load, {'thrower_height': h}) for h in [1.5, 1.8, 2.0]]
+        | results = m.simulate_many(jobs, threshold_keys = ['impact'], dt = 1e-3)
+        """
+        # Input Validation
+        if not isinstance(jobs, abc.Iterable):
+            raise ProgModelInputException("'jobs' must be a list of tuples (future_loading_eqn, parameter_overrides, x0), was a {}".format(type(jobs)))
+        jobs = [job if isinstance(job, tuple) else (job, ) for job in jobs]
+        for job in jobs:
+            if len(job) < 1 or len(job) > 3:
+                raise ProgModelInputException("Each job must be a tuple (future_loading_eqn, parameter_overrides, x0), was {}".format(job))
+            if not callable(job[0]):
+                raise ProgModelInputException("'future_loading_eqn' must be callable f(t)")
+            if len(job) > 1 and job[1] is not None and not isinstance(job[1], dict):
+                raise ProgModelInputException("'parameter_overrides' must be a dict, was a {}".format(type(job[1])))
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ProgModelInputException("'max_workers' must be a positive integer, was {}".format(max_workers))
+        if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+            raise ProgModelInputException("'chunksize' must be a positive integer, was {}".format(chunksize))
+
+        return list(self.__simulate_many(jobs, max_workers, chunksize, **kwargs))
+
+    def __simulate_many(self, jobs : list, max_workers : int = None, chunksize : int = None, **kwargs):
+        # Simulate jobs (validated, see simulate_many), yielding the results of each job in order as they are available
+        # Results are not kept after they are yielded, so only results completed ahead of an earlier job are held at once
+        if len(jobs) == 0:
+            return
+
+        # Spawn independent random number stream for each job
+        seed = kwargs.pop('rng', None)
+        if isinstance(seed, np.random.Generator):
+            seed = seed.integers(2**63)
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        seeds = seed.spawn(len(jobs))
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(jobs))
+
+        if max_workers == 1:
+            # Serial- no need to start processes. Model and configuration are passed to each job (the worker state is only used by worker processes)
+            for (job, seed) in zip(jobs, seeds):
+                yield self.SimulationResults(*_simulate_job(job, seed, self, kwargs))
+        else:
+            if chunksize is None:
+                chunksize = max(1, -(-len(jobs) // (4*max_workers)))  # ceil
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_simulate_worker, initargs=(self, kwargs)) as executor:
+                for result in executor.map(_simulate_job, jobs, seeds, chunksize=chunksize):
+                    yield self.SimulationResults(*result)
     
     @staticmethod
     def generate_model(keys : dict, initialize_eqn : Callable, output_eqn : Callable, next_state_eqn : Callable = None, dx_eqn : Callable = None, event_state_eqn : Callable = None, threshold_eqn : Callable = None, config : dict = {'process_noise': 0.1}) -> "PrognosticsModel":
@@ -1046,52 +1763,201 @@ class PrognosticsModel(ABC):
             err_total += sum([(z[key] - z_obs[key])**2 for key in z.keys()])
 
         return err_total/len(times)
-    
-    def estimate_params(self, runs : List[tuple], keys : List[str], **kwargs) -> None:
+
+    def calc_error_batch(self, times : List[float], inputs : List[dict], outputs : List[dict], keys : List[str], candidates, **kwargs) -> np.ndarray:
+        """Calculate Mean Squared Error (MSE) between simulated and observed (see calc_error), for many candidate parameter values at once
+
+        For vectorized models (is_vectorized), every candidate is simulated at once as a vectorized state, with each parameter in keys set to an array of its candidate values. This requires that the model equations (including initialize) and parameter callbacks support array parameter values. For other models, candidates are simulated one at a time. Model parameters are restored afterwards
+
+        Args:
+            times ([double]): array of times for each sample
+            inputs ([dict]): array of input dictionaries where input[x] corresponds to time[x]
+            outputs ([dict]): array of output dictionaries where output[x] corresponds to time[x]
+            keys ([string]): Parameter keys
+            candidates (array): Candidate parameter values (n_candidates x len(keys)), where candidates[i] is the value of each key (in order) for candidate i
+            kwargs: Configuration parameters, such as:\n
+             | x0 [dict]: Initial state
+             | dt [double] : time step
+
+        Returns:
+            np.ndarray: Total error for each candidate
+
+        Example:
+            | m = ThrownObject()
+            | errors = m.calc_error_batch(times, inputs, outputs, ['thrower_height', 'throwing_speed'], [[1.8, 40], [1.9, 42], [2, 44]], dt = 0.1)
+        """
+        candidates = np.array(candidates, dtype=np.float64)
+        if candidates.ndim == 1:
+            # Single candidate
+            candidates = candidates.reshape((1, -1))
+        if candidates.ndim != 2 or candidates.shape[1] != len(keys):
+            raise ProgModelInputException("candidates must be a matrix with a column for each key (n_candidates x {}), was shape {}".format(len(keys), candidates.shape))
+        n = candidates.shape[0]
+
+        original = {key: self.parameters[key] for key in keys}
+        try:
+            if not self.is_vectorized:
+                errors = np.empty(n)
+                for i in range(n):
+                    with self.parameters.batch_update():
+                        for key, value in zip(keys, candidates[i]):
+                            self.parameters[key] = value
+                    errors[i] = self.calc_error(times, inputs, outputs, **kwargs)
+                return errors
+
+            with self.parameters.batch_update():
+                for key, values in zip(keys, candidates.T):
+                    self.parameters[key] = values.copy()
+
+            params = {'dt': 1e99}
+            params.update(kwargs)
+            x = params['x0'] if 'x0' in params else self.initialize(inputs[0], outputs[0])
+            if not isinstance(x, DictLikeMatrixWrapper):
+                x = self.StateContainer(x)
+            # A column for each candidate
+            x = self.StateContainer(np.array(np.broadcast_to(x.matrix, (len(self.states), n)), dtype=np.float64))
+            t_last = times[0]
+            err_total = np.zeros(n)
+            stable = np.ones(n, dtype=bool)  # Candidates without NaN
+
+            for t, u, z in zip(times, inputs, outputs):
+                while t_last < t:
+                    t_new = min(t_last + params['dt'], t)
+                    x = self.next_state(x, u, t_new-t_last)
+                    t_last = t_new
+                z_obs = self.output(x)
+                unstable = stable & np.isnan(z_obs.matrix).any(axis=0)
+                if unstable.any():
+                    # Like calc_error, error for unstable candidates is that before NaN was reached
+                    warn("Model unstable- NaN reached in simulation (t={})".format(t))
+                    stable &= ~unstable
+                    if not stable.any():
+                        break
+                err = sum([(z[key] - z_obs[key])**2 for key in z.keys()])
+                err_total += np.where(stable, err, 0)
+
+            return err_total/len(times)
+        finally:
+            with self.parameters.batch_update():
+                for key, value in original.items():
+                    self.parameters[key] = value
+
+    def estimate_params(self, runs : List[tuple], keys : List[str], **kwargs):
         """Estimate the model parameters given data. Overrides model parameters
 
         Args:
             runs (array[tuple]): data from all runs, where runs[0] is the data from run 0. Each run consists of a tuple of arrays of times, input dicts, and output dicts
             keys ([string]): Parameter keys to optimize
             kwargs: Configuration parameters. Supported parameters include: \n
-             | method: Optimization method- see scikit.optimize.minimize 
-             | options: Options passed to optimizer
+             | method: Optimization method- see scikit.optimize.minimize (name or callable), or 'differential_evolution' (population-based, see scipy.optimize.differential_evolution)
+             | options: Options passed to optimizer (for differential_evolution, keyword arguments such as maxiter, popsize, and seed)
+             | bounds: Bounds of the parameters, as a list of (lower, upper) in the order of keys or a dict of key: (lower, upper). Required for differential_evolution
+             | warm_start: Initial parameter values, as a result of a previous call (OptimizeResult), a dict of key: value, or a list in the order of keys. Default is the current model parameters
+             | workers: Number of workers used to calculate the error in parallel. For differential_evolution, candidate parameter values of each generation are evaluated in parallel, otherwise runs are. Default is 1 (serial)
+             | parallel: 'process' (default) or 'thread'- type of workers
+             | vectorized: For differential_evolution, calculate the error for every candidate of a generation at once (see calc_error_batch), split between workers (if any). Requires a model with vectorized parameters. Default is False
+             | jac: Gradient for gradient-based methods (e.g., 'L-BFGS-B', 'BFGS', 'TNC', 'SLSQP'). 'batch' to calculate the error and forward finite difference gradient together in one batch of len(keys)+1 candidates (see calc_error_batch). Other values are passed to scipy.optimize.minimize. Default is None (method default)
+             | Other parameters (e.g., dt) are passed to calc_error
+
+        Returns:
+            scipy.optimize.OptimizeResult: Result of the optimization, in the order of keys (e.g., result.x is the estimated value for each key, result.fun the error at result.x). Can be passed as warm_start to continue the estimation
 
         See: examples.param_est
         """
-        from scipy.optimize import minimize
+        from scipy.optimize import differential_evolution, minimize, OptimizeResult
 
         config = {
             'method': 'nelder-mead',  # Optimization method
-            'options': {'xatol': 1e-8}  # Options passed to optimizer
+            'bounds': None,
+            'warm_start': None,
+            'workers': 1,
+            'parallel': 'process',
+            'vectorized': False,
+            'jac': None
         }
         config.update(kwargs)
+        if 'options' not in config:
+            # Options passed to optimizer
+            config['options'] = {'xatol': 1e-8} if isinstance(config['method'], str) and config['method'].lower() == 'nelder-mead' else {}
+        error_kwargs = {key: value for key, value in kwargs.items() if key not in ('method', 'options', 'bounds', 'warm_start', 'workers', 'parallel', 'vectorized', 'jac')}
+        population = isinstance(config['method'], str) and config['method'].lower() == 'differential_evolution'
+
+        if not isinstance(config['workers'], int) or config['workers'] < 1:
+            raise ProgModelInputException("'workers' must be a positive integer, was {}".format(config['workers']))
+        if config['parallel'] not in ('process', 'thread'):
+            raise ProgModelInputException("'parallel' must be 'process' or 'thread', was {}".format(config['parallel']))
+        bounds = config['bounds']
+        if isinstance(bounds, dict):
+            if not all(key in bounds for key in keys):
+                raise ProgModelInputException("'bounds' must include every key")
+            bounds = [bounds[key] for key in keys]
+        if bounds is not None and len(bounds) != len(keys):
+            raise ProgModelInputException("'bounds' must have a (lower, upper) for each key")
+        if population and bounds is None:
+            raise ProgModelInputException("'bounds' must be provided for differential_evolution")
+
+        warm_start = config['warm_start']
+        if warm_start is None:
+            params = np.array([self.parameters[key] for key in keys], dtype=np.float64)
+        elif isinstance(warm_start, OptimizeResult):
+            params = np.array(warm_start.x, dtype=np.float64).reshape(-1)
+        elif isinstance(warm_start, dict):
+            params = np.array([warm_start[key] if key in warm_start else self.parameters[key] for key in keys], dtype=np.float64)
+        else:
+            params = np.array(warm_start, dtype=np.float64).reshape(-1)
+        if len(params) != len(keys):
+            raise ProgModelInputException("'warm_start' must have a value for each key")
 
         # Set noise to 0
         m_noise, self.parameters['measurement_noise'] = self.parameters['measurement_noise'], 0
         p_noise, self.parameters['process_noise'] = self.parameters['process_noise'], 0
 
-        def optimization_fcn(params):
-            for key, param in zip(keys, params):
-                self.parameters[key] = param
-            err = 0
-            for run in runs:
-                try:
-                    err += self.calc_error(run[0], run[1], run[2], **kwargs)
-                except Exception:
-                    return 1e99 
-                    # If it doesn't work (i.e., throws an error), dont use it
-            return err
-        
-        params = np.array([self.parameters[key] for key in keys])
-
-        res = minimize(optimization_fcn, params, method=config['method'], options=config['options'])
-        for x, key in zip(res.x, keys):
-            self.parameters[key] = x
-
-        # Reset noise
-        self.parameters['measurement_noise'] = m_noise
-        self.parameters['process_noise'] = p_noise   
+        workers = config['workers']
+        executor = None
+        try:
+            if workers > 1:
+                Executor = ProcessPoolExecutor if config['parallel'] == 'process' else ThreadPoolExecutor
+                executor = Executor(max_workers=workers, initializer=_init_estimate_params_worker, initargs=(self, keys, runs, error_kwargs))
+
+            optimization_fcn = _ParamEstimationObjective(self, keys, runs, error_kwargs, executor, workers)
+            if population:
+                if config['vectorized']:
+                    # Candidates of each generation are evaluated together, in a batch for each worker
+                    def population_map(_, candidates):
+                        return optimization_fcn.batch(np.array(list(candidates), dtype=np.float64))
+                    de_kwargs = {'workers': population_map, 'updating': 'deferred'}
+                elif executor is not None:
+                    # Each candidate is evaluated by a worker (over every run)
+                    def population_map(_, candidates):
+                        candidates = list(candidates)
+                        chunksize = max(1, -(-len(candidates) // (4*workers)))  # ceil
+                        return list(executor.map(_estimate_params_error, candidates, chunksize=chunksize))
+                    de_kwargs = {'workers': population_map, 'updating': 'deferred'}
+                else:
+                    de_kwargs = {}
+                de_kwargs.update(config['options'])
+                if 'x0' not in de_kwargs:
+                    # Start population from current (or warm start) values, if in bounds
+                    if all(lower <= value <= upper for (value, (lower, upper)) in zip(params, bounds)):
+                        de_kwargs['x0'] = params
+                res = differential_evolution(optimization_fcn, bounds, **de_kwargs)
+            elif isinstance(config['jac'], str) and config['jac'] == 'batch':
+                # Error and gradient calculated together
+                optimization_fcn.bounds = bounds
+                res = minimize(optimization_fcn.value_and_gradient, params, method=config['method'], jac=True, bounds=bounds, options=config['options'])
+            else:
+                res = minimize(optimization_fcn, params, method=config['method'], jac=config['jac'], bounds=bounds, options=config['options'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            # Reset noise
+            self.parameters['measurement_noise'] = m_noise
+            self.parameters['process_noise'] = p_noise
+
+        with self.parameters.batch_update():
+            for x, key in zip(res.x, keys):
+                self.parameters[key] = x
+        return res
 
     def generate_surrogate(self, load_functions, method = 'dmd', **kwargs):
         """
@@ -1126,6 +1992,14 @@ class PrognosticsModel(ABC):
             List of event_state keys to be included in the surrogate model generation. keys must be a subset of those defined in the PrognosticsModel  \n      
         stability_tol: int, optional
             Value that determines the tolerance for DMD matrix stability\n
+        workers: int, optional
+            Number of worker processes used to simulate the loading functions (see simulate_many). Default is 1 (serial, in this process). Simulation results are accumulated into the training data in order as they are available, so results that complete ahead of an earlier loading function are held in memory until it completes\n
+            Note: load_functions must be picklable (e.g., functions defined at the module level or LoadingProfiles) when using more than one worker\n
+        svd_rank: int, optional
+            Number of modes (i.e., singular vectors of the training data) kept in a reduced-rank surrogate model. Default is None (full rank, no reduction)\n
+        svd_energy: float, optional
+            Value between 0 and 1: the smallest number of modes that capture this fraction of the energy (sum of squared singular values) of the training data is kept. Default is None (full rank, no reduction)\n
+            Note: If both svd_rank and svd_energy are given, the smaller number of modes is used\n
 
         Returns
         -------
@@ -1141,7 +2015,8 @@ class PrognosticsModel(ABC):
         This is a first draft of a surrogate model generation using Dynamic Mode Decomposition. 
         DMD does not generate accurate approximations for all models, especially highly non-linear sections, and can be sensitive to the training data time step. 
         In general, the approximation is less accurate if the DMD matrix is unstable. 
-        Additionally, this implementation does not yet include all functionalities of DMD (e.g. reducing the system's dimensions through SVD). Further functionalities will be included in future releases. \n
+        For systems with many states, outputs, and event states, the surrogate model can be reduced to the dominant modes of the training data (see svd_rank and svd_energy). The reduced model is simulated in the coordinates of the modes, and states are projected back to the full states only at saved points.\n
+        Surrogate models can be updated with more loading functions or data (see update and update_data of the returned model), without regenerating them. Memory used for the training data does not depend on the amount of data.\n
         """
 
         if method != 'dmd':
@@ -1155,7 +2030,10 @@ class PrognosticsModel(ABC):
             'inputs': self.inputs,
             'outputs': self.outputs,
             'events': self.events,
-            'stability_tol': 1e-05
+            'stability_tol': 1e-05,
+            'workers': 1,
+            'svd_rank': None,
+            'svd_energy': None
         }
         config.update(kwargs)
 
@@ -1179,6 +2057,12 @@ class PrognosticsModel(ABC):
             raise ProgModelInputException("Invalid 'trim_data_to' input value, must be between 0 and 1.")
         if not isinstance(config['stability_tol'], Number) or  config['stability_tol'] < 0:
             raise ProgModelInputException(f"Invalid 'stability_tol' input value {config['stability_tol']}, must be a positive number.")
+        if not isinstance(config['workers'], int) or config['workers'] < 1:
+            raise ProgModelInputException(f"Invalid 'workers' input value {config['workers']}, must be a positive integer.")
+        if config['svd_rank'] is not None and (not isinstance(config['svd_rank'], int) or config['svd_rank'] < 1):
+            raise ProgModelInputException(f"Invalid 'svd_rank' input value {config['svd_rank']}, must be a positive integer.")
+        if config['svd_energy'] is not None and (not isinstance(config['svd_energy'], Number) or config['svd_energy'] > 1 or config['svd_energy'] <= 0):
+            raise ProgModelInputException(f"Invalid 'svd_energy' input value {config['svd_energy']}, must be between 0 and 1.")
 
         if isinstance(config['inputs'], str):
             config['inputs'] = [config['inputs']]
@@ -1200,146 +2084,162 @@ class PrognosticsModel(ABC):
         if not all([x in self.events for x in config['events']]):
             raise ProgModelInputException(f"Invalid 'events' input value ({config['events']}), must be a subset of the model's states ({self.events}).")
 
-        # Initialize lists to hold individual matrices
-        x_list = []
-        xprime_list = []
-        time_list = []
-
-        # Generate Data to train surrogate model: 
-        for iter_load, load_fcn_now in enumerate(load_functions):
-            print('Generating training data: loading profile {} of {}'.format(iter_load+1, len(load_functions)))
-
-            # Simulate to threshold 
-            (times, inputs, states, outputs, event_states) = self.simulate_to_threshold(load_fcn_now, **config)
+        def accumulate_training_data(r_mat, load_functions, config, first = False):
+            # Simulate the model with each loading function, and add the training data to r_mat (R of the QR decomposition of [X^T, X'^T], see _dmd_accumulate). Data for each loading profile is not kept
+            # first: Initial training data (keys not included in the surrogate model are removed from states_dmd, inputs_dmd, etc.)
+            sim_config = {key: value for key, value in config.items() if key not in ('trim_data_to', 'states', 'inputs', 'outputs', 'events', 'stability_tol', 'workers', 'svd_rank', 'svd_energy')}
+            if config['workers'] > 1:
+                # Results are accumulated in order as they are available (see simulate_many), instead of after every loading profile is simulated
+                print('Generating training data: {} loading profiles ({} workers)'.format(len(load_functions), config['workers']))
+                sim_results = self.__simulate_many([(load_fcn_now, ) for load_fcn_now in load_functions], max_workers = config['workers'], **sim_config)
+            for iter_load, load_fcn_now in enumerate(load_functions):
+                if config['workers'] > 1:
+                    (times, inputs, states, outputs, event_states) = next(sim_results)
+                else:
+                    print('Generating training data: loading profile {} of {}'.format(iter_load+1, len(load_functions)))
+
+                    # Simulate to threshold 
+                    (times, inputs, states, outputs, event_states) = self.simulate_to_threshold(load_fcn_now, **sim_config)
         
-            # Interpolate results to time step of save_freq
-            time_data_interp = np.arange(times[0], times[-1], config['save_freq'])
-
-            states_data_interp = {}
-            inputs_data_interp = {}
-
-            for state_name in self.states:
-                states_data_temp = [states[iter_data1][state_name] for iter_data1 in range(len(states))]
-                states_data_interp[state_name] = interp1d(times,states_data_temp)(time_data_interp)
-            for input_name in self.inputs:
-                inputs_data_temp = [inputs[iter_data4][input_name] for iter_data4 in range(len(inputs))]
-                inputs_data_interp[input_name] = interp1d(times,inputs_data_temp)(time_data_interp)
-
-            states_data = [
-                self.StateContainer({
-                    key: value[iter_dataT] for key, value in states_data_interp.items()
-                }) for iter_dataT in range(len(time_data_interp))
-                ]
-            inputs_data = [
-                self.InputContainer({
-                    key: value[iter_dataT] for key, value in inputs_data_interp.items()
-                }) for iter_dataT in range(len(time_data_interp))
-                ]
-
-            times = time_data_interp.tolist()
-            states = SimResult(time_data_interp,states_data)
-            inputs = SimResult(time_data_interp,inputs_data)
-            outputs = LazySimResult(self.output, time_data_interp, states_data) 
-            event_states = LazySimResult(self.event_state, time_data_interp, states_data)
+                # Interpolate results to time step of save_freq
+                time_data_interp = np.arange(times[0], times[-1], config['save_freq'])
+
+                states_data_interp = {}
+                inputs_data_interp = {}
+
+                for state_name in self.states:
+                    states_data_temp = [states[iter_data1][state_name] for iter_data1 in range(len(states))]
+                    states_data_interp[state_name] = interp1d(times,states_data_temp)(time_data_interp)
+                for input_name in self.inputs:
+                    inputs_data_temp = [inputs[iter_data4][input_name] for iter_data4 in range(len(inputs))]
+                    inputs_data_interp[input_name] = interp1d(times,inputs_data_temp)(time_data_interp)
+
+                states_data = [
+                    self.StateContainer({
+                        key: value[iter_dataT] for key, value in states_data_interp.items()
+                    }) for iter_dataT in range(len(time_data_interp))
+                    ]
+                inputs_data = [
+                    self.InputContainer({
+                        key: value[iter_dataT] for key, value in inputs_data_interp.items()
+                    }) for iter_dataT in range(len(time_data_interp))
+                    ]
+
+                times = time_data_interp.tolist()
+                states = SimResult(time_data_interp,states_data)
+                inputs = SimResult(time_data_interp,inputs_data)
+                outputs = LazySimResult(self.output, time_data_interp, states_data) 
+                event_states = LazySimResult(self.event_state, time_data_interp, states_data)
             
-            def user_val_set(iter_loop : list, config_key : str, remove_from : dict, del_from) -> None:
-                """Sub-function for performing check and removal for user designated values.
+                def user_val_set(iter_loop : list, config_key : str, remove_from : dict, del_from) -> None:
+                    """Sub-function for performing check and removal for user designated values.
             
-                Args:
-                    iter_loop : list
-                        List of keys to iterate through.
-                    config_key : str
-                        String key to check keys against config
-                    remove_from : dict
-                        Dictionary dmd to remove key from
-                    del_from : list or dict
-                        Final data structure to remove key and data from 
-                """
-                for key in iter_loop:
-                    if key not in config[config_key]:
-                        if iter_load == 0:
-                            remove_from.remove(key)
-                        for i in range(len(times)):
-                            del del_from[i][key]
+                    Args:
+                        iter_loop : list
+                            List of keys to iterate through.
+                        config_key : str
+                            String key to check keys against config
+                        remove_from : dict
+                            Dictionary dmd to remove key from
+                        del_from : list or dict
+                            Final data structure to remove key and data from 
+                    """
+                    for key in iter_loop:
+                        if key not in config[config_key]:
+                            if first and iter_load == 0:
+                                remove_from.remove(key)
+                            for i in range(len(times)):
+                                del del_from[i][key]
                            
-            if len(config['states']) != len(self.states):
-                user_val_set(self.states,  'states', states_dmd, states)
-            if len(config['inputs']) != len(self.inputs):
-                user_val_set(self.inputs,  'inputs', inputs_dmd, inputs)
-            if len(config['outputs']) != len(self.outputs):
-                user_val_set(self.outputs,  'outputs', outputs_dmd, outputs) 
-            if len(config['events']) != len(self.events):
-                user_val_set(self.events,  'events', events_dmd, event_states)  
-
-            # Initialize DMD matrices
-            x_mat_temp = np.zeros((len(states[0])+len(outputs[0])+len(event_states[0])+len(inputs[0]),len(times)-1)) 
-            xprime_mat_temp = np.zeros((len(states[0])+len(outputs[0])+len(event_states[0]),len(times)-1)) 
-
-            # Save DMD matrices
-            for i, time in enumerate(times[:-1]): 
-                time_now = time + np.divide(config['save_freq'],2) 
-                load_now = load_fcn_now(time_now) # Evaluate load_function at (t_now + t_next)/2 to be consistent with next_state implementation
-                if len(config['inputs']) != len(self.inputs): # Delete any input values not specified by user to be included in surrogate model 
-                    for key in self.inputs:
-                        if key not in config['inputs']:
-                            del load_now[key]
-
-                states_now = states[i].matrix 
-                states_next = states[i+1].matrix 
+                if len(config['states']) != len(self.states):
+                    user_val_set(self.states,  'states', states_dmd, states)
+                if len(config['inputs']) != len(self.inputs):
+                    user_val_set(self.inputs,  'inputs', inputs_dmd, inputs)
+                if len(config['outputs']) != len(self.outputs):
+                    user_val_set(self.outputs,  'outputs', outputs_dmd, outputs) 
+                if len(config['events']) != len(self.events):
+                    user_val_set(self.events,  'events', events_dmd, event_states)  
+
+                # Initialize DMD matrices
+                x_mat_temp = np.zeros((len(states[0])+len(outputs[0])+len(event_states[0])+len(inputs[0]),len(times)-1)) 
+                xprime_mat_temp = np.zeros((len(states[0])+len(outputs[0])+len(event_states[0]),len(times)-1)) 
+
+                # Save DMD matrices
+                for i, time in enumerate(times[:-1]): 
+                    time_now = time + np.divide(config['save_freq'],2) 
+                    load_now = load_fcn_now(time_now) # Evaluate load_function at (t_now + t_next)/2 to be consistent with next_state implementation
+                    if len(config['inputs']) != len(self.inputs): # Delete any input values not specified by user to be included in surrogate model 
+                        for key in self.inputs:
+                            if key not in config['inputs']:
+                                del load_now[key]
+
+                    states_now = states[i].matrix 
+                    states_next = states[i+1].matrix 
   
-                stack = (
-                        states_now,
-                        outputs[i].matrix,
-                        np.array([list(event_states[i].values())]).T,
-                        np.array([[load_now[key]] for key in load_now.keys()])
+                    stack = (
+                            states_now,
+                            outputs[i].matrix,
+                            np.array([list(event_states[i].values())]).T,
+                            np.array([[load_now[key]] for key in load_now.keys()])
+                        )
+                    x_mat_temp[:,i] = np.vstack(tuple(v for v in stack if v.shape != (0, )))[:,0]  # Filter out empty values (e.g., if there is no input)
+                    stack2 = (
+                        states_next,
+                        outputs[i+1].matrix,
+                        np.array([list(event_states[i+1].values())]).T
                     )
-                x_mat_temp[:,i] = np.vstack(tuple(v for v in stack if v.shape != (0, )))[:,0]  # Filter out empty values (e.g., if there is no input)
-                stack2 = (
-                    states_next,
-                    outputs[i+1].matrix,
-                    np.array([list(event_states[i+1].values())]).T
-                )
-                xprime_mat_temp[:,i] = np.vstack(tuple(v for v in stack2 if v.shape != (1,0)))[:,0]  # Filter out empty values (e.g., if there is no output)
+                    xprime_mat_temp[:,i] = np.vstack(tuple(v for v in stack2 if v.shape != (1,0)))[:,0]  # Filter out empty values (e.g., if there is no output)
                 
-            # Save matrices in list, where each index in list corresponds to one of the user-defined loading equations 
-            x_list.append(x_mat_temp)
-            xprime_list.append(xprime_mat_temp)
-            time_list.append(times)
-
-        # Format training data for DMD and solve for matrix A, in the form X' = AX 
-        print('Generate DMD Surrogate Model')
-
-        # Cut data to user-defined length 
-        if config['trim_data_to'] != 1:
-            for iter3 in range(len(load_functions)):
-                trim_index = round(len(time_list[iter3])*(config['trim_data_to'])) 
-                x_list[iter3] = x_list[iter3][:,0:trim_index]
-                xprime_list[iter3] = xprime_list[iter3][:,0:trim_index]
-     
-        # Convert lists of datasets into arrays, sequentially stacking data in the horizontal direction
-        x_mat = np.hstack((x_list[:]))
-        xprime_mat = np.hstack((xprime_list[:]))
-
-        # Calculate DMD matrix using the Moore-Penrose pseudo-inverse:
-        dmd_matrix = np.dot(xprime_mat,np.linalg.pinv(x_mat))
+                # Cut data to user-defined length 
+                if config['trim_data_to'] != 1:
+                    trim_index = round(len(times)*(config['trim_data_to'])) 
+                    x_mat_temp = x_mat_temp[:,0:trim_index]
+                    xprime_mat_temp = xprime_mat_temp[:,0:trim_index]
+
+                # Add data for this loading profile to accumulated training data
+                r_mat = _dmd_accumulate(r_mat, x_mat_temp, xprime_mat_temp)
+            return r_mat
+
+        # Generate Data to train surrogate model: 
+        r_mat = accumulate_training_data(None, load_functions, config, first = True)
 
         # Save size of states, inputs, outputs, event_states, and current instance of PrognosticsModel
-        num_states = len(states[0].matrix)
-        num_inputs = len(inputs[0].matrix)
-        num_outputs = len(outputs[0].matrix)
-        num_event_states = len(event_states[0])
+        num_states = len(states_dmd)
+        num_inputs = len(inputs_dmd)
+        num_outputs = len(outputs_dmd)
+        num_event_states = len(events_dmd)
         num_total = num_states + num_outputs + num_event_states 
         prog_model = self
         dmd_dt = config['save_freq']
         process_noise_temp = {key: 0 for key in prog_model.events}  # Process noise for event states is zero
 
-        # Check for stability of dmd_matrix
-        eig_val, _ = np.linalg.eig(dmd_matrix[:,0:-num_inputs if num_inputs > 0 else None])            
-        
-        if sum(eig_val>1) != 0:
-            for eig_val_i in eig_val:
-                if eig_val_i>1 and eig_val_i-1>config['stability_tol']:
-                    warn("The DMD matrix is unstable, may result in poor approximation.")
+        def solve(r_mat):
+            # Solve for matrix A, in the form X' = AX, from accumulated training data
+            # Returns DMD matrix, and for a reduced-rank model the basis of modes, projection onto the modes, and DMD matrices in the coordinates of the modes (otherwise None)
+            print('Generate DMD Surrogate Model')
+            (dmd_matrix, dmd_basis, dmd_projection) = _dmd_solve(r_mat, num_total + num_inputs, config['svd_rank'], config['svd_energy'])
+            a_reduced = None
+            b_reduced = None
+            if dmd_basis is not None:
+                # Reduced-rank: X' = AX in the coordinates of the modes (x = basis*x_r, x_r = projection*x)
+                a_reduced = np.dot(dmd_projection, np.dot(dmd_matrix[:, :num_total], dmd_basis))
+                b_reduced = np.dot(dmd_projection, dmd_matrix[:, num_total:])
+                dmd_matrix = np.hstack((np.dot(dmd_basis, np.dot(a_reduced, dmd_projection)), np.dot(dmd_basis, b_reduced)))
+
+                # Check for stability of reduced matrix (same non-zero eigenvalues as the full matrix)
+                eig_val, _ = np.linalg.eig(a_reduced)
+            else:
+                # Check for stability of dmd_matrix
+                eig_val, _ = np.linalg.eig(dmd_matrix[:,0:-num_inputs if num_inputs > 0 else None])            
+            
+            if sum(eig_val>1) != 0:
+                for eig_val_i in eig_val:
+                    if eig_val_i>1 and eig_val_i-1>config['stability_tol']:
+                        warn("The DMD matrix is unstable, may result in poor approximation.")
+
+            return (dmd_matrix, dmd_basis, dmd_projection, a_reduced, b_reduced)
+
+        (dmd_matrix, dmd_basis, dmd_projection, a_reduced, b_reduced) = solve(r_mat)
 
         from .linear_model import LinearModel
         
@@ -1368,6 +2268,9 @@ class PrognosticsModel(ABC):
 
                 simulate_to_threshold:
                     Simulate prognostics model until defined threshold is met, using simulate_to_threshold defined in PrognosticsModel, then interpolate results to be at user-defined times
+
+                update, update_data:
+                    Update the surrogate model with training data from more loading functions, or a time series of data
             """
 
             # Default parameters: set process_noise and measurement_noise to be defined based on PrognosticsModel values
@@ -1395,6 +2298,16 @@ class PrognosticsModel(ABC):
 
             dt = dmd_dt  # Step size (so it can be accessed programmatically)
 
+            # Reduced-rank model (see svd_rank and svd_energy): modes (columns of basis), projection onto the modes, and matrices in the coordinates of the modes (x = basis*x_r, x_r = projection*x). None if not reduced
+            basis = dmd_basis
+            projection = dmd_projection
+            A_reduced = a_reduced
+            B_reduced = b_reduced
+            __reduced_class = None  # ReducedModelDMD class for the current matrices (see reduced_model_class)
+
+            # Accumulated training data (R of the QR decomposition of [X^T, X'^T], see _dmd_accumulate). Size depends only on the number of states, outputs, event_states, and inputs, not the amount of data
+            training_data = r_mat
+
             def initialize(self, u=None, z=None):
                 x = prog_model.initialize(u,z)
                 x.update(prog_model.output(x))
@@ -1402,10 +2315,104 @@ class PrognosticsModel(ABC):
 
                 return self.StateContainer(x)
 
-            def next_state(self, x, u, _):   
-                x.matrix = np.matmul(self.A, x.matrix) + np.matmul(self.B, u.matrix) + self.E
+            def next_state_inplace(self, x, u, _, out):
+                if self.basis is not None:
+                    # Step in the coordinates of the modes (cheaper than A*x when there are few modes)
+                    x_reduced = np.matmul(self.projection, x.matrix)
+                    np.add(np.matmul(self.basis, np.matmul(self.A_reduced, x_reduced) + np.matmul(self.B_reduced, u.matrix)), self.E, out=out.matrix)
+                    return out
+
+                np.add(np.matmul(self.A, x.matrix) + np.matmul(self.B, u.matrix), self.E, out=out.matrix)
                 
-                return x   
+                return out
+
+            def update(self, load_functions, **kwargs):
+                """
+                Update the surrogate model with training data from more loading functions, without regenerating it. The training data used to generate (or update) the surrogate model is not simulated again
+
+                Args:
+                    load_functions (list[callable]): Loading functions of (t, x = None) -> u, simulated with the model used to generate the surrogate model
+
+                Keyword Args:
+                    Same as generate_surrogate, except save_freq, states, inputs, outputs, events, svd_rank and svd_energy, which are the same as when the surrogate model was generated. Default is the value used to generate the surrogate model
+
+                Example:
+                    | surrogate = m.generate_surrogate([load_1, load_2], dt = 0.1, save_freq = 1)
+                    | surrogate.update([load_3])  # Same as m.generate_surrogate([load_1, load_2, load_3], dt = 0.1, save_freq = 1)
+                """
+                fixed_keys = [key for key in ('save_freq', 'save_pts', 'states', 'inputs', 'outputs', 'events', 'svd_rank', 'svd_energy') if key in kwargs]
+                if len(fixed_keys) > 0:
+                    raise ProgModelInputException(f"{fixed_keys} cannot be changed when updating a surrogate model.")
+                config_update = config.copy()
+                config_update.update(kwargs)
+                if not isinstance(config_update['trim_data_to'], Number) or config_update['trim_data_to']>1 or config_update['trim_data_to']<=0:
+                    raise ProgModelInputException("Invalid 'trim_data_to' input value, must be between 0 and 1.")
+                if not isinstance(config_update['workers'], int) or config_update['workers'] < 1:
+                    raise ProgModelInputException(f"Invalid 'workers' input value {config_update['workers']}, must be a positive integer.")
+
+                self.__set_training_data(accumulate_training_data(self.training_data, load_functions, config_update))
+
+            def update_data(self, states, inputs):
+                """
+                Update the surrogate model with a time series of data (e.g., measured in the field), without regenerating it
+
+                Args:
+                    states (list[dict]): States of the surrogate model (i.e., states, outputs, and event_states of the original model, see states), at times separated by the time step of the surrogate model (dt)
+                    inputs (list[dict]): Inputs from each time in states to the next, i.e., inputs[i] is the input between states[i] and states[i+1] (at least len(states)-1 values)
+                """
+                if len(states) < 2:
+                    raise ProgModelInputException("states must contain at least two values")
+                if len(inputs) < len(states) - 1:
+                    raise ProgModelInputException(f"inputs must contain at least {len(states) - 1} values (one for each step), was {len(inputs)}")
+                x_mat = np.hstack([self.StateContainer(x).matrix for x in states])
+                u_mat = np.hstack([self.InputContainer(u).matrix for u in inputs[:len(states)-1]])
+                self.__set_training_data(_dmd_accumulate(self.training_data, np.vstack((x_mat[:, :-1], u_mat)), x_mat[:, 1:]))
+
+            def __set_training_data(self, r_mat):
+                # Solve for matrices with accumulated training data r_mat
+                (dmd_matrix, self.basis, self.projection, self.A_reduced, self.B_reduced) = solve(r_mat)
+                self.A = dmd_matrix[:,0:num_total]
+                self.B = np.vstack(dmd_matrix[:,num_total:num_total+num_inputs])
+                self.training_data = r_mat
+                self.__reduced_class = None
+
+            def __reduced_model(self):
+                # Model in the coordinates of the modes with the same process noise (projected onto the modes), or None if process noise cannot be projected (i.e., not normal)
+                process_noise = self.parameters['process_noise']
+                if callable(process_noise):
+                    return None
+                if self.__reduced_class is None:
+                    self.__reduced_class = reduced_model_class(self)
+                ReducedModelDMD = self.__reduced_class
+                if all(value == 0 for value in process_noise.values()):
+                    m_reduced = ReducedModelDMD(process_noise = 0)
+                elif self.parameters.get('process_noise_dist', 'normal').lower() in ('normal', 'gaussian'):
+                    projection = self.projection
+                    std = self._process_noise_std
+                    def reduced_process_noise(m, x, dt = 1, rng = None):
+                        rng = m.rng if rng is None else rng
+                        noise = dt*rng.normal(0, std, size=(len(std), x.matrix.shape[1]))
+                        return m.StateContainer(x.matrix + np.matmul(projection, noise))
+                    m_reduced = ReducedModelDMD(process_noise = reduced_process_noise)
+                else:
+                    return None
+                m_reduced.rng = self.rng  # Same random numbers as the surrogate model
+                return m_reduced
+
+            def __simulate_reduced(self, m_reduced, future_loading_eqn, first_output, threshold_keys, **kwargs):
+                # Simulate in the coordinates of the modes, projecting states back only for saved points
+                if 'x' in kwargs:
+                    kwargs['x'] = m_reduced.StateContainer(np.matmul(self.projection, self.StateContainer(kwargs['x']).matrix))
+                results = m_reduced.simulate_to_threshold(future_loading_eqn, first_output, threshold_keys, **kwargs)
+
+                states = [self.StateContainer(np.matmul(self.basis, x_reduced.matrix)) for x_reduced in results.states]
+                return self.SimulationResults(
+                    results.times,
+                    results.inputs,
+                    SimResult(results.times, states),
+                    LazySimResult(self.output, results.times, states),
+                    LazySimResult(self.event_state, results.times, states)
+                )
 
             def simulate_to_threshold(self, future_loading_eqn, first_output = None, threshold_keys = None, **kwargs):
                 # Save keyword arguments same as DMD training for approximation 
@@ -1414,7 +2421,11 @@ class PrognosticsModel(ABC):
                 kwargs_sim['dt'] = dmd_dt
 
                 # Simulate to threshold at DMD time step
-                results = super().simulate_to_threshold(future_loading_eqn,first_output, threshold_keys, **kwargs_sim)
+                m_reduced = None if self.basis is None else self.__reduced_model()
+                if m_reduced is not None:
+                    results = self.__simulate_reduced(m_reduced, future_loading_eqn, first_output, threshold_keys, **kwargs_sim)
+                else:
+                    results = super().simulate_to_threshold(future_loading_eqn,first_output, threshold_keys, **kwargs_sim)
                 
                 # Interpolate results to be at user-desired time step
                 if 'dt' in kwargs:
@@ -1484,5 +2495,194 @@ class PrognosticsModel(ABC):
                     outputs,
                     event_states
                 )
-                
+
+        def reduced_model_class(surrogate):
+            # Class of DMD model in the coordinates of the modes of surrogate (x_r = projection*x), used by SurrogateModelDMD.simulate_to_threshold
+            # Outputs and event states are calculated from the reduced state, so thresholds are checked without projecting back
+            class ReducedModelDMD(LinearModel):
+                A = surrogate.A_reduced
+                B = surrogate.B_reduced
+                C = np.dot(surrogate.C, surrogate.basis)
+                F = np.dot(surrogate.F, surrogate.basis)
+
+                states = ['mode_{}'.format(i) for i in range(surrogate.basis.shape[1])]
+                inputs = inputs_dmd
+                outputs = outputs_dmd
+                events = events_dmd
+
+                def initialize(self, u=None, z=None):
+                    return self.StateContainer(np.matmul(surrogate.projection, surrogate.initialize(u, z).matrix))
+
+                def next_state_inplace(self, x, u, _, out):
+                    np.add(np.matmul(self.A, x.matrix) + np.matmul(self.B, u.matrix), self.E, out=out.matrix)
+
+                    return out
+            return ReducedModelDMD
+
         return SurrogateModelDMD()
+
+
+def _dmd_accumulate(r_mat : np.ndarray, x_mat : np.ndarray, xprime_mat : np.ndarray) -> np.ndarray:
+    # Add training data (columns of X and X') to R of the QR decomposition of [X^T, X'^T] for all training data so far (None if no data)
+    # [X^T, X'^T] = Q*R, so R (size at most (n_x + n_xprime) square) holds all the information needed to solve for the DMD matrix
+    block = np.hstack((x_mat.T, xprime_mat.T))
+    if r_mat is not None:
+        block = np.vstack((r_mat, block))
+    return np.linalg.qr(block, mode='r')
+
+def _dmd_solve(r_mat : np.ndarray, n_x : int, rank : int = None, energy : float = None) -> tuple:
+    # DMD matrix A (X' = AX) from accumulated training data (see _dmd_accumulate). For a reduced-rank model, also the basis of modes (n_xprime x n_modes) and the projection onto the modes (n_modes x n_xprime, x_r = projection*x, x = basis*x_r), otherwise None
+    # With R = [R1, R2] (first n_x columns, then the rest), X^T = Q*R1 and X'^T = Q*R2, so A = X'*pinv(X) = (pinv(R1)*R2)^T. R1 has the same singular values as X, so the pseudo-inverse is the same as for X
+    r1 = r_mat[:, :n_x]
+    r2 = r_mat[:, n_x:]
+    if rank is None and energy is None:
+        return (np.dot(np.linalg.pinv(r1), r2).T, None, None)
+
+    # Rows are scaled to the same norm, so modes are not dominated by rows with large values. Norms of rows of X and X' are the norms of columns of R1 and R2
+    scale_x = np.linalg.norm(r1, axis=0)
+    scale_x[scale_x == 0] = 1
+    scale = np.linalg.norm(r2, axis=0)
+    scale[scale == 0] = 1
+    r1 = r1/scale_x
+    r2 = r2/scale
+
+    # Modes are the left singular vectors of scaled X' (i.e., the right singular vectors of scaled R2)
+    (_, s2, vh2) = np.linalg.svd(r2, full_matrices=False)
+    n_modes = max(_svd_rank(s2, r2.shape), 1)
+    if rank is not None:
+        n_modes = min(n_modes, rank)
+    if energy is not None:
+        cumulative_energy = np.cumsum(s2**2)/np.sum(s2**2)
+        n_modes = min(n_modes, int(np.searchsorted(cumulative_energy, energy*(1 - 1e-12))) + 1)  # Tolerance so energy = 1 is reached despite rounding
+    modes = vh2[:n_modes].T
+
+    # Truncated pseudo-inverse of scaled X: keep as many singular values as there are modes plus inputs (i.e., rows of X that are not in X')
+    (u1, s1, vh1) = np.linalg.svd(r1, full_matrices=False)
+    n_kept = min(n_modes + n_x - r2.shape[1], _svd_rank(s1, r1.shape))
+    dmd_matrix = np.dot(np.dot(r2.T, u1[:, :n_kept])/s1[:n_kept], vh1[:n_kept])
+    return (scale[:, None]*dmd_matrix/scale_x, scale[:, None]*modes, modes.T/scale)
+
+def _svd_rank(s : np.ndarray, shape : tuple) -> int:
+    # Number of singular values s (in decreasing order) of a matrix with shape that are not zero, with the same tolerance as np.linalg.matrix_rank
+    if len(s) == 0:
+        return 0
+    return int(np.count_nonzero(s > s[0]*max(shape)*np.finfo(float).eps))
+
+class _ParamEstimationObjective():
+    # Objective function for estimate_params: total error over runs for parameter values (in order of keys)
+    # Defined at module level so it can be pickled (e.g., sent to worker processes). If executor is set, runs are split between the workers
+    def __init__(self, model : PrognosticsModel, keys : list, runs : list, error_kwargs : dict, executor = None, workers : int = 1):
+        self.model = model
+        self.bounds = None  # Bounds for finite difference steps
+        self.keys = keys
+        self.runs = runs
+        self.error_kwargs = error_kwargs
+        self.executor = executor
+        self.workers = workers
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['executor'] = None
+        return state
+
+    def __call__(self, params) -> float:
+        if self.executor is None:
+            return _param_error(self.model, self.keys, self.runs, self.error_kwargs, params)
+        n_chunks = min(self.workers, len(self.runs))
+        chunks = [list(range(i, len(self.runs), n_chunks)) for i in range(n_chunks)]
+        return sum(self.executor.map(_estimate_params_error, [params]*n_chunks, chunks))
+
+    def batch(self, candidates : np.ndarray) -> np.ndarray:
+        # Total error over runs for each candidate (row of candidates). If executor is set, candidates are split between the workers
+        if self.executor is None:
+            return _param_error_batch(self.model, self.keys, self.runs, self.error_kwargs, candidates)
+        chunks = np.array_split(candidates, min(self.workers, len(candidates)))
+        return np.concatenate(list(self.executor.map(_estimate_params_error_batch, chunks)))
+
+    def value_and_gradient(self, params) -> tuple:
+        # Total error and its forward finite difference gradient, calculated in one batch (params, then params with a step in each key)
+        params = np.asarray(params, dtype=np.float64)
+        steps = np.sqrt(np.finfo(np.float64).eps)*np.maximum(1, np.abs(params))
+        if self.bounds is not None:
+            # Step backward where a forward step would leave the bounds
+            upper = np.array([np.inf if bound[1] is None else bound[1] for bound in self.bounds], dtype=np.float64)
+            steps = np.where(params + steps > upper, -steps, steps)
+        candidates = np.tile(params, (len(params)+1, 1))
+        candidates[1:] += np.diag(steps)
+        steps = np.diag(candidates[1:]) - params  # Exact step (after rounding)
+        errors = self.batch(candidates)
+        return errors[0], (errors[1:] - errors[0])/steps
+
+def _param_error(model : PrognosticsModel, keys : list, runs : list, error_kwargs : dict, params) -> float:
+    with model.parameters.batch_update():
+        for key, param in zip(keys, params):
+            model.parameters[key] = param
+    err = 0
+    for run in runs:
+        try:
+            err += model.calc_error(run[0], run[1], run[2], **error_kwargs)
+        except Exception:
+            return 1e99 
+            # If it doesn't work (i.e., throws an error), dont use it
+    return err
+
+def _param_error_batch(model : PrognosticsModel, keys : list, runs : list, error_kwargs : dict, candidates : np.ndarray) -> np.ndarray:
+    err = np.zeros(len(candidates))
+    try:
+        for run in runs:
+            err += model.calc_error_batch(run[0], run[1], run[2], keys, candidates, **error_kwargs)
+    except Exception:
+        # Batch failed- evaluate candidates one at a time, so only those that fail are excluded
+        return np.array([_param_error(model, keys, runs, error_kwargs, params) for params in candidates])
+    return err
+
+# Worker state for estimate_params. Set once per worker (process or thread) by the pool initializer, so the model and runs are only sent once
+_estimate_params_worker = threading.local()
+
+def _init_estimate_params_worker(model : PrognosticsModel, keys : list, runs : list, error_kwargs : dict) -> None:
+    _estimate_params_worker.model = deepcopy(model)  # Copied, so threads dont change each other's parameters
+    _estimate_params_worker.keys = keys
+    _estimate_params_worker.runs = runs
+    _estimate_params_worker.error_kwargs = error_kwargs
+
+def _estimate_params_error(params, run_indices : list = None) -> float:
+    # Error for params over runs (run_indices, or all runs) using the worker model
+    worker = _estimate_params_worker
+    runs = worker.runs if run_indices is None else [worker.runs[i] for i in run_indices]
+    return _param_error(worker.model, worker.keys, runs, worker.error_kwargs, params)
+
+def _estimate_params_error_batch(candidates : np.ndarray) -> np.ndarray:
+    # Error for each candidate over all runs using the worker model
+    worker = _estimate_params_worker
+    return _param_error_batch(worker.model, worker.keys, worker.runs, worker.error_kwargs, candidates)
+
+# Worker state for simulate_many. Set once per worker process (by the pool initializer) so the model and configuration are only sent once
+# Note: Only set in worker processes- serial simulations pass the model and configuration to _simulate_job instead
+_worker_model = None
+_worker_config = None
+
+def _init_simulate_worker(model : PrognosticsModel, config : dict) -> None:
+    global _worker_model, _worker_config
+    _worker_model = model
+    _worker_config = config
+
+def _simulate_job(job : tuple, seed : np.random.SeedSequence, model : PrognosticsModel = None, config : dict = None) -> tuple:
+    # Simulate a single simulate_many job (future_loading_eqn, parameter_overrides, x0) using model and config (default: the worker model and configuration), with noise from seed
+    # Note: Returned as a tuple, because SimulationResults is defined on the model class
+    if model is None:
+        (model, config) = (_worker_model, _worker_config)
+    future_loading_eqn = job[0]
+    param_overrides = job[1] if len(job) > 1 else None
+    config = deepcopy(config)  # Copied because simulate_to_threshold can change config (e.g., save_pts)
+    config['rng'] = seed
+    if len(job) > 2 and job[2] is not None:
+        config['x'] = job[2]
+
+    # Copy model, so jobs dont effect each other
+    m = deepcopy(model)
+    if param_overrides:
+        with m.parameters.batch_update():
+            for key, value in param_overrides.items():
+                m.parameters[key] = value
+
+    return tuple(m.simulate_to_threshold(future_loading_eqn, **config))
@@ -3,8 +3,10 @@ from collections import UserList, defaultdict
 from typing import Callable, Dict, List
 
 from matplotlib.pyplot import figure
+import numpy as np
 from numpy import sign
 from .visualize import plot_timeseries
+from .utils.containers import DictLikeMatrixWrapper
 from copy import deepcopy
 
 
@@ -48,15 +50,15 @@ class SimResult(UserList):
 
     def extend(self, other : "SimResult") -> None:
         """
-        Extend the SimResult with another SimResult or LazySimResult object
+        Extend the SimResult with another SimResult (e.g., LazySimResult, ColumnarSimResult) object
 
         Args:
-            other (SimResult/LazySimResult)
+            other (SimResult/LazySimResult/ColumnarSimResult)
 
         """
-        if other.__class__ in [SimResult, LazySimResult]:
-            self.times.extend(other.times)
-            self.data.extend(other.data)
+        if isinstance(other, SimResult):
+            self.times.extend(list(other.times))
+            self.data.extend(list(other.data))
         else:
             raise ValueError(f"ValueError: Argument must be of type {self.__class__}")
 
@@ -105,6 +107,24 @@ class SimResult(UserList):
         """
         return self.times[index]
 
+    def to_numpy(self, keys = None) -> np.ndarray:
+        """
+        Convert data to a numpy array
+
+        Args:
+            keys (list[str] or str, optional): Keys to include, in order. If a single key (str) is provided, only that column is returned. Defaults to all keys
+
+        Returns:
+            np.ndarray: Data of shape (n_times, n_keys), or (n_times, ) if keys is a str. For vectorized data (i.e., multiple samples) the shape is (n_times, n_keys, n_samples)
+        """
+        if len(self.data) == 0:
+            return np.array([])
+        if isinstance(keys, str):
+            return np.array([d[keys] for d in self.data])
+        if keys is None:
+            keys = list(self.data[0].keys())
+        return np.array([[d[key] for key in keys] for d in self.data])
+
     def plot(self, **kwargs) -> figure:
         """
         Plot the simresult as a line plot
@@ -162,6 +182,186 @@ class SimResult(UserList):
     # lgtm [py/missing-equals]
 
 
+class ColumnarSimResult(SimResult):  # lgtm [py/missing-equals]
+    """
+    SimResult where the data is stored in a preallocated numpy array (one column per key), instead of a list of dictionaries. The array grows as data is recorded (doubling in size when full), avoiding the cost of copying and allocating a dictionary for every data point.
+
+    Data can be accessed the same as a SimResult (e.g., result[0]['x'], result.data), where each data point is a container that is a view into the array, or directly as an array (see :py:meth:`to_numpy`).
+
+    Note: Modifying the SimResult (e.g., pop, remove, extend) converts it to list storage
+
+    Args:
+        keys (list[str]): Keys for the data (e.g., model.states)
+        times (array[float], optional): Times for each data point where times[n] corresponds to data[n]
+        data (array[Dict[str, float]], optional): Data points where data[n] corresponds to times[n]
+        container (callable, optional): Container class for data points, given data as a column vector (e.g., model.StateContainer). Defaults to DictLikeMatrixWrapper
+        capacity (int, optional): Number of data points initially allocated. Defaults to 128
+    """
+    def __init__(self, keys : list, times : list = [], data : list = [], container : Callable = None, capacity : int = 128):
+        self.keys = list(keys)
+        if container is None:
+            keys = self.keys
+            def container(matrix):
+                return DictLikeMatrixWrapper(keys, matrix)
+        self._container = container
+        self._capacity = max(capacity, 1)
+        self._len = 0
+        self._times = np.empty(self._capacity)
+        self._buffer = None  # Allocated on first record, when the number of samples is known
+        self._cache = None  # (times, data) lists, views into buffer
+        self._lists = None  # (times, data) lists, once converted to list storage
+        for (t, d) in zip(times, data):
+            self.record(t, d)
+
+    def record(self, time : float, value : dict) -> None:
+        """
+        Record a data point. The value is copied into the array
+
+        Args:
+            time (float): Time of the data point
+            value (dict): Data point (e.g., StateContainer)
+        """
+        if self._lists is not None:
+            self._lists[0].append(time)
+            self._lists[1].append(self._container(self._as_matrix(value).copy()))
+            return
+
+        matrix = self._as_matrix(value)
+        if self._buffer is None:
+            self._buffer = np.empty((self._capacity, ) + matrix.shape)
+        elif matrix.shape != self._buffer.shape[1:]:
+            # Number of samples changed- cannot be stored in array
+            self._to_lists()
+            self.record(time, value)
+            return
+        if self._len == self._capacity:
+            # Full- double capacity
+            self._capacity *= 2
+            self._times = np.resize(self._times, self._capacity)
+            buffer = np.empty((self._capacity, ) + self._buffer.shape[1:])
+            buffer[:self._len] = self._buffer[:self._len]
+            self._buffer = buffer
+        self._times[self._len] = time
+        self._buffer[self._len] = matrix
+        self._len += 1
+        self._cache = None
+
+    def _as_matrix(self, value) -> np.ndarray:
+        if isinstance(value, DictLikeMatrixWrapper) and value._keys == self.keys:
+            matrix = value.matrix
+        else:
+            matrix = DictLikeMatrixWrapper(self.keys, value).matrix
+        if matrix.ndim == 1:
+            matrix = matrix.reshape((-1, 1))
+        return matrix
+
+    def _to_lists(self) -> None:
+        # Convert to list storage (independent of the array)
+        if self._lists is None:
+            self._lists = (list(self.times), [self._container(self._buffer[i].copy()) for i in range(self._len)])
+            self._buffer = None
+            self._cache = None
+
+    def _views(self) -> tuple:
+        if self._lists is not None:
+            return self._lists
+        if self._cache is None:
+            self._cache = (
+                self._times[:self._len].tolist(),
+                [self._container(self._buffer[i]) for i in range(self._len)])
+        return self._cache
+
+    @property
+    def times(self) -> List[float]:
+        """
+        Returns:
+            array(float): Times for each data point
+        """
+        return self._views()[0]
+
+    @property
+    def data(self) -> List[dict]:
+        """
+        Returns:
+            array(dict): Data points, as views into the array
+        """
+        return self._views()[1]
+
+    def __len__(self) -> int:
+        if self._lists is not None:
+            return len(self._lists[0])
+        return self._len
+
+    def __getitem__(self, index):
+        if self._lists is None and isinstance(index, int):
+            if index < -self._len or index >= self._len:
+                raise IndexError("SimResult index out of range")
+            return self._container(self._buffer[index % self._len])
+        return self.data[index]
+
+    def __reduce__(self):
+        return (SimResult, (self.times, self.data))
+
+    def to_numpy(self, keys = None) -> np.ndarray:
+        """
+        Get data as a numpy array. Where possible, this is a view into the array (i.e., no data is copied)
+
+        Args:
+            keys (list[str] or str, optional): Keys to include, in order. If a single key (str) is provided, only that column is returned. Defaults to all keys
+
+        Returns:
+            np.ndarray: Data of shape (n_times, n_keys), or (n_times, ) if keys is a str. For vectorized data (i.e., multiple samples) the shape is (n_times, n_keys, n_samples)
+        """
+        if self._lists is not None or self._buffer is None:
+            return super().to_numpy(keys)
+        data = self._buffer[:self._len]
+        if data.shape[2] == 1:
+            # Not vectorized
+            data = data[:, :, 0]
+        if isinstance(keys, str):
+            return data[:, self.keys.index(keys)]
+        if keys is None or keys == self.keys:
+            return data
+        return data[:, [self.keys.index(key) for key in keys]]
+
+    def times_to_numpy(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Times for each data point (view into the array)
+        """
+        if self._lists is not None:
+            return np.array(self._lists[0])
+        return self._times[:self._len]
+
+    # Modifying methods- converted to list storage first 
+    def __setitem__(self, index, value) -> None:
+        self._to_lists()
+        self._lists[1][index] = value
+
+    def __delitem__(self, index) -> None:
+        self._to_lists()
+        del self._lists[0][index]
+        del self._lists[1][index]
+
+    def extend(self, other : SimResult) -> None:
+        self._to_lists()
+        super().extend(other)
+
+    def pop(self, index : int = -1) -> dict:
+        self._to_lists()
+        return super().pop(index)
+
+    def remove(self, d : float = None, t : float = None) -> None:
+        self._to_lists()
+        super().remove(d, t)
+
+    def clear(self) -> None:
+        self._lists = ([], [])
+        self._buffer = None
+        self._cache = None
+        self._len = 0
+
+
 class LazySimResult(SimResult):  # lgtm [py/missing-equals]
     """
     Used to store the result of a simulation, which is only calculated on first request
@@ -16,16 +16,35 @@ class DictLikeMatrixWrapper():
     keys: list
         The keys of the dictionary. e.g., model.states or model.inputs
     data: dict or numpy array
-        The contained data (e.g., input, state, output). If numpy array should be column vector in same order as keys
+        The contained data (e.g., input, state, output). If numpy array should be column vector in same order as keys. For vectorized data (i.e., multiple samples), the matrix is of size (n_keys x n_samples)
+
+    Note
+    ----
+    Subclasses (e.g., model.StateContainer) can define class attributes `_keys` and `_key_index` (map of key to row), which are then shared by every instance instead of being built per instance
     """
+    _keys = None
+    _key_index = None
+
     def __init__(self, keys : list, data : Union[dict, np.array]):
-        self._keys = keys.copy()
+        if keys is not self._keys:
+            # Keys not shared by class
+            self._keys = keys.copy()
+            self._key_index = {key: i for i, key in enumerate(self._keys)}
         if isinstance(data, np.matrix):
             self.matrix = np.array(data, dtype=np.float64)
         elif isinstance(data, np.ndarray):
+            if data.ndim == 3:
+                # Vectorized data provided as column of rows (n_keys x 1 x n_samples)
+                data = data[:, 0, :]
             self.matrix = data
         elif isinstance(data, (dict, DictLikeMatrixWrapper)):
             self.matrix = np.array([[data[key]] for key in keys], dtype=np.float64)
+            if len(keys) == 0:
+                # No data - empty column vector (so matrix operations broadcast correctly)
+                self.matrix = self.matrix.reshape((0, 1))
+            elif self.matrix.ndim == 3:
+                # Vectorized data (each value is an array of samples) - (n_keys x n_samples)
+                self.matrix = self.matrix[:, 0, :]
         else:
             raise ProgModelTypeError(f"Input must be a dictionary or numpy array, not {type(data)}")     
 
@@ -33,14 +52,19 @@ class DictLikeMatrixWrapper():
         return (DictLikeMatrixWrapper, (self._keys, self.matrix))
 
     def __getitem__(self, key : str) -> int:
-        return self.matrix[self._keys.index(key)][0]
+        row = self.matrix[self._key_index[key]]
+        if len(row) == 1:
+            return row[0]
+        return row  # Vectorized - all samples
 
     def __setitem__(self, key : str, value : int) -> None:
-        self.matrix[self._keys.index(key)] = np.atleast_1d(value)
+        self.matrix[self._key_index[key]] = np.atleast_1d(value)
 
     def __delitem__(self, key : str) -> None:
-        self.matrix = np.delete(self.matrix, self._keys.index(key), axis=0)
-        self._keys.remove(key)
+        self.matrix = np.delete(self.matrix, self._key_index[key], axis=0)
+        # Copy keys (which may be shared with other instances) before changing
+        self._keys = [k for k in self._keys if k != key]
+        self._key_index = {k: i for i, k in enumerate(self._keys)}
 
     def __add__(self, other : "DictLikeMatrixWrapper") -> "DictLikeMatrixWrapper":
         return DictLikeMatrixWrapper(self._keys, self.matrix + other.matrix)
@@ -63,29 +87,47 @@ class DictLikeMatrixWrapper():
         return self.__repr__()
 
     def copy(self) -> "DictLikeMatrixWrapper":
-        return DictLikeMatrixWrapper(self._keys, self.matrix.copy())
+        # Same type (e.g., model.StateContainer), without rebuilding keys. Keys are never changed in place, so they can be shared
+        result = type(self).__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result.matrix = self.matrix.copy()
+        return result
 
     def keys(self) -> list:
-        return self._keys
+        return list(self._keys)  # Copy- keys may be shared with other instances
+
+    @property
+    def n_samples(self) -> int:
+        """
+        Number of samples contained (i.e., columns in matrix). Greater than 1 for vectorized data
+        """
+        if self.matrix.ndim < 2:
+            return 1
+        return self.matrix.shape[1]
 
     def values(self) -> np.array:
+        if self.n_samples > 1:
+            return self.matrix
         return np.array([value[0] for value in self.matrix])
 
     def items(self) -> zip:
-        return zip(self._keys, np.array([value[0] for value in self.matrix]))
+        return zip(self._keys, self.values())
 
     def update(self, other : "DictLikeMatrixWrapper") -> None:
         for key in other.keys():
-            if key in self._keys:
+            if key in self._key_index:
                 # Existing key
                 self[key] = other[key]
             else:
                 # A new key!
-                self._keys.append(key)
+                # Copy keys (which may be shared with other instances) before changing
+                self._keys = self._keys + [key]
+                self._key_index = dict(self._key_index)
+                self._key_index[key] = len(self._keys) - 1
                 self.matrix = np.vstack((self.matrix, np.array([other[key]])))
 
     def __contains__(self, key : str) -> bool:
-        return key in self._keys
+        return key in self._key_index
 
     def __repr__(self) -> str:
-        return str({key: value[0] for key, value in zip(self._keys, self.matrix)})
+        return str(dict(self.items()))
@@ -0,0 +1,206 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+"""
+Numerical integration methods for models that define `dx` (i.e., continuous models). These are used by `simulate_to_threshold` when the `integration_method` option is set.
+"""
+
+from abc import ABC, abstractmethod
+import numpy as np
+from warnings import warn
+
+from ..exceptions import ProgModelIntegrationWarning
+from .containers import DictLikeMatrixWrapper
+
+
+class Integrator(ABC):
+    """
+    Base class for integration methods. Integrates state `x` over one time step using model.dx
+
+    Arguments
+    ---------
+    model : PrognosticsModel
+        Model to integrate. Must define `dx`
+    rtol : float, optional
+        Relative tolerance (used by adaptive and implicit methods)
+    atol : float, optional
+        Absolute tolerance (used by adaptive and implicit methods)
+    """
+    def __init__(self, model, rtol : float = 1e-3, atol : float = 1e-6):
+        self.model = model
+        self.rtol = rtol
+        self.atol = atol
+
+    def _f(self, y : np.array, u) -> np.array:
+        # dx as a matrix, given state as a matrix
+        dx = self.model.dx(self.model.StateContainer(y), u)
+        if isinstance(dx, DictLikeMatrixWrapper):
+            return dx.matrix
+        return self.model.StateContainer(dx).matrix
+
+    def next_time(self, t : float, x, dt : float) -> float:
+        """
+        Step size for the next step, given the step size requested by the user (dt)
+        """
+        return dt
+
+    def step(self, x, u, dt : float):
+        """
+        Calculate the next state (without noise)
+        """
+        if isinstance(x, DictLikeMatrixWrapper):
+            y = x.matrix
+        else:
+            y = self.model.StateContainer(x).matrix
+        return self.model.StateContainer(self._step(np.asarray(y, dtype=np.float64), u, dt))
+
+    @abstractmethod
+    def _step(self, y : np.array, u, dt : float) -> np.array:
+        """
+        Calculate the next state as a matrix (n_states x n_samples), given the state as a matrix
+        """
+
+
+class Euler(Integrator):
+    """
+    Forward Euler method (first order). Equivalent to the default next_state for models that define dx
+    """
+    def _step(self, y, u, dt):
+        return y + self._f(y, u)*dt
+
+
+class RK4(Integrator):
+    """
+    Classic fourth-order Runge-Kutta method. Uses 4 evaluations of dx per step
+    """
+    def _step(self, y, u, dt):
+        k1 = self._f(y, u)
+        k2 = self._f(y + k1*(dt/2), u)
+        k3 = self._f(y + k2*(dt/2), u)
+        k4 = self._f(y + k3*dt, u)
+        return y + (k1 + 2*k2 + 2*k3 + k4)*(dt/6)
+
+
+class RK45(Integrator):
+    """
+    Adaptive Runge-Kutta method of order 5(4) (Dormand-Prince) with error control.
+
+    The step size is adjusted to keep the estimated local error within tolerance (rtol, atol). The step size for the next step is proposed through the `dt` function of the simulation, with the user-provided dt used as the maximum step size. If a step is rejected, it is completed with smaller internal steps. For vectorized states, the largest error of any sample is used. If the error is still outside of tolerance at the minimum step size (MIN_STEP), the step is accepted with a ProgModelIntegrationWarning.
+    """
+    A = [
+        [],
+        [1/5],
+        [3/40, 9/40],
+        [44/45, -56/15, 32/9],
+        [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+        [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+    B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+    E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])  # Difference between 5th and 4th order solutions
+
+    SAFETY = 0.9
+    MIN_FACTOR = 0.2
+    MAX_FACTOR = 5
+    MIN_STEP = 1e-10  # Minimum internal step, as fraction of dt
+
+    def __init__(self, model, rtol : float = 1e-3, atol : float = 1e-6):
+        super().__init__(model, rtol, atol)
+        self.h = None  # Proposed step size
+
+    def next_time(self, t, x, dt):
+        if self.h is None:
+            return dt
+        return min(self.h, dt)
+
+    def _error_norm(self, y, y_new, err):
+        scale = self.atol + self.rtol*np.maximum(np.abs(y), np.abs(y_new))
+        # RMS norm for each sample, worst sample
+        return np.max(np.sqrt(np.mean((err/scale)**2, axis=0)))
+
+    def _factor(self, error_norm):
+        if error_norm == 0:
+            return self.MAX_FACTOR
+        return min(self.MAX_FACTOR, max(self.MIN_FACTOR, self.SAFETY*error_norm**(-1/5)))
+
+    def _step(self, y, u, dt):
+        t = 0
+        h = dt
+        while t < dt:
+            h_step = min(h, dt - t)
+            with np.errstate(all='ignore'):
+                # Trial steps can be unstable (e.g., overflow). These steps are rejected by error control
+                k = [self._f(y, u)]
+                for a in self.A[1:]:
+                    k.append(self._f(y + h_step*sum(a_i*k_i for a_i, k_i in zip(a, k) if a_i != 0), u))
+                y_new = y + h_step*sum(b_i*k_i for b_i, k_i in zip(self.B, k) if b_i != 0)
+                err = h_step*sum(e_i*k_i for e_i, k_i in zip(self.E, k) if e_i != 0)
+                error_norm = self._error_norm(y, y_new, err)
+            factor = self._factor(error_norm)
+            if error_norm <= 1 or h_step <= self.MIN_STEP*dt:
+                # Accept
+                if error_norm > 1:
+                    warn("rk45 step accepted at minimum step size ({}) with error outside of tolerance (error norm {})".format(h_step, error_norm), ProgModelIntegrationWarning)
+                t += h_step
+                y = y_new
+                if h_step == h:
+                    # Not shortened to end at dt
+                    h = h_step*factor
+            else:
+                # Reject- retry with smaller step
+                h = h_step*factor
+        self.h = h
+        return y
+
+
+class BackwardEuler(Integrator):
+    """
+    Implicit (backward) Euler method, for stiff models. Solves x_next = x + dx(x_next, u)*dt using Newton iterations with a finite-difference Jacobian. For vectorized models the Jacobian is calculated using a single (batched) call to dx. If the iterations do not converge within tolerance (rtol, atol) in MAX_ITER iterations, the last iterate is used with a ProgModelIntegrationWarning
+    """
+    MAX_ITER = 10
+
+    def _jacobian(self, y, u, f0):
+        # Jacobian of dx for each sample (n_samples x n_states x n_states)
+        (n, m) = y.shape
+        eps = np.sqrt(np.finfo(np.float64).eps)*np.maximum(1, np.abs(y))
+        J = np.empty((m, n, n))
+        if self.model.is_vectorized:
+            # Evaluate every perturbation at once
+            y_perturbed = np.tile(y, (1, n))
+            for j in range(n):
+                y_perturbed[j, j*m:(j+1)*m] += eps[j]
+            if isinstance(u, DictLikeMatrixWrapper) and u.n_samples > 1:
+                u = self.model.InputContainer(np.tile(u.matrix, (1, n)))
+            f = self._f(y_perturbed, u)
+            for j in range(n):
+                J[:, :, j] = ((f[:, j*m:(j+1)*m] - f0)/eps[j]).T
+        else:
+            for j in range(n):
+                y_perturbed = y.copy()
+                y_perturbed[j] += eps[j]
+                J[:, :, j] = ((self._f(y_perturbed, u) - f0)/eps[j]).T
+        return J
+
+    def _step(self, y, u, dt):
+        f0 = self._f(y, u)
+        y_new = y + f0*dt  # Initial guess: forward Euler
+        f = self._f(y_new, u)
+        A = np.eye(y.shape[0]) - dt*self._jacobian(y_new, u, f)  # Fixed for all iterations (simplified Newton)
+        for _ in range(self.MAX_ITER):
+            residual = y_new - y - f*dt
+            delta = np.linalg.solve(A, -residual.T[:, :, np.newaxis])[:, :, 0].T
+            y_new = y_new + delta
+            if np.all(np.abs(delta) <= self.atol + self.rtol*np.abs(y_new)):
+                break
+            f = self._f(y_new, u)
+        else:
+            warn("backward_euler did not converge in {} iterations (dt = {})".format(self.MAX_ITER, dt), ProgModelIntegrationWarning)
+        return y_new
+
+
+integration_methods = {
+    'euler': Euler,
+    'rk4': RK4,
+    'rk45': RK45,
+    'implicit': BackwardEuler,
+    'backward_euler': BackwardEuler
+}
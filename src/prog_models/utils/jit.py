@@ -0,0 +1,98 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+"""
+Support for model equations implemented as array kernels (i.e., functions of the state matrix, input matrix, and a flattened parameter vector). Kernels avoid the dictionary overhead of accessing states, inputs, and parameters by key. If numba is installed, kernels are compiled; otherwise, they are run as numpy functions.
+"""
+
+from numbers import Number
+import numpy as np
+
+from .containers import DictLikeMatrixWrapper
+
+try:
+    from numba import njit
+    JIT_AVAILABLE = True
+except ImportError:
+    # Numba is optional
+    JIT_AVAILABLE = False
+
+
+def jit(fcn):
+    """
+    Decorator for kernels. Compiles the kernel with numba, if available. Otherwise the kernel is returned unchanged
+    """
+    if JIT_AVAILABLE:
+        return njit(cache=True)(fcn)
+    return fcn
+
+
+def kernel_args(x, u, states : list, inputs : list):
+    """
+    State and input matrices for a kernel, with the same number of samples (columns) as float arrays
+
+    Arguments
+    ---------
+    x : StateContainer
+        Model state. The first keys must match states (extra keys, e.g., from a subclass, are ignored by the kernel)
+    u : InputContainer
+        Model input. Keys must match inputs
+    states : list
+        States expected by the kernel, in order
+    inputs : list
+        Inputs expected by the kernel, in order
+
+    Returns
+    -------
+    tuple(np.array, np.array) or None
+        Matrices (x, u), or None if the kernel cannot be used (e.g., x or u is a dict)
+    """
+    if not isinstance(x, DictLikeMatrixWrapper) or not isinstance(u, DictLikeMatrixWrapper):
+        return None
+    if x.keys()[:len(states)] != states or u.keys() != inputs:
+        return None
+    try:
+        x_mat = np.asarray(x.matrix, dtype=np.float64)
+        u_mat = np.asarray(u.matrix, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    if x_mat.ndim != 2 or u_mat.ndim != 2:
+        return None
+    if x_mat.shape[1] != u_mat.shape[1]:
+        # Broadcast single sample to number of samples
+        if u_mat.shape[1] == 1:
+            u_mat = np.repeat(u_mat, x_mat.shape[1], axis=1)
+        elif x_mat.shape[1] == 1:
+            x_mat = np.repeat(x_mat, u_mat.shape[1], axis=1)
+        else:
+            return None
+    return (x_mat, u_mat)
+
+
+def param_vector(model, keys : tuple):
+    """
+    Flattened parameter vector for a kernel. The vector is cached on the model and rebuilt when parameters change
+
+    Arguments
+    ---------
+    model : PrognosticsModel
+        Model with parameters
+    keys : tuple
+        Parameters in the order expected by the kernel
+
+    Returns
+    -------
+    np.array or None
+        Parameter vector, or None if any parameter is not a number (e.g., a distribution of parameter values)
+    """
+    params = model.parameters
+    cache = model.__dict__.get('_param_vector')
+    if cache is not None and cache[0] is params and cache[1] == params._version and cache[2] is keys:
+        return cache[3]
+    values = [params[key] for key in keys]
+    if all(isinstance(value, Number) for value in values):
+        vector = np.array(values, dtype=np.float64)
+    else:
+        vector = None
+    model._param_vector = (params, params._version, keys, vector)
+    return vector
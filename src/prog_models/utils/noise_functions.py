@@ -3,27 +3,64 @@
 
 import numpy as np
 
+from .containers import DictLikeMatrixWrapper
+
+# Note: For containers (e.g., StateContainer), noise for every key (and sample) is drawn in a single call and added to the container's matrix.
+# The container passed in is not changed, unless inplace is True (used by simulation, for states it owns)- then noise is added in place and the same container is returned.
+# The noise standard deviation/limit for each key is cached as a column vector (model._process_noise_std and model._measurement_noise_std) when the noise parameter is set.
+# Plain dictionaries fall back to drawing noise for each key.
+# Triangular noise is drawn from a unit distribution and scaled, which supports keys without noise (i.e., limit of 0).
+# Noise is drawn from the model's random number generator (model.rng), unless another is passed in as rng (e.g., the rng simulation option).
+
+def _is_matrix(d, keys) -> bool:
+    # If noise can be applied directly to matrix (i.e., a container with the expected keys)
+    return isinstance(d, DictLikeMatrixWrapper) and d._keys == keys
+
+def _add_noise(d : DictLikeMatrixWrapper, noise : np.array, inplace : bool) -> DictLikeMatrixWrapper:
+    if inplace:
+        if d.matrix.dtype == np.float64:
+            d.matrix += noise
+        else:
+            # e.g., integer matrix- cannot be updated in place
+            d.matrix = d.matrix + noise
+        return d
+    # New container of the same type (e.g., model.StateContainer), without rebuilding keys
+    result = type(d).__new__(type(d))
+    result.__dict__.update(d.__dict__)
+    result.matrix = d.matrix + noise
+    return result
+
 # ---------------------------
 # Measurement Noise Functions
 # ---------------------------
-def uniform_measurement_noise(self, z : dict):
+def uniform_measurement_noise(self, z : dict, inplace : bool = False, rng = None):
+    rng = self.rng if rng is None else rng
+    if _is_matrix(z, self.outputs):
+        std = self._measurement_noise_std
+        return _add_noise(z, rng.uniform(-std, std, size=z.matrix.shape), inplace)
     return self.OutputContainer({key: z[key] + \
-        np.random.uniform(-self.parameters['measurement_noise'][key], self.parameters['measurement_noise'][key], size=None if np.isscalar(z[key]) else len(z[key])) \
-            for key in self.outputs}) 
+        rng.uniform(-self.parameters['measurement_noise'][key], self.parameters['measurement_noise'][key], size=None if np.isscalar(z[key]) else len(z[key])) \
+            for key in self.outputs})
 
-def triangular_measurement_noise(self, z : dict):
+def triangular_measurement_noise(self, z : dict, inplace : bool = False, rng = None):
+    rng = self.rng if rng is None else rng
+    if _is_matrix(z, self.outputs):
+        return _add_noise(z, self._measurement_noise_std*rng.triangular(-1, 0, 1, size=z.matrix.shape), inplace)
     return self.OutputContainer({key: z[key] + \
-        np.random.triangular(-self.parameters['measurement_noise'][key], 0, self.parameters['measurement_noise'][key], size=None if np.isscalar(z[key]) else len(z[key])) \
+        self.parameters['measurement_noise'][key]*rng.triangular(-1, 0, 1, size=None if np.isscalar(z[key]) else len(z[key])) \
             for key in self.outputs})
 
-def normal_measurement_noise(self, z : dict):
+def normal_measurement_noise(self, z : dict, inplace : bool = False, rng = None):
+    rng = self.rng if rng is None else rng
+    if _is_matrix(z, self.outputs):
+        return _add_noise(z, rng.normal(0, self._measurement_noise_std, size=z.matrix.shape), inplace)
     return self.OutputContainer({key: z[key] \
-        + np.random.normal(
+        + rng.normal(
             0, self.parameters['measurement_noise'][key],
             size=None if np.isscalar(z[key]) else len(z[key]))
             for key in z.keys()})
 
-def no_measurement_noise(self, z : dict) -> dict:
+def no_measurement_noise(self, z : dict, inplace : bool = False, rng = None) -> dict:
     return z
 
 measurement_noise_functions = {
@@ -38,24 +75,34 @@ measurement_noise_functions = {
 # Process Noise Functions
 # ---------------------------
 
-def triangular_process_noise(self, x : dict, dt : int =1):
+def triangular_process_noise(self, x : dict, dt : int =1, inplace : bool = False, rng = None):
+    rng = self.rng if rng is None else rng
+    if _is_matrix(x, self.states):
+        return _add_noise(x, dt*self._process_noise_std*rng.triangular(-1, 0, 1, size=x.matrix.shape), inplace)
     return self.StateContainer({key: x[key] + \
-        dt*np.random.triangular(-self.parameters['process_noise'][key], 0, self.parameters['process_noise'][key], size=None if np.isscalar(x[key]) else len(x[key])) \
+        dt*self.parameters['process_noise'][key]*rng.triangular(-1, 0, 1, size=None if np.isscalar(x[key]) else len(x[key])) \
             for key in self.states})
 
-def uniform_process_noise(self, x : dict, dt : int =1):
+def uniform_process_noise(self, x : dict, dt : int =1, inplace : bool = False, rng = None):
+    rng = self.rng if rng is None else rng
+    if _is_matrix(x, self.states):
+        std = self._process_noise_std
+        return _add_noise(x, dt*rng.uniform(-std, std, size=x.matrix.shape), inplace)
     return self.StateContainer({key: x[key] + \
-        dt*np.random.uniform(-self.parameters['process_noise'][key], self.parameters['process_noise'][key], size=None if np.isscalar(x[key]) else len(x[key])) \
+        dt*rng.uniform(-self.parameters['process_noise'][key], self.parameters['process_noise'][key], size=None if np.isscalar(x[key]) else len(x[key])) \
             for key in self.states})
 
-def normal_process_noise(self, x : dict, dt : int =1):
+def normal_process_noise(self, x : dict, dt : int =1, inplace : bool = False, rng = None):
+    rng = self.rng if rng is None else rng
+    if _is_matrix(x, self.states):
+        return _add_noise(x, dt*rng.normal(0, self._process_noise_std, size=x.matrix.shape), inplace)
     return self.StateContainer({key: x[key] +
-            dt*np.random.normal(
+            dt*rng.normal(
                 0, self.parameters['process_noise'][key],
                 size=None if np.isscalar(x[key]) else len(x[key]))
                 for key in x.keys()})
 
-def no_process_noise(self, x : dict, dt :int =1) -> dict:
+def no_process_noise(self, x : dict, dt :int =1, inplace : bool = False, rng = None) -> dict:
     return x
 
 process_noise_functions = {
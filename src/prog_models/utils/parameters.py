@@ -2,8 +2,11 @@
 # National Aeronautics and Space Administration.  All Rights Reserved.
 
 from collections import UserDict
+from contextlib import contextmanager
 from copy import deepcopy
+from heapq import heappop, heappush
 from numbers import Number
+import numpy as np
 import types
 from typing import Callable
 
@@ -17,7 +20,7 @@ if TYPE_CHECKING: # Fix circular import issue in PrognosticsModelParameters init
 class PrognosticsModelParameters(UserDict):
     """
     Prognostics Model Parameters - this class replaces a standard dictionary.
-    It includes the extra logic to process the different supported manners of defining noise.
+    It includes the extra logic to process the different supported manners of defining noise, and to calculate derived parameters (see register_derived_callback, batch_update, and lazy).
 
     Args:
         model: PrognosticsModel for which the params correspond
@@ -27,20 +30,208 @@ class PrognosticsModelParameters(UserDict):
     def __init__(self, model : "PrognosticsModel", dict_in : dict = {}, callbacks : dict = {}):
         super().__init__()
         self.__m = model
+        self._version = 0  # Incremented on every change (used to invalidate cached values, e.g., parameter vectors)
+        self._changed = None  # Keys changed in current batch_update (None if not in batch_update)
+        self._callback_outputs = {}  # Map of id(callback) to keys it returned when last called
+        self._callback_index = None  # Map of id(callback) to position in topological order (None if not yet calculated)
+        self._lazy = False
+        self._dirty = {}  # Lazy mode: Map of id(callback) to callbacks that have to be run (inputs changed)
+        self._stale = set()  # Lazy mode: Derived parameters that are out of date (returned by a dirty callback)
         self.callbacks = {}
         # Note: Callbacks are set to empty to prevent calling callbacks with a partial or empty dict on line 32. 
         for (key, value) in dict_in.items():
-            # Deepcopy is needed here to force copying when value is an object (e.g., dict)
-            self[key] = deepcopy(value)
+            # Deepcopy is needed here to force copying when value is an object (e.g., dict). Scalars are immutable, so are not copied
+            self[key] = value if isinstance(value, (Number, str, type(None))) else deepcopy(value)
 
         # Add and run callbacks
         # Has to be done here so the base parameters are all set 
         self.callbacks = callbacks
-        for key in callbacks:
-            if key in self:
-                for callback in callbacks[key]:
-                    changes = callback(self)
-                    self.update(changes)
+        self._run_callbacks([key for key in callbacks if key in self])
+
+    @contextmanager
+    def batch_update(self):
+        """Context manager to change several parameters at once. Derived parameter callbacks are run once, when the context exits, instead of after every change. Callbacks are run in order of their dependencies (i.e., after callbacks that change their inputs), and only if their inputs changed
+
+        Example:
+            | with m.parameters.batch_update():
+            |     m.parameters['qMax'] = 7600
+            |     m.parameters['xnMax'] = 0.6
+        """
+        if self._changed is not None:
+            # Already in batch_update- callbacks are run when outer context exits
+            yield self
+            return
+        self._changed = set()
+        try:
+            yield self
+        finally:
+            (changed, self._changed) = (self._changed, None)
+            if self._lazy:
+                self._mark(changed)
+            else:
+                self._run_callbacks(changed)
+
+    @property
+    def lazy(self) -> bool:
+        """
+        If derived parameters are calculated lazily (default False). In lazy mode, changing a parameter only marks the derived parameters that depend on it (directly or through other derived parameters) as out of date. Their callbacks are run when one of them is next read. This avoids calculating derived parameters that are not read before the next change (e.g., when sweeping many parameters)
+
+        Example:
+            | m.parameters.lazy = True
+            | for qMax in np.linspace(7000, 8000, 100):
+            |     m.parameters['qMax'] = qMax  # Derived parameters (e.g., qpMin) not yet calculated
+            |     ...
+        """
+        return self._lazy
+
+    @lazy.setter
+    def lazy(self, value : bool) -> None:
+        self._lazy = bool(value)
+        if not self._lazy:
+            self.refresh()
+
+    def __getitem__(self, key : str):
+        if key in self._stale:
+            self._refresh(key)
+        return self.data[key]
+
+    def _mark(self, keys) -> None:
+        # Lazy mode: Mark callbacks triggered by keys (directly or through the derived parameters they return) as dirty
+        stack = list(keys)
+        unknown = []  # Callbacks that have not run, so the parameters they change are unknown
+        while stack:
+            for callback in self.callbacks.get(stack.pop(), ()):
+                cb_id = id(callback)
+                if cb_id in self._dirty:
+                    continue
+                if cb_id not in self._callback_outputs:
+                    unknown.append(callback)
+                    continue
+                self._dirty[cb_id] = callback
+                for key in self._callback_outputs[cb_id]:
+                    if key not in self._stale:
+                        self._stale.add(key)
+                        stack.append(key)
+        if unknown:
+            self._run_callbacks([], unknown)
+
+    def _refresh(self, key : str) -> None:
+        # Lazy mode: Run dirty callbacks that return key, in order. Their inputs are refreshed when they are read
+        index = self._callback_order()
+        callbacks = [callback for (cb_id, callback) in self._dirty.items() if key in self._callback_outputs[cb_id]]
+        callbacks.sort(key = lambda callback: index.get(id(callback), len(index)))
+        for callback in callbacks:
+            if self._dirty.pop(id(callback), None) is None:
+                continue  # Already run (i.e., refreshing another input)
+            changes = callback(self)
+            self._learn_outputs(id(callback), changes)
+            changed = []
+            for (changed_key, value) in changes.items():
+                if changed_key in self.data and _equal(self.data[changed_key], value):
+                    continue
+                self._set(changed_key, value)
+                changed.append(changed_key)
+            self._stale = {stale_key for cb_id in self._dirty for stale_key in self._callback_outputs[cb_id]}
+            self._mark(changed)
+        self._stale.discard(key)  # Not returned by any dirty callback
+
+    def refresh(self) -> None:
+        """
+        Calculate every out of date derived parameter (lazy mode only, see lazy)
+        """
+        if not self._dirty:
+            return
+        callbacks = list(self._dirty.values())
+        self._dirty = {}
+        self._stale = set()
+        self._run_callbacks([], callbacks)
+
+    def dependency_graph(self) -> dict:
+        """
+        Get the dependencies between parameters, from the derived parameter callbacks. Derived parameters are those returned by each callback when it was last run
+
+        Returns:
+            dict[str, list[str]]: Map of each parameter with callbacks to the derived parameters its callbacks calculate (i.e., that depend on it directly)
+
+        Example:
+            | m = ThrownObject()
+            | m.parameters.dependency_graph()  # {'rho': ['lumped_param'], 'A': ['lumped_param'], 'm': ['lumped_param'], 'cd': ['lumped_param']}
+        """
+        return {
+            key: sorted({derived for callback in callbacks for derived in self._callback_outputs.get(id(callback), ())})
+            for (key, callbacks) in self.callbacks.items()}
+
+    def _learn_outputs(self, cb_id : int, changes : dict) -> None:
+        # Record keys returned by callback
+        if self._callback_outputs.get(cb_id) != changes.keys():
+            # New dependencies- order is recalculated next time
+            self._callback_outputs[cb_id] = set(changes.keys())
+            self._callback_index = None
+
+    def _callback_order(self) -> dict:
+        # Map of id(callback) to position, in topological order of dependencies (i.e., callbacks that change a key come before those triggered by that key)
+        # Dependencies are found from the keys each callback returned when last called
+        if self._callback_index is None:
+            callbacks = {}
+            for key_callbacks in self.callbacks.values():
+                for callback in key_callbacks:
+                    callbacks.setdefault(id(callback), callback)
+            dependents = {
+                cb_id: {id(dependent) for key in self._callback_outputs.get(cb_id, ()) for dependent in self.callbacks.get(key, ())}
+                for cb_id in callbacks}
+            n_dependencies = {cb_id: 0 for cb_id in callbacks}
+            for cb_ids in dependents.values():
+                for cb_id in cb_ids:
+                    n_dependencies[cb_id] += 1
+            order = [cb_id for cb_id in callbacks if n_dependencies[cb_id] == 0]
+            for cb_id in order:  # Note: order grows during iteration
+                for dependent in dependents[cb_id]:
+                    n_dependencies[dependent] -= 1
+                    if n_dependencies[dependent] == 0:
+                        order.append(dependent)
+            if len(order) < len(callbacks):
+                # Remaining callbacks depend on each other
+                cycle = sorted({key for (key, key_callbacks) in self.callbacks.items() for callback in key_callbacks if n_dependencies[id(callback)] > 0})
+                raise ProgModelTypeError("Derived parameter callbacks form a cycle (through parameters {})".format(cycle))
+            self._callback_index = {cb_id: i for (i, cb_id) in enumerate(order)}
+        return self._callback_index
+
+    def _run_callbacks(self, keys, callbacks = ()) -> None:
+        # Run callbacks triggered by changes to keys (and callbacks), then those triggered by the derived parameters they change
+        # Each callback runs after those earlier in the order, so it usually runs once. Derived parameters that did not change do not trigger callbacks
+        index = self._callback_order()
+        max_runs = len(index) + 1  # More runs are usually caused by a cycle
+        runs = {}
+        pending = []  # Heap of (position in order, id, callback)
+        queued = set()
+        def queue(callback):
+            cb_id = id(callback)
+            if cb_id not in queued:
+                queued.add(cb_id)
+                heappush(pending, (index.get(cb_id, len(index)), cb_id, callback))
+
+        for callback in callbacks:
+            queue(callback)
+        for key in keys:
+            for callback in self.callbacks.get(key, ()):
+                queue(callback)
+        while pending:
+            (_, cb_id, callback) = heappop(pending)
+            queued.discard(cb_id)
+            runs[cb_id] = runs.get(cb_id, 0) + 1
+            if runs[cb_id] > max_runs:
+                # Check dependencies learned so far (raises exception for cycle). Otherwise, continue in new order
+                self._callback_index = None
+                index = self._callback_order()
+                runs = {}
+            changes = callback(self)
+            self._learn_outputs(cb_id, changes)
+            for (key, value) in changes.items():
+                if key in self.data and _equal(self.data[key], value):
+                    continue
+                self._set(key, value)
+                for dependent in self.callbacks.get(key, ()):
+                    queue(dependent)
 
     def __setitem__(self, key : str, value : float) -> None:
         """Set model configuration, overrides dict.__setitem__()
@@ -52,13 +243,22 @@ class PrognosticsModelParameters(UserDict):
         Raises:
             ProgModelTypeError: Improper configuration for a model
         """
+        self._set(key, value)
+
+        if self._changed is not None:
+            # Callbacks are run at end of batch_update
+            self._changed.add(key)
+        elif key in self.callbacks:
+            if self._lazy:
+                self._mark([key])
+            else:
+                self._run_callbacks([key])
+
+    def _set(self, key : str, value) -> None:
+        # Set value without running callbacks
         super().__setitem__(key, value)
+        self._version += 1
 
-        if key in self.callbacks:
-            for callback in self.callbacks[key]:
-                changes = callback(self)
-                self.update(changes) # Merge in changes
-        
         if key == 'process_noise' or key == 'process_noise_dist':
             if callable(self['process_noise']):  # Provided a function
                 self.__m.apply_process_noise = types.MethodType(self['process_noise'], self.__m)
@@ -87,6 +287,9 @@ class PrognosticsModelParameters(UserDict):
                 if not all([key in self['process_noise'] for key in self.__m.states]):
                     raise ProgModelTypeError("Process noise must have every key in model.states")
 
+                # Cache as column vector for noise functions (to apply noise to all states at once)
+                self.__m._process_noise_std = np.array([[self['process_noise'][key]] for key in self.__m.states], dtype=np.float64)
+
         elif key == 'measurement_noise' or key == 'measurement_noise_dist':
             if callable(self['measurement_noise']):
                 self.__m.apply_measurement_noise = types.MethodType(self['measurement_noise'], self.__m)
@@ -115,6 +318,9 @@ class PrognosticsModelParameters(UserDict):
                 if not all([key in self['measurement_noise'] for key in self.__m.outputs]):
                     raise ProgModelTypeError("Measurement noise must have ever key in model.outputs")
 
+                # Cache as column vector for noise functions (to apply noise to all outputs at once)
+                self.__m._measurement_noise_std = np.array([[self['measurement_noise'][key]] for key in self.__m.outputs], dtype=np.float64)
+
     def register_derived_callback(self, key : str, callback : Callable) -> None:
         """Register a new callback for derived parameters
 
@@ -126,8 +332,24 @@ class PrognosticsModelParameters(UserDict):
             self.callbacks[key].append(callback)
         else:
             self.callbacks[key] = [callback]
+        self._callback_index = None
 
         # Run new callback
         if key in self:
-            updates = callback(self[key])
-            self.update(updates)
+            try:
+                self._run_callbacks([], [callback])
+                self._callback_order()  # Check for cycle
+            except ProgModelTypeError:
+                self.callbacks[key].remove(callback)
+                self._callback_index = None
+                raise
+
+
+def _equal(a, b) -> bool:
+    # If parameter values a and b are the same. Values that cannot be compared (e.g., arrays) are treated as different
+    if a is b:
+        return True
+    try:
+        return type(a) == type(b) and bool(a == b)
+    except (ValueError, TypeError):
+        return False
@@ -0,0 +1,171 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration.  All Rights Reserved.
+
+from time import perf_counter
+from typing import Callable
+import numpy as np
+
+
+class SimulationProfile():
+    """
+    Profile of a simulation: the cumulative wall time and number of calls for each phase of the simulation loop. Created by simulate_to_threshold when the `profile` option is set, and returned as `profile` attribute of the simulation results.
+
+    Phases:
+        | future_loading: Calls to the future loading equation
+        | next_state: Calls to model.next_state (or integration step, if an integration method is used)
+        | process_noise: Calls to model.apply_process_noise
+        | limits: Calls to model.apply_limits
+        | threshold_met: Calls to model.threshold_met
+        | save: Saving results (including calculating outputs and event states, if saved)
+
+    Args:
+        n_steps (int, optional): Number of steps for which per-step timings are kept (ring buffer of the most recent steps). Default is 0 (no per-step timings)
+
+    Attributes:
+        times (dict[str, float]): Cumulative wall time (s) for each phase
+        calls (dict[str, int]): Number of calls for each phase
+        total_time (float): Wall time of the simulation loop (s), including time not in any phase (e.g., progress bar)
+        n_steps (int): Number of steps simulated
+
+    Example:
+        | results = m.simulate_to_threshold(future_load, profile=True)
+        | print(results.profile)
+    """
+    PHASES = ('future_loading', 'next_state', 'process_noise', 'limits', 'threshold_met', 'save')
+
+    def __init__(self, n_steps : int = 0):
+        n_phases = len(self.PHASES)
+        self._times = [0.0]*n_phases
+        self._calls = [0]*n_phases
+        self._step = [0.0]*n_phases  # Time for each phase in current step
+        self._buffer = np.zeros((n_steps, n_phases + 1))  # Per-step timings (total, phases)
+        self._t = [0.0, 0.0]  # Simulation time of current step (time passed to future loading, dt)
+        self._buffer_t = np.zeros(n_steps)
+        self._step_start = None
+        self._start = None
+        self.total_time = 0.0
+        self.n_steps = 0
+
+    @property
+    def times(self) -> dict:
+        return dict(zip(self.PHASES, self._times))
+
+    @property
+    def calls(self) -> dict:
+        return dict(zip(self.PHASES, self._calls))
+
+    @property
+    def step_times(self) -> dict:
+        """
+        Per-step timings for the most recent steps (up to n_steps given at construction), oldest first
+
+        Returns:
+            dict[str, np.array]: Timings of the form {'t': simulation time at end of step, 'total': wall time of step, phase: wall time of phase in step}
+        """
+        size = len(self._buffer)
+        n = min(self.n_steps, size)
+        order = (np.arange(self.n_steps - n, self.n_steps) % size) if size > 0 else np.arange(0)
+        result = {'t': self._buffer_t[order], 'total': self._buffer[order, 0]}
+        for (i, phase) in enumerate(self.PHASES):
+            result[phase] = self._buffer[order, i+1]
+        return result
+
+    def timed(self, phase : str, fcn : Callable, end_step : bool = False) -> Callable:
+        """
+        Wrap function so calls are recorded in the profile
+
+        Args:
+            phase (str): Phase (one of PHASES)
+            fcn (Callable): Function to wrap
+            end_step (bool, optional): If True, each call ends a simulation step (i.e., the last call in the simulation loop)
+
+        Returns:
+            Callable: Wrapped function
+        """
+        i = self.PHASES.index(phase)
+        times = self._times
+        calls = self._calls
+        step = self._step
+        sim_t = self._t
+        end = self._end_step
+        if phase == 'future_loading':
+            def timed_fcn(t, *args, **kwargs):
+                sim_t[0] = t
+                start = perf_counter()
+                result = fcn(t, *args, **kwargs)
+                elapsed = perf_counter() - start
+                times[i] += elapsed
+                calls[i] += 1
+                step[i] += elapsed
+                return result
+        elif phase == 'next_state':
+            def timed_fcn(x, u, dt):
+                sim_t[1] = dt
+                start = perf_counter()
+                result = fcn(x, u, dt)
+                elapsed = perf_counter() - start
+                times[i] += elapsed
+                calls[i] += 1
+                step[i] += elapsed
+                return result
+        else:
+            def timed_fcn(*args, **kwargs):
+                start = perf_counter()
+                result = fcn(*args, **kwargs)
+                elapsed = perf_counter() - start
+                times[i] += elapsed
+                calls[i] += 1
+                step[i] += elapsed
+                if end_step:
+                    end()
+                return result
+        return timed_fcn
+
+    def next_state(self, next_state : Callable, apply_process_noise : Callable, apply_limits : Callable) -> Callable:
+        """
+        Build next state function for the simulation (next_state, then process noise, then limits), with each part recorded in the profile
+        """
+        next_state = self.timed('next_state', next_state)
+        apply_process_noise = self.timed('process_noise', apply_process_noise)
+        apply_limits = self.timed('limits', apply_limits)
+        def profiled_next_state(x, u, dt):
+            return apply_limits(apply_process_noise(next_state(x, u, dt), dt))
+        return profiled_next_state
+
+    def start(self) -> None:
+        """
+        Start of simulation loop
+        """
+        self._start = perf_counter()
+        self._step_start = self._start
+        for i in range(len(self._step)):
+            self._step[i] = 0.0
+
+    def stop(self) -> None:
+        """
+        End of simulation loop
+        """
+        self.total_time = perf_counter() - self._start
+
+    def _end_step(self) -> None:
+        now = perf_counter()
+        size = len(self._buffer)
+        if size > 0:
+            row = self.n_steps % size
+            self._buffer[row, 0] = now - self._step_start
+            self._buffer[row, 1:] = self._step
+            self._buffer_t[row] = self._t[0] + self._t[1]/2
+        for i in range(len(self._step)):
+            self._step[i] = 0.0
+        self._step_start = now
+        self.n_steps += 1
+
+    def __str__(self) -> str:
+        lines = ['{:<16}{:>10}{:>14}{:>14}{:>8}'.format('phase', 'calls', 'time (s)', 'per call (us)', '%')]
+        for (phase, time, calls) in zip(self.PHASES, self._times, self._calls):
+            lines.append('{:<16}{:>10}{:>14.6f}{:>14.2f}{:>8.1f}'.format(
+                phase, calls, time, 1e6*time/calls if calls else 0, 100*time/self.total_time if self.total_time else 0))
+        other = self.total_time - sum(self._times)
+        lines.append('{:<16}{:>10}{:>14.6f}{:>14}{:>8.1f}'.format('other', '', other, '', 100*other/self.total_time if self.total_time else 0))
+        lines.append('{:<16}{:>10}{:>14.6f}'.format('total', self.n_steps, self.total_time))
+        return '\n'.join(lines)
@@ -11,6 +11,7 @@ from .test_tutorials import main as tutorials_main
 from .test_datasets import main as datasets_main
 from .test_powertrain import main as powertrain_main
 from .test_surrogates import main as surrogates_main
+from .test_loading import main as loading_main
 
 from io import StringIO
 import sys
@@ -96,5 +97,10 @@ if __name__ == '__main__':
     except Exception:
         was_successful = False
 
+    try:
+        loading_main()
+    except Exception:
+        was_successful = False
+
     if not was_successful:
         raise Exception("Failed test")
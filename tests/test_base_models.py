@@ -3,10 +3,14 @@
 import io
 import sys
 import unittest
+import warnings
 import numpy as np
 from prog_models import *
 from prog_models.models import *
 from copy import deepcopy
+from prog_models.exceptions import ProgModelIntegrationWarning, ProgModelStateLimitWarning
+from prog_models.utils.integration import BackwardEuler, Integrator, RK45
+from prog_models.utils.parameters import PrognosticsModelParameters
 
 
 class MockModel():
@@ -66,6 +70,30 @@ class MockModelWithDerived(MockProgModel):
             'p2': [derived_callback2, derived_callback3]
         }
 
+class MockDxModel(prognostics_model.PrognosticsModel):
+    # Exponential decay (dx = -k*x), which has the exact solution x = x0*exp(-k*t)
+    is_vectorized = True
+    states = ['x']
+    inputs = []
+    outputs = ['x']
+    default_parameters = {
+        'k': 1.0,
+        'process_noise': 0.0
+    }
+
+    def initialize(self, u = None, z = None):
+        return self.StateContainer({'x': 1.0})
+
+    def dx(self, x, u):
+        return self.StateContainer({'x': -self.parameters['k']*x['x']})
+
+    def output(self, x):
+        return self.OutputContainer({'x': x['x']})
+
+def mock_load(t, x = None):
+    # Defined at module level so it can be sent to worker processes
+    return {'i1': 1, 'i2': 2.1}
+
 
 class TestModels(unittest.TestCase):
     def test_templates(self):
@@ -91,6 +119,151 @@ class TestModels(unittest.TestCase):
         self.assertAlmostEqual(m.parameters['p3'], 5, 5)
         self.assertAlmostEqual(m.parameters['p4'], -10, 5)
 
+    def test_derived_batch_update(self):
+        calls = []
+        def sum_callback(params):
+            calls.append('sum')
+            return {'sum': params['p1'] + params['p2']}
+        def double_callback(params):
+            calls.append('double')
+            return {'double': 2*params['sum']}
+        def sign_callback(params):
+            calls.append('sign')
+            return {'sign': float(np.sign(params['p1']))}
+
+        class MockModelWithChain(MockProgModel):
+            # Registered out of order (double depends on sum)
+            param_callbacks = {
+                'sum': [double_callback],
+                'p1': [sum_callback, sign_callback],
+                'p2': [sum_callback]
+            }
+        m = MockModelWithChain(p2 = 1)
+        self.assertEqual(m.parameters['double'], 2*(m.parameters['p1'] + 1))
+
+        # Each callback run once, after its inputs are set
+        calls.clear()
+        with m.parameters.batch_update():
+            m.parameters['p1'] = 2
+            m.parameters['p2'] = 3
+            self.assertNotEqual(m.parameters['sum'], 5)  # Not yet updated
+        self.assertEqual(m.parameters['sum'], 5)
+        self.assertEqual(m.parameters['double'], 10)
+        self.assertEqual(m.parameters['sign'], 1)
+        self.assertEqual(sorted(calls), ['double', 'sign', 'sum'])
+        self.assertLess(calls.index('sum'), calls.index('double'))
+
+        # Derived value unchanged- dependent callbacks not run
+        calls.clear()
+        m.parameters['p2'] = 3
+        self.assertEqual(calls, ['sum'])
+
+        # Nested
+        calls.clear()
+        with m.parameters.batch_update():
+            with m.parameters.batch_update():
+                m.parameters['p1'] = -1
+            m.parameters['p2'] = 1
+        self.assertEqual(m.parameters['double'], 0)
+        self.assertEqual(m.parameters['sign'], -1)
+        self.assertEqual(calls.count('sum'), 1)
+
+        # New callback
+        m.parameters.register_derived_callback('double', lambda params: {'half': params['double']/2})
+        m.parameters['p2'] = 3
+        self.assertEqual(m.parameters['half'], 2)
+
+    def test_derived_lazy(self):
+        calls = []
+        def sum_callback(params):
+            calls.append('sum')
+            return {'sum': params['p1'] + params['p2']}
+        def double_callback(params):
+            calls.append('double')
+            return {'double': 2*params['sum']}
+
+        class MockModelWithChain(MockProgModel):
+            param_callbacks = {
+                'sum': [double_callback],
+                'p1': [sum_callback],
+                'p2': [sum_callback]
+            }
+        m = MockModelWithChain(p2 = 1)
+        self.assertEqual(m.parameters.dependency_graph(), {'sum': ['double'], 'p1': ['sum'], 'p2': ['sum']})
+
+        # Calculated when read
+        m.parameters.lazy = True
+        calls.clear()
+        for p1 in range(10):
+            m.parameters['p1'] = p1
+        self.assertEqual(calls, [])
+        self.assertEqual(m.parameters['double'], 20)  # Inputs (sum) calculated first
+        self.assertEqual(calls, ['double', 'sum'])
+        self.assertEqual(m.parameters['sum'], 10)
+        self.assertEqual(len(calls), 2)  # Not calculated again
+
+        # Only what is read
+        calls.clear()
+        m.parameters['p2'] = 2
+        self.assertEqual(m.parameters['sum'], 11)
+        self.assertEqual(calls, ['sum'])
+        m.parameters.lazy = False  # Calculates the rest
+        self.assertEqual(calls, ['sum', 'double'])
+        self.assertEqual(m.parameters['double'], 22)
+
+        # Same as eager, for a model with many derived parameters
+        m = BatteryElectroChemEOD()
+        m_lazy = BatteryElectroChemEOD()
+        m_lazy.parameters.lazy = True
+        for params in [m.parameters, m_lazy.parameters]:
+            params['qMobile'] = 7500
+            params['VolSFraction'] = 0.2
+            with params.batch_update():
+                params['xnMax'] = 0.55
+                params['xpMin'] = 0.45
+        self.assertEqual(dict(m_lazy.parameters), dict(m.parameters))
+        m_copy = deepcopy(m_lazy)
+        m_lazy.parameters['qMobile'] = 7600
+        self.assertEqual(m_copy.parameters['qpMin'], m.parameters['qpMin'])
+
+        # Cycle
+        def cycle_callback(params):
+            return {'p1': params['double']/2}
+        m = MockModelWithChain(p2 = 1)
+        with self.assertRaises(ProgModelTypeError):
+            m.parameters.register_derived_callback('double', cycle_callback)
+        self.assertNotIn(cycle_callback, m.parameters.callbacks['double'])
+        class MockModelWithCycle(MockModelWithChain):
+            param_callbacks = {
+                'sum': [double_callback],
+                'p1': [sum_callback],
+                'double': [cycle_callback]
+            }
+        with self.assertRaises(ProgModelTypeError):
+            MockModelWithCycle(p2 = 1)
+
+    def test_parameters_in_simulation(self):
+        # Model parameters are not replaced during simulation
+        types = set()
+        class CheckedThrownObject(ThrownObject):
+            def next_state(self, x, u, dt):
+                types.add(type(self.parameters))
+                return super().next_state(x, u, dt)
+        m = CheckedThrownObject()
+        m.simulate_to_threshold(lambda t, x = None: {}, threshold_keys = 'impact', dt = 0.1)
+        self.assertEqual(types, {PrognosticsModelParameters})
+
+        # Parameters changed by model equations
+        class ChangingThrownObject(ThrownObject):
+            def next_state(self, x, u, dt):
+                with self.parameters.batch_update():
+                    self.parameters['m'] = self.parameters['m']*2
+                return super().next_state(x, u, dt)
+        m = ChangingThrownObject()
+        m.simulate_to(1, lambda t, x = None: {}, dt = 0.25)
+        self.assertEqual(m.parameters['m'], 0.145*16)
+        self.assertAlmostEqual(m.parameters['lumped_param'], ThrownObject(m = 0.145*16).parameters['lumped_param'])
+
     def test_broken_models(self):
 
 
@@ -270,6 +443,46 @@ class TestModels(unittest.TestCase):
     def test_measurement_noise(self):
         self.__noise_test('measurement_noise', 'measurement_noise_dist', MockProgModel.outputs)
 
+    def test_noise_containers(self):
+        # Noise applied to all keys (and samples) of a container at once
+        n = 20000
+        for dist, std_ratio in [('normal', 1), ('uniform', 1/np.sqrt(3)), ('triangular', 1/np.sqrt(6))]:
+            m = ThrownObject(process_noise = {'x': 2, 'v': 0}, process_noise_dist = dist, measurement_noise = 0.5, measurement_noise_dist = dist)
+            x = m.StateContainer({'x': np.zeros(n), 'v': np.ones(n)})
+            x = m.apply_process_noise(x, 0.5)
+            self.assertEqual(x.matrix.shape, (2, n))
+            self.assertAlmostEqual(np.mean(x['x']), 0, delta = 0.05)
+            self.assertAlmostEqual(np.std(x['x']), 0.5*2*std_ratio, delta = 0.05)
+            self.assertTrue(np.all(x['v'] == 1))  # No noise
+
+            z = m.apply_measurement_noise(m.OutputContainer({'x': np.zeros(n)}))
+            self.assertAlmostEqual(np.std(z['x']), 0.5*std_ratio, delta = 0.05)
+
+            # Single sample
+            x = m.apply_process_noise(m.StateContainer({'x': 1, 'v': 2}))
+            self.assertEqual(x.matrix.shape, (2, 1))
+            self.assertEqual(x['v'], 2)
+
+            # Dictionary
+            x = m.apply_process_noise({'x': 1, 'v': 2})
+            self.assertEqual(x['v'], 2)
+            self.assertNotEqual(x['x'], 1)
+
+        # Container passed in is not changed
+        x = m.StateContainer({'x': 1, 'v': 2})
+        x_noisy = m.apply_process_noise(x)
+        self.assertIsNot(x_noisy, x)
+        self.assertEqual(x['x'], 1)
+        z = m.OutputContainer({'x': 1})
+        m.apply_measurement_noise(z)
+        self.assertEqual(z['x'], 1)
+
+        # Noise updated when parameter is set
+        m.parameters['process_noise'] = {'x': 0, 'v': 1}
+        x = m.apply_process_noise(m.StateContainer({'x': np.zeros(n), 'v': np.zeros(n)}))
+        self.assertTrue(np.all(x['x'] == 0))
+        self.assertGreater(np.std(x['v']), 0.1)
+
     def test_prog_model(self):
         m = MockProgModel() # Should work- sets default
         m = MockProgModel(process_noise = 0.0)
@@ -525,8 +738,7 @@ class TestModels(unittest.TestCase):
     def test_pickle(self):
         m = MockProgModel(p1 = 1.3)
         import pickle
-        pickle.dump(m, open('model_test.pkl', 'wb'))
-        m2 = pickle.load(open('model_test.pkl', 'rb'))
+        m2 = pickle.loads(pickle.dumps(m))  # In memory- no file left behind
         isinstance(m2, MockProgModel)
         self.assertEqual(m.parameters['p1'], m2.parameters['p1'])
         self.assertEqual(m, m2)
@@ -729,6 +941,275 @@ class TestModels(unittest.TestCase):
         for xa, xa0 in zip(x['a'], a):
             self.assertAlmostEqual(xa, xa0+dt)
 
+    def test_batch_simulate_to_threshold(self):
+        m = ThrownObject(process_noise = 0)
+        def load(t, x=None):
+            return m.InputContainer({})
+        x0 = {'x': np.array([1.75, 1.8, 1.85, 1.9]), 'v': np.array([35, 39, 22, 47])}
+        (times_of_event, results) = m.batch_simulate_to_threshold(load, x = x0, threshold_keys = 'impact', dt = 0.1, save_freq = 1)
+        self.assertEqual(len(times_of_event), 4)
+        self.assertEqual(len(results), 4)
+
+        # Each sample should match the result of simulating it individually
+        for i in range(4):
+            x0_i = {'x': x0['x'][i], 'v': x0['v'][i]}
+            result = m.simulate_to_threshold(load, x = x0_i, threshold_keys = 'impact', dt = 0.1, save_freq = 1)
+            self.assertAlmostEqual(times_of_event[i], result.times[-1])
+            self.assertEqual(len(results[i].times), len(result.times))
+            for t_b, t in zip(results[i].times, result.times):
+                self.assertAlmostEqual(t_b, t)
+            self.assertAlmostEqual(results[i].states[-1]['x'], result.states[-1]['x'])
+            self.assertAlmostEqual(results[i].outputs[-1]['x'], result.outputs[-1]['x'])
+            self.assertAlmostEqual(results[i].event_states[-1]['impact'], 0)
+
+        # Finished samples do not apply process noise or state limits
+        m_limited = ThrownObject(process_noise = 0)
+        m_limited.state_limits = {'x': (0, np.inf)}
+        with warnings.catch_warnings(record = True) as w:
+            warnings.simplefilter('always')
+            (times_of_event, results) = m_limited.batch_simulate_to_threshold(load, x = x0, threshold_keys = 'impact', dt = 0.1)
+        limit_warnings = [str(warning.message) for warning in w if issubclass(warning.category, ProgModelStateLimitWarning)]
+        self.assertEqual(limit_warnings, ['State limits applied during simulation: x limited to 0.0 (4 times)'])  # Once for each sample, at impact
+
+        # Repeated initial state
+        (times_of_event, results) = m.batch_simulate_to_threshold(load, n_samples = 3, threshold_keys = 'falling', dt = 0.1)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(np.all(times_of_event == times_of_event[0]))
+
+        # Horizon reached before threshold
+        (times_of_event, results) = m.batch_simulate_to_threshold(load, x = x0, threshold_keys = 'impact', dt = 0.1, horizon = 5)
+        self.assertTrue(np.isnan(times_of_event[0]))
+        self.assertAlmostEqual(times_of_event[2], 4.6)
+        self.assertGreaterEqual(results[0].times[-1], 5)
+
+        # Bad configuration
+        with self.assertRaises(ProgModelInputException):
+            m.batch_simulate_to_threshold(load)  # Missing n_samples
+        with self.assertRaises(ProgModelInputException):
+            m.batch_simulate_to_threshold(load, x = x0, n_samples = 2)  # Mismatch
+        with self.assertRaises(ProgModelInputException):
+            m.batch_simulate_to_threshold(load, x = x0, threshold_keys = 'not_an_event')
+        with self.assertRaises(ProgModelTypeError):
+            MockProgModel().batch_simulate_to_threshold(load, n_samples = 2)  # Not vectorized
+
+    def test_simulate_many(self):
+        m = MockProgModel(process_noise = 0.0)
+        jobs = [
+            (mock_load, ),
+            (mock_load, {'x0': {'a': 2, 'b': 5, 'c': -3.2, 't': 0}}),
+            (mock_load, None, {'a': 3, 'b': 5, 'c': -3.2, 't': 3}),
+            (mock_load, {'x0': {'a': 4, 'b': 5, 'c': -3.2, 't': 1}})]
+        config = {'dt': 0.5, 'save_freq': 1.0, 'threshold_keys': ['e1']}
+        for max_workers in [1, 2]:
+            results = m.simulate_many(jobs, max_workers = max_workers, **config)
+            self.assertEqual(len(results), len(jobs))
+
+            # Results in job order, same as simulating each individually
+            for job, result in zip(jobs, results):
+                m2 = deepcopy(m)
+                if len(job) > 1 and job[1] is not None:
+                    m2.parameters.update(job[1])
+                config2 = deepcopy(config)
+                if len(job) > 2:
+                    config2['x'] = job[2]
+                expected = m2.simulate_to_threshold(mock_load, **config2)
+                self.assertListEqual(result.times, expected.times)
+                self.assertEqual(result.states[-1], expected.states[-1])
+                self.assertEqual(result.outputs[-1], expected.outputs[-1])
+            self.assertEqual(results[1].states[0]['a'], 2)
+            self.assertEqual(results[2].times[-1], 2)  # Initial state t is 3
+
+        # Model is unchanged
+        self.assertEqual(m.parameters['x0']['a'], 1)
+
+        # Nested serial simulations (e.g., in a load function) do not share state
+        m_inner = ThrownObject()
+        def nested_load(t, x=None):
+            m_inner.simulate_many([(lambda t, x=None: m_inner.InputContainer({}), )], max_workers = 1, dt = 1, threshold_keys = 'impact')
+            return mock_load(t, x)
+        expected = m.simulate_to_threshold(mock_load, **config)
+        for result in m.simulate_many([(nested_load, )]*2, max_workers = 1, **config):
+            self.assertListEqual(result.times, expected.times)
+
+        # Chunking
+        results = m.simulate_many(jobs*3, max_workers = 2, chunksize = 5, **config)
+        self.assertEqual(len(results), 12)
+        self.assertEqual(results[5].states[0]['a'], 2)
+
+        self.assertListEqual(m.simulate_many([]), [])
+
+        # Bad input
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_many([(1, )])
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_many([(mock_load, 'not a dict')])
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_many(jobs, max_workers = 0)
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_many(jobs, chunksize = -1)
+
+    def test_integration_methods(self):
+        m = MockDxModel()
+        def load(t, x=None):
+            return m.InputContainer({})
+        errors = {}
+        for method in [None, 'euler', 'rk4', 'rk45', 'implicit']:
+            result = m.simulate_to(2, load, dt = 0.25, save_freq = 0.25, integration_method = method)
+            self.assertAlmostEqual(result.times[-1], 2)
+            errors[method] = abs(result.states[-1]['x'] - np.exp(-2))
+        self.assertEqual(errors[None], errors['euler'])
+        self.assertLess(errors['rk4'], errors['euler']/100)
+        self.assertLess(errors['rk45'], 1e-3)
+        self.assertLess(errors['implicit'], 0.05)
+
+        # Adaptive: dt is maximum step size
+        result = m.simulate_to(10, load, dt = 5, save_freq = 1e-3, integration_method = 'rk45', integration_rtol = 1e-6)
+        self.assertGreater(len(result.times), 5)  # Step size reduced to meet tolerance
+        self.assertLessEqual(max(np.diff(result.times)), 5)
+        for (t, x) in zip(result.times, result.states):
+            self.assertAlmostEqual(x['x'], np.exp(-t), delta = 1e-5)
+
+        # Stiff- explicit methods are unstable at this step size
+        m.parameters['k'] = 1000
+        result = m.simulate_to(1, load, dt = 0.01, integration_method = 'implicit')
+        self.assertAlmostEqual(result.states[-1]['x'], 0, delta = 1e-6)
+        result = m.simulate_to(1, load, dt = 0.01, integration_method = 'euler')
+        self.assertGreater(abs(result.states[-1]['x']), 1e6)
+
+        # Warn when tolerance cannot be met
+        class RK45NoRetry(RK45):
+            MIN_STEP = 1  # Every step at minimum step size
+        with self.assertWarns(ProgModelIntegrationWarning):
+            RK45NoRetry(m).step({'x': 1.0}, load(0), 0.01)
+        class BackwardEulerOneIteration(BackwardEuler):
+            MAX_ITER = 1
+        with self.assertWarns(ProgModelIntegrationWarning):
+            BackwardEulerOneIteration(m).step({'x': 1.0}, load(0), 0.01)
+        with self.assertRaises(TypeError):
+            # Abstract
+            Integrator(m)
+
+        # Vectorized
+        m.parameters['k'] = 1
+        x0 = {'x': np.array([1.0, 2.0, 3.0])}
+        for method in ['rk4', 'rk45', 'implicit']:
+            result = m.simulate_to(2, load, x = x0, dt = 0.25, integration_method = method)
+            for x, x0_i in zip(result.states[-1]['x'], x0['x']):
+                self.assertAlmostEqual(x, x0_i*np.exp(-2), delta = 0.05*x0_i)
+
+        # Bad configuration
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_to(2, load, integration_method = 'not_a_method')
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_to(2, load, integration_method = 'rk45', integration_rtol = -1)
+        with self.assertRaises(ProgModelInputException):
+            # No dx
+            MockProgModel().simulate_to(2, mock_load, integration_method = 'rk4')
+
+    def test_rng(self):
+        m = ThrownObject(process_noise = 0.5, measurement_noise = 0.1)
+        def load(t, x=None):
+            return m.InputContainer({})
+        config = {'dt': 0.1, 'save_freq': 1, 'threshold_keys': 'impact'}
+
+        # Same seed, same result
+        result1 = m.simulate_to_threshold(load, rng = 42, **config)
+        result2 = m.simulate_to_threshold(load, rng = 42, **config)
+        self.assertEqual(result1.states, result2.states)
+        self.assertEqual(result1.outputs, result2.outputs)
+        self.assertIs(m.rng, np.random)  # Model not changed
+
+        # Generator
+        result2 = m.simulate_to_threshold(load, rng = np.random.default_rng(42), **config)
+        self.assertEqual(result1.states, result2.states)
+        result2 = m.simulate_to_threshold(load, rng = 43, **config)
+        self.assertNotEqual(result1.states, result2.states)
+
+        # Custom noise function accepting rng
+        def process_noise(self, x, dt = 1, rng = None):
+            rng = self.rng if rng is None else rng
+            return self.StateContainer({key: x[key] + dt*rng.normal(0, 0.5) for key in self.states})
+        m_custom = ThrownObject(process_noise = process_noise, measurement_noise = 0)
+        result1 = m_custom.simulate_to_threshold(load, rng = 42, **config)
+        result2 = m_custom.simulate_to_threshold(load, rng = 42, **config)
+        self.assertEqual(result1.states, result2.states)
+        result1 = m.simulate_to_threshold(load, rng = 42, **config)
+
+        # Set on model
+        m.rng = np.random.default_rng(42)
+        result2 = m.simulate_to_threshold(load, **config)
+        self.assertEqual(result1.states, result2.states)
+
+        # Copied with model
+        import pickle
+        m.rng = np.random.default_rng(42)
+        for m2 in [deepcopy(m), pickle.loads(pickle.dumps(m))]:
+            self.assertIsInstance(m2.rng, np.random.Generator)
+            self.assertIsNot(m2.rng, m.rng)
+            result2 = m2.simulate_to_threshold(load, **config)
+            self.assertEqual(result1.states, result2.states)
+
+        # Global state
+        m.rng = np.random
+        np.random.seed(42)
+        result1 = m.simulate_to_threshold(load, **config)
+        np.random.seed(42)
+        result2 = m.simulate_to_threshold(load, **config)
+        self.assertEqual(result1.states, result2.states)
+
+        # simulate_many: Independent stream per job, reproducible for any number of workers
+        jobs = [(mock_load, )]*3
+        m = MockProgModel(process_noise = 0.1)
+        results1 = m.simulate_many(jobs, max_workers = 1, rng = 7, dt = 0.5)
+        results2 = m.simulate_many(jobs, max_workers = 2, rng = 7, dt = 0.5)
+        for result1, result2 in zip(results1, results2):
+            self.assertEqual(result1.states, result2.states)
+        self.assertNotEqual(results1[0].states, results1[1].states)
+
+    def test_profile(self):
+        m = MockProgModel(process_noise = 0.0)
+        def load(t, x=None):
+            return {'i1': 1, 'i2': 2.1}
+
+        # Not profiled by default
+        result = m.simulate_to(10, load, {'o1': 0.8}, dt = 0.5)
+        self.assertIsNone(result.profile)
+
+        result = m.simulate_to(10, load, {'o1': 0.8}, dt = 0.5, save_freq = 1, profile = True)
+        profile = result.profile
+        self.assertEqual(profile.n_steps, 20)
+        self.assertEqual(profile.calls['future_loading'], 21)  # Including first
+        for phase in ['next_state', 'process_noise', 'limits', 'threshold_met']:
+            self.assertEqual(profile.calls[phase], 20)
+        self.assertEqual(profile.calls['save'], len(result.times))
+        self.assertGreater(profile.total_time, 0)
+        self.assertLessEqual(sum(profile.times.values()), profile.total_time)
+        self.assertEqual(len(profile.step_times['total']), 0)  # Step timings not kept
+        str(profile)
+
+        # Results unchanged (can still be unpacked)
+        (times, inputs, states, outputs, event_states) = result
+        self.assertEqual(times, m.simulate_to(10, load, {'o1': 0.8}, dt = 0.5, save_freq = 1).times)
+
+        # Ring buffer of step timings
+        result = m.simulate_to(10, load, {'o1': 0.8}, dt = 0.5, profile = 5)
+        step_times = result.profile.step_times
+        self.assertListEqual(list(step_times['t']), [8, 8.5, 9, 9.5, 10])
+        for phase in ['total'] + list(result.profile.PHASES):
+            self.assertEqual(len(step_times[phase]), 5)
+        self.assertTrue(all(step_times['total'] >= step_times['next_state']))
+
+        # Integration method
+        m = MockDxModel(process_noise = 0)
+        result = m.simulate_to(1, mock_load, dt = 0.1, integration_method = 'rk4', profile = True)
+        self.assertEqual(result.profile.calls['next_state'], 10)
+
+        # Invalid
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_to(1, mock_load, profile = -1)
+        with self.assertRaises(ProgModelInputException):
+            m.simulate_to(1, mock_load, profile = 'yes')
+
     def test_sim_prog_inproper_config(self):
         m = MockProgModel(process_noise = 0.0)
         def load(t, x=None):
@@ -893,6 +1374,190 @@ class TestModels(unittest.TestCase):
         except Exception:
             pass
 
+    def test_state_limits_vectorized(self):
+        m = ThrownObject(process_noise = 0)
+        m.state_limits = {'x': (0, 50)}
+
+        # Every sample limited at once
+        x = m.StateContainer({'x': np.array([-1, 10, 60]), 'v': np.array([1, 2, 3])})
+        with self.assertWarns(ProgModelStateLimitWarning):
+            x = m.apply_limits(x)
+        np.testing.assert_array_equal(x['x'], [0, 10, 50])
+        np.testing.assert_array_equal(x['v'], [1, 2, 3])
+
+        # Limits changed after first use
+        m.state_limits['x'] = (0, 20)
+        x = m.apply_limits(x)
+        np.testing.assert_array_equal(x['x'], [0, 10, 20])
+
+        # Single warning for simulation (instead of one per step)
+        def load(t, x=None):
+            return m.InputContainer({})
+        with warnings.catch_warnings(record = True) as w:
+            warnings.simplefilter('always')
+            result = m.simulate_to(5, load, dt = 0.5, save_freq = 0.5)
+        limit_warnings = [warning for warning in w if issubclass(warning.category, ProgModelStateLimitWarning)]
+        self.assertEqual(len(limit_warnings), 1)
+        self.assertIn('x limited to 20.0', str(limit_warnings[0].message))
+        self.assertLessEqual(max(x['x'] for x in result.states), 20)
+
+        # Vectorized simulation
+        x0 = m.StateContainer({'x': np.array([1.83, 1.83]), 'v': np.array([40, 10])})
+        with warnings.catch_warnings(record = True) as w:
+            warnings.simplefilter('always')
+            result = m.simulate_to(5, load, dt = 0.5, save_freq = 0.5, x = x0)
+        self.assertEqual(len([warning for warning in w if issubclass(warning.category, ProgModelStateLimitWarning)]), 1)
+        self.assertTrue(all(np.all(x['x'] <= 20) for x in result.states))
+        self.assertFalse(np.all(result.states[-1]['x'] == 20))  # Second sample not limited
+
+    def test_next_state_inplace(self):
+        m = BatteryCircuit(process_noise = 0)
+        x = m.initialize()
+        x0 = deepcopy(x)
+        u = m.InputContainer({'i': 2})
+
+        # Default (dx) next_state_inplace writes into out, without changing x
+        out = m.StateContainer(x)
+        result = m.next_state_inplace(x, u, 0.1, out)
+        self.assertIs(result, out)
+        self.assertEqual(x, x0)
+        np.testing.assert_array_almost_equal(out.matrix, m.next_state(x, u, 0.1).matrix)
+
+        # out can be x
+        m.next_state_inplace(x, u, 0.1, x)
+        np.testing.assert_array_almost_equal(x.matrix, out.matrix)
+
+        # Discrete model- copied from next_state
+        m2 = ThrownObject(process_noise = 0)
+        x = m2.initialize()
+        out = m2.StateContainer(x)
+        m2.next_state_inplace(x, m2.InputContainer({}), 0.1, out)
+        self.assertEqual(out, m2.next_state(x, m2.InputContainer({}), 0.1))
+
+        # Simulation steps in place: saved states are independent copies and initial state is not changed
+        def load(t, x=None):
+            return u
+        x = m.initialize()
+        result = m.simulate_to(10, load, dt = 1, save_freq = 1, x = x)
+        self.assertEqual(x, x0)
+        self.assertEqual(len({id(state) for state in result.states}), len(result.states))
+        x_expected = x
+        for state in result.states[1:]:
+            x_expected = m.next_state(x_expected, u, 1)
+            np.testing.assert_array_almost_equal(state.matrix, x_expected.matrix)
+
+        # Same result if model does not step in place
+        class NotInPlace(BatteryCircuit):
+            def next_state(self, x, u, dt):
+                dx = self.dx(x, u)
+                return self.StateContainer({key: x[key] + dx[key]*dt for key in dx.keys()})
+        m3 = NotInPlace(process_noise = 0)
+        result3 = m3.simulate_to(10, load, dt = 1, save_freq = 1, x = x)
+        for (state, state3) in zip(result.states, result3.states):
+            np.testing.assert_array_almost_equal(state.matrix, state3.matrix)
+
+        # Batch simulation
+        x = m.StateContainer({key: np.array([value, value]) for key, value in x0.items()})
+        (_, results) = m.batch_simulate_to_threshold(load, x = x, dt = 1, save_freq = 1, horizon = 10)
+        np.testing.assert_array_almost_equal(results[0].states[-1].matrix, result.states[-1].matrix)
+        np.testing.assert_array_equal(x['tb'], [x0['tb'], x0['tb']])
+
+    def test_calc_error_batch(self):
+        times = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+        inputs = [{}]*9
+        outputs = [{'x': x} for x in [1.83, 36.95, 62.36, 77.81, 83.45, 79.28, 65.3, 41.51, 7.91]]
+        keys = ['thrower_height', 'throwing_speed']
+        candidates = [[1.83, 40], [20, 40], [1, 45]]
+
+        # Vectorized model- same as calc_error for each candidate
+        m = ThrownObject()
+        errors = m.calc_error_batch(times, inputs, outputs, keys, candidates, dt = 0.1)
+        self.assertEqual(errors.shape, (3,))
+        for (candidate, error) in zip(candidates, errors):
+            m2 = ThrownObject(thrower_height = candidate[0], throwing_speed = candidate[1])
+            self.assertAlmostEqual(error, m2.calc_error(times, inputs, outputs, dt = 0.1))
+        self.assertEqual(m.parameters['thrower_height'], 1.83)  # Restored
+        self.assertEqual(m.parameters['throwing_speed'], 40)
+        self.assertAlmostEqual(m.calc_error_batch(times, inputs, outputs, keys, [20, 40], dt = 0.1)[0], errors[1])
+
+        # Not vectorized- one at a time
+        m.is_vectorized = False
+        np.testing.assert_array_almost_equal(m.calc_error_batch(times, inputs, outputs, keys, candidates, dt = 0.1), errors)
+
+        with self.assertRaises(ProgModelInputException):
+            m.calc_error_batch(times, inputs, outputs, keys, [[1, 2, 3]])
+
+    def test_estimate_params(self):
+        times = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+        inputs = [{}]*9
+        outputs = [{'x': x} for x in [1.83, 36.95, 62.36, 77.81, 83.45, 79.28, 65.3, 41.51, 7.91]]
+        runs = [(times, inputs, outputs)]*3
+        keys = ['thrower_height', 'throwing_speed']
+
+        m = ThrownObject(thrower_height = 20, process_noise = 0.5)
+        error = m.calc_error(times, inputs, outputs, dt = 0.1)
+        result = m.estimate_params(runs, keys, dt = 0.1, options = {'xatol': 1e-8, 'maxiter': 50})
+        self.assertEqual(list(result.x), [m.parameters[key] for key in keys])
+        self.assertLess(m.calc_error(times, inputs, outputs, dt = 0.1), error)
+        self.assertEqual(m.parameters['process_noise'], {'x': 0.5, 'v': 0.5})  # Noise restored
+
+        # Runs in parallel- same result
+        for parallel in ['process', 'thread']:
+            m2 = ThrownObject(thrower_height = 20)
+            result2 = m2.estimate_params(runs, keys, dt = 0.1, options = {'xatol': 1e-8, 'maxiter': 50}, workers = 2, parallel = parallel)
+            np.testing.assert_array_almost_equal(result2.x, result.x)
+
+        # Warm start from previous result
+        m2 = ThrownObject(thrower_height = 20)
+        result2 = m2.estimate_params(runs, keys, dt = 0.1, options = {'xatol': 1e-8, 'maxiter': 10}, warm_start = result)
+        self.assertLessEqual(result2.fun, result.fun)
+        m2 = ThrownObject()
+        result2 = m2.estimate_params(runs, keys, dt = 0.1, method = 'L-BFGS-B', warm_start = {'thrower_height': 1.8}, bounds = {'thrower_height': (0, 5), 'throwing_speed': (20, 60)})
+        self.assertTrue(0 <= m2.parameters['thrower_height'] <= 5)
+
+        # Custom (callable) method
+        from scipy.optimize import OptimizeResult
+        def keep_initial(fun, x0, args = (), **kwargs):
+            return OptimizeResult(x = x0, fun = fun(x0, *args), success = True, nfev = 1)
+        m2 = ThrownObject(thrower_height = 20)
+        result2 = m2.estimate_params(runs, keys, dt = 0.1, method = keep_initial)
+        self.assertEqual(list(result2.x), [20, m2.parameters['throwing_speed']])
+
+        # Gradient calculated in a batch- fewer evaluations
+        for workers in [1, 2]:
+            m2 = ThrownObject(thrower_height = 20)
+            result2 = m2.estimate_params(runs, keys, dt = 0.1, method = 'L-BFGS-B', jac = 'batch', workers = workers, parallel = 'thread')
+            np.testing.assert_array_almost_equal(result2.x, result.x, decimal = 3)
+            self.assertLess(result2.nfev, result.nfev)
+        m2 = ThrownObject(thrower_height = 20)
+        result2 = m2.estimate_params(runs, keys, dt = 0.1, method = 'L-BFGS-B', jac = 'batch', bounds = [(0, result.x[0]), (20, 60)])  # Solution on bound
+        self.assertAlmostEqual(result2.x[0], result.x[0], delta = 1e-3)
+
+        # Population-based
+        for workers in [1, 2]:
+            m2 = ThrownObject(thrower_height = 20)
+            result2 = m2.estimate_params(runs[:1], keys, dt = 0.1, method = 'differential_evolution', bounds = [(0, 30), (20, 60)], options = {'seed': 1, 'maxiter': 5, 'popsize': 5}, workers = workers)
+            self.assertLess(result2.fun, error)
+            self.assertEqual(list(result2.x), [m2.parameters[key] for key in keys])
+
+        # Population-based, vectorized- same result as evaluating candidates separately
+        for workers in [1, 2]:
+            m2 = ThrownObject(thrower_height = 20)
+            result3 = m2.estimate_params(runs[:1], keys, dt = 0.1, method = 'differential_evolution', bounds = [(0, 30), (20, 60)], options = {'seed': 1, 'maxiter': 5, 'popsize': 5}, workers = workers, vectorized = True, parallel = 'thread')
+            np.testing.assert_array_almost_equal(result3.x, result2.x)
+
+        # Bad configuration
+        with self.assertRaises(ProgModelInputException):
+            m.estimate_params(runs, keys, method = 'differential_evolution')  # No bounds
+        with self.assertRaises(ProgModelInputException):
+            m.estimate_params(runs, keys, bounds = [(0, 1)])
+        with self.assertRaises(ProgModelInputException):
+            m.estimate_params(runs, keys, workers = 0)
+        with self.assertRaises(ProgModelInputException):
+            m.estimate_params(runs, keys, parallel = 'gpu')
+        with self.assertRaises(ProgModelInputException):
+            m.estimate_params(runs, keys, warm_start = [1, 2, 3])
+
     def test_linear_model(self):
         class ThrownObject(LinearModel):
             inputs = [] 
@@ -1317,6 +1982,26 @@ class TestModels(unittest.TestCase):
         self.assertEqual(output_c1, output_c2)
         self.assertListEqual(list(output_c1.keys()), m.outputs)
 
+        # Key index is shared by containers of the same class
+        self.assertIs(c1._key_index, c2._key_index)
+        self.assertEqual(c1._key_index, {'x': 0, 'v': 1})
+        self.assertIn('v', c1)
+        self.assertNotIn('a', c1)
+        with self.assertRaises(KeyError):
+            c1['a']
+
+        # Changing keys of one container does not effect others
+        c1.update({'a': 2})
+        self.assertEqual(c1['a'], 2)
+        self.assertListEqual(list(c1.keys()), ['x', 'v', 'a'])
+        self.assertListEqual(list(c2.keys()), m.states)
+        self.assertNotIn('a', c2)
+        del c2['x']
+        self.assertEqual(c2['v'], 40)
+        self.assertListEqual(list(c2.keys()), ['v'])
+        self.assertListEqual(m.states, ['x', 'v'])
+        self.assertListEqual(list(m.StateContainer({'x': 1.7, 'v': 40}).keys()), ['x', 'v'])
+
     def test_thrown_object_drag(self):
         def future_load(t, x=None):
             return {}
@@ -1,5 +1,6 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
+import numpy as np
 import unittest
 
 from prog_models.models import BatteryCircuit, BatteryElectroChem, BatteryElectroChemEOL, BatteryElectroChemEOD, BatteryElectroChemEODEOL
@@ -56,6 +57,38 @@ class TestBattery(unittest.TestCase):
         outputs = named_results.outputs
         event_states = named_results.event_states
 
+    def test_jit(self):
+        # Kernels should match python implementation
+        for (batt, param) in [(BatteryCircuit(), 'Rs'), (BatteryElectroChemEOD(), 'VolSFraction'), (BatteryElectroChemEODEOL(), 'VolSFraction')]:
+            x = batt.initialize()
+            u = batt.InputContainer({'i': 2.5})
+            for _ in range(100):
+                x = batt.next_state(x, u, 1)
+            states = [x]
+            if batt.is_vectorized:
+                states.append(batt.StateContainer(np.hstack((x.matrix, x.matrix*1.01))))
+            for x_i in states:
+                batt.use_jit = True
+                dx_kernel = batt.dx(x_i, u)
+                batt.use_jit = False
+                dx_python = batt.dx(x_i, u)
+                self.assertEqual(dx_kernel.matrix.shape, dx_python.matrix.shape)
+                np.testing.assert_allclose(dx_kernel.matrix, dx_python.matrix, rtol=1e-12)
+
+            # Parameter change should be used by kernel
+            batt.use_jit = True
+            dx_before = batt.dx(x, u)
+            batt.parameters[param] *= 2
+            dx_after = batt.dx(x, u)
+            batt.use_jit = False
+            np.testing.assert_allclose(dx_after.matrix, batt.dx(x, u).matrix, rtol=1e-12)
+            self.assertFalse(np.allclose(dx_before.matrix, dx_after.matrix))
+
+            # Dict state - python implementation
+            batt.use_jit = True
+            dx_dict = batt.dx(dict(x.items()), {'i': 2.5})
+            np.testing.assert_allclose(dx_dict.matrix, batt.dx(x, u).matrix, rtol=1e-12)
+
 # This allows the module to be executed directly
 def run_tests():
     unittest.main()
@@ -1,6 +1,8 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
+import numpy as np
 import unittest
+import warnings
 from prog_models.models.centrifugal_pump import CentrifugalPump, CentrifugalPumpWithWear, CentrifugalPumpBase
 
 
@@ -237,6 +239,28 @@ class TestCentrifugalPump(unittest.TestCase):
         outputs = named_results.outputs
         event_states = named_results.event_states
 
+    def test_jit(self):
+        # Kernel should match python implementation
+        u = {'Tamb': 290, 'V': 471.2389, 'pdisch': 928654, 'psuc': 239179, 'wsync': 376.991}
+        for pump in [CentrifugalPumpBase(process_noise=0), CentrifugalPumpWithWear(process_noise=0)]:
+            u_i = pump.InputContainer(u)
+            x = pump.initialize(u_i)
+            with warnings.catch_warnings():
+                # Wear parameters overwritten warning
+                warnings.simplefilter('ignore')
+                for _ in range(100):
+                    x = pump.next_state(x, u_i, 1)
+                states = [x]
+                if type(pump) == CentrifugalPumpBase:
+                    states.append(pump.StateContainer(np.hstack((x.matrix, x.matrix*1.01))))
+                for x_i in states:
+                    pump.use_jit = True
+                    x_kernel = pump.next_state(x_i, u_i, 1)
+                    pump.use_jit = False
+                    x_python = pump.next_state(x_i, u_i, 1)
+                    self.assertEqual(x_kernel.matrix.shape, x_python.matrix.shape)
+                    np.testing.assert_allclose(x_kernel.matrix, x_python.matrix, rtol=1e-12)
+
 # This allows the module to be executed directly
 def run_tests():
     unittest.main()
@@ -9,7 +9,7 @@ class TestDatasets(unittest.TestCase):
         from prog_models.datasets import nasa_battery
         BAD_URL = "BADURLTEST"
         nasa_battery.urls = {'RW1':"https://"+BAD_URL}
-        with self.assertRaises(ConnectionError):
+        with self.assertRaises(ConnectionRefusedError):
             (desc, data) = nasa_battery.load_data(1)
     def test_nasa_cmapss_bad_url_download(self):
         from prog_models.datasets import nasa_cmapss
@@ -19,6 +19,193 @@ class TestDatasets(unittest.TestCase):
             (train, test, results) = nasa_cmapss.load_data(1)
     # Testing for successful download located in manual testing files; test_manual.py
 
+    def test_disk_cache(self):
+        import os
+        import tempfile
+        from prog_models.datasets import _cache, nasa_battery, nasa_cmapss, set_cache_dir
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # Local files standing in for the datasets
+            battery_zip = os.path.join(tmp, 'battery.zip')
+            _write_battery_zip(battery_zip, [('D', 'discharge 0'), ('D', 'discharge 1')])
+            cmapss_zip = os.path.join(tmp, 'cmapss.zip')
+            _write_cmapss_zip(cmapss_zip)
+
+            cache_dir_old = _cache._cache_dir
+            (urls_old, url_old) = (nasa_battery.urls, nasa_cmapss.URL)
+            try:
+                set_cache_dir(os.path.join(tmp, 'cache'))
+                nasa_battery.urls = {'RW1': 'file://' + battery_zip}
+                nasa_cmapss.URL = 'file://' + cmapss_zip
+                nasa_battery.clear_cache()
+                nasa_cmapss.clear_cache()
+
+                (desc, data) = nasa_battery.load_data(1)
+                self.assertEqual(desc['procedure'], 'procedure')
+                self.assertEqual([run['desc'] for run in desc['runs']], ['discharge 0', 'discharge 1'])
+                self.assertEqual(len(data), 2)
+                self.assertEqual(list(data[1].columns), ['relativeTime', 'current', 'voltage', 'temperature'])
+                self.assertEqual(list(data[1]['current']), [2, 2, 2, 2])
+                (test, train, rul) = nasa_cmapss.load_data(1)
+                self.assertEqual(len(train), 9)
+                self.assertEqual(list(test['unit']), [1]*4 + [2]*5)
+                self.assertEqual(list(rul), [10, 20])
+
+                # Source removed- loaded from disk cache (parsed data)
+                os.remove(battery_zip)
+                os.remove(cmapss_zip)
+                nasa_battery.clear_cache()
+                nasa_cmapss.clear_cache()
+                (desc2, data2) = nasa_battery.load_data('RW1')
+                self.assertEqual(desc2, desc)
+                for (run, run2) in zip(data, data2):
+                    self.assertTrue(run.equals(run2))
+                data2[0]['current'] *= 2  # Data can be changed
+                (test2, train2, rul2) = nasa_cmapss.load_data(1)
+                self.assertTrue(train2.equals(train))
+                self.assertTrue(test2.equals(test))
+
+                # Removing parsed data- parsed again from downloaded zip
+                for (root, dirs, _) in os.walk(os.path.join(tmp, 'cache')):
+                    if 'parsed' in dirs:
+                        import shutil
+                        shutil.rmtree(os.path.join(root, 'parsed'))
+                (desc2, data2) = nasa_battery.load_data(1)
+                self.assertEqual(desc2, desc)
+                (test2, train2, rul2) = nasa_cmapss.load_data(1)
+                self.assertTrue(train2.equals(train))
+
+                # Corrupted download- downloaded again (fails, source removed)
+                for (root, _, files) in os.walk(os.path.join(tmp, 'cache', 'nasa_battery')):
+                    if 'source.zip' in files:
+                        with open(os.path.join(root, 'source.zip'), 'ab') as f:
+                            f.write(b'0')
+                nasa_battery.clear_cache()
+                os.remove(os.path.join(tmp, 'cache', 'nasa_battery', os.listdir(os.path.join(tmp, 'cache', 'nasa_battery'))[0], 'parsed', 'RW1.json'))
+                with self.assertRaises(ConnectionRefusedError):
+                    nasa_battery.load_data(1)
+
+                # Clearing disk cache
+                nasa_cmapss.clear_cache(disk = True)
+                self.assertFalse(os.path.exists(os.path.join(tmp, 'cache', 'nasa_cmapss')))
+                with self.assertRaises(ConnectionError):
+                    nasa_cmapss.load_data(1)
+            finally:
+                _cache._cache_dir = cache_dir_old
+                (nasa_battery.urls, nasa_cmapss.URL) = (urls_old, url_old)
+                nasa_battery.clear_cache()
+                nasa_cmapss.clear_cache()
+
+    def test_battery_runs(self):
+        import os
+        import tempfile
+        from prog_models.datasets import _cache, nasa_battery, set_cache_dir
+
+        with tempfile.TemporaryDirectory() as tmp:
+            battery_zip = os.path.join(tmp, 'battery.zip')
+            _write_battery_zip(battery_zip, [('D', 'reference discharge'), ('C', 'charge'), ('D', 'discharge'), ('D', 'reference discharge')])
+
+            cache_dir_old = _cache._cache_dir
+            urls_old = nasa_battery.urls
+            try:
+                nasa_battery.urls = {'RW1': 'file://' + battery_zip}
+                set_cache_dir(None)
+                (desc, data) = nasa_battery.load_data(1)
+                for cache_dir in (None, os.path.join(tmp, 'cache'), os.path.join(tmp, 'cache')):
+                    # Not cached on disk, cached on disk (parsed), loaded from disk
+                    set_cache_dir(cache_dir)
+                    nasa_battery.clear_cache()
+                    runs = nasa_battery.load_runs(1)
+                    self.assertEqual(len(runs), 4)
+                    self.assertEqual(runs.desc, desc)
+                    for (run, run_data) in zip(runs, data):
+                        self.assertTrue(run.equals(run_data))
+                    self.assertTrue(runs[-1].equals(data[-1]))
+
+                    # Filtering
+                    reference = nasa_battery.load_runs('RW1', desc = 'reference discharge')
+                    self.assertEqual(reference.indices, [0, 3])
+                    self.assertEqual([run['desc'] for run in reference.desc['runs']], ['reference discharge']*2)
+                    self.assertTrue(reference[1].equals(data[3]))
+                    self.assertEqual(runs.filter(run_type = 'D').indices, [0, 2, 3])
+                    self.assertEqual(runs.filter(run_type = 'D').filter(desc = 'discharge').indices, [2])
+                    self.assertEqual(len(runs.filter(run_type = 'R')), 0)
+
+                # Runs decoded (and saved to disk cache) only when first used
+                set_cache_dir(os.path.join(tmp, 'cache2'))
+                nasa_battery.clear_cache()
+                def saved_runs():
+                    return sorted(name for (_, _, files) in os.walk(os.path.join(tmp, 'cache2')) for name in files if name.startswith('run'))
+                reference = nasa_battery.load_runs('RW1', desc = 'reference discharge')
+                self.assertEqual(saved_runs(), [])
+                self.assertTrue(reference[1].equals(data[3]))
+                self.assertEqual(saved_runs(), ['run3.npy'])
+                nasa_battery.clear_cache()
+                self.assertTrue(nasa_battery.load_runs('RW1')[3].equals(data[3]))  # From disk cache
+            finally:
+                _cache._cache_dir = cache_dir_old
+                nasa_battery.urls = urls_old
+                nasa_battery.clear_cache()
+
+    def test_cmapss_trajectories(self):
+        import os
+        import tempfile
+        import numpy as np
+        from prog_models.datasets import _cache, nasa_cmapss, set_cache_dir
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cmapss_zip = os.path.join(tmp, 'cmapss.zip')
+            _write_cmapss_zip(cmapss_zip)
+
+            cache_dir_old = _cache._cache_dir
+            url_old = nasa_cmapss.URL
+            try:
+                nasa_cmapss.URL = 'file://' + cmapss_zip
+                for cache_dir in (None, os.path.join(tmp, 'cache'), os.path.join(tmp, 'cache')):
+                    # Not cached on disk, cached on disk (parsed), loaded from disk
+                    set_cache_dir(cache_dir)
+                    nasa_cmapss.clear_cache()
+                    (test, train, rul) = nasa_cmapss.load_data(1)
+                    (test_units, train_units, rul2) = nasa_cmapss.load_trajectories(1)
+                    np.testing.assert_array_equal(rul, rul2)
+                    self.assertEqual(train_units.units, [1, 2])
+                    self.assertEqual(len(train_units), 2)
+                    self.assertEqual(train_units.bounds(2), (4, 9))
+                    np.testing.assert_array_equal(train_units[1], train[train['unit'] == 1].to_numpy())
+                    np.testing.assert_array_equal(train_units[2][:, 1], [2, 3, 4, 5, 6])
+                    self.assertEqual(train_units[2].shape, (5, 26))
+                    self.assertTrue(test_units.to_dataframe().equals(test))
+                    self.assertTrue(test_units.to_dataframe(2).equals(test[test['unit'] == 2].reset_index(drop = True)))
+                    self.assertEqual([(unit, len(x)) for (unit, x) in test_units], [(1, 4), (2, 5)])
+            finally:
+                _cache._cache_dir = cache_dir_old
+                nasa_cmapss.URL = url_old
+                nasa_cmapss.clear_cache()
+
+def _write_battery_zip(path, runs):
+    # Write zip file in the format of the nasa_battery dataset with battery RW1, with runs [(type, desc), ...]
+    import io
+    import zipfile
+    import numpy as np
+    from scipy.io import savemat
+    step = np.zeros((1, len(runs)), dtype=[(key, 'O') for key in ('type', 'comment', 'date', 'relativeTime', 'current', 'voltage', 'temperature')])
+    for (i, (run_type, desc)) in enumerate(runs):
+        step[0, i] = (run_type, desc, '01-Jan-2014', np.arange(3.0 + i), np.full(3 + i, 1.0 + i), np.full(3 + i, 4.2), np.full(3 + i, 25.0))
+    mat = io.BytesIO()
+    savemat(mat, {'data': {'procedure': 'procedure', 'description': 'description', 'step': step}})
+    with zipfile.ZipFile(path, 'w') as f:
+        f.writestr('battery/', '')
+        f.writestr('battery/Matlab/RW1.mat', mat.getvalue())
+
+def _write_cmapss_zip(path):
+    # Write zip file in the format of the nasa_cmapss dataset with dataset 1 (units 1 and 2, with 4 and 5 cycles)
+    import zipfile
+    with zipfile.ZipFile(path, 'w') as f:
+        for name in ('train', 'test'):
+            rows = [' '.join(str(float(unit if j == 0 else cycle + j)) for j in range(26)) + ' ' for unit in (1, 2) for cycle in range(1, 4 + unit)]
+            f.writestr(f'{name}_FD001.txt', '\n'.join(rows))
+        f.writestr('RUL_FD001.txt', '10\n20\n')
+
 # This allows the module to be executed directly
 def run_tests():
     unittest.main()
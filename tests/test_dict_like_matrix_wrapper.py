@@ -82,12 +82,43 @@ class TestDictLikeMatrixWrapper(unittest.TestCase):
         with self.assertRaises(ProgModelTypeError):
             DictLikeMatrixWrapper(['a', 'b'], [1, 2])
 
+    def test_vectorized(self):
+        c1 = DictLikeMatrixWrapper(['a', 'b'], {'a': np.array([1, 2, 3]), 'b': np.array([4, 5, 6])})
+        self.assertEqual(c1.matrix.shape, (2, 3))
+        self.assertEqual(c1.n_samples, 3)
+        self.assertListEqual(list(c1['a']), [1, 2, 3])
+        self.assertListEqual(list(c1['b']), [4, 5, 6])
+
+        # Setting by dict
+        c1['a'] = np.array([-1, -2, -3])
+        self.assertListEqual(list(c1.matrix[0]), [-1, -2, -3])
+
+        # Array of rows is flattened into matrix
+        c2 = DictLikeMatrixWrapper(['a', 'b'], np.array([[[1, 2, 3]], [[4, 5, 6]]]))
+        self.assertEqual(c2.matrix.shape, (2, 3))
+        self.assertListEqual(list(c2['b']), [4, 5, 6])
+
+        # Empty
+        c3 = DictLikeMatrixWrapper([], {})
+        self.assertEqual(c3.matrix.shape, (0, 1))
+
     def test_pickle(self):
         c1 = DictLikeMatrixWrapper(['a', 'b'], {'a': 1, 'b': 2})
         import pickle
         c2 = pickle.loads(pickle.dumps(c1))
         self.assertTrue((c2.matrix == np.array([[1], [2]])).all())
 
+    def test_shared_keys(self):
+        from prog_models.models import ThrownObject
+        m = ThrownObject()
+        x1 = m.StateContainer({'x': 1, 'v': 2})
+        x2 = m.StateContainer({'x': 3, 'v': 4})
+
+        # Changing keys returned does not change keys of other containers
+        x1.keys().append('a')
+        self.assertListEqual(x2.keys(), ['x', 'v'])
+        self.assertListEqual(m.StateContainer({'x': 1, 'v': 2}).keys(), ['x', 'v'])
+
 # This allows the module to be executed directly
 def run_tests():
     unittest.main()
@@ -0,0 +1,154 @@
+# Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
+
+import unittest
+import numpy as np
+
+from prog_models.exceptions import ProgModelInputException
+from prog_models.loading import PiecewiseConstant, PiecewiseLinear, Tabulated, Periodic, GaussianNoise
+from prog_models.models import BatteryCircuit, ThrownObject
+
+
+class TestLoading(unittest.TestCase):
+    def test_piecewise_constant(self):
+        m = BatteryCircuit()
+        load = PiecewiseConstant(m.InputContainer, [600, 900], {'i': [2, 1, 4]})
+        u = load(0)
+        self.assertIsInstance(u, m.InputContainer)
+        self.assertEqual(u['i'], 2)
+        self.assertEqual(load(599.9)['i'], 2)
+        self.assertEqual(load(600)['i'], 1)
+        self.assertEqual(load(1e6, m.initialize())['i'], 4)
+        np.testing.assert_array_equal(load.evaluate(np.array([0, 600, 700, 900])), [[2, 1, 1, 4]])
+
+        # Bad input
+        with self.assertRaises(ProgModelInputException):
+            PiecewiseConstant(m.InputContainer, [600, 900], {'i': [2, 1]})  # Too few values
+        with self.assertRaises(ProgModelInputException):
+            PiecewiseConstant(m.InputContainer, [600, 900], {'v': [2, 1, 4]})  # Missing input
+        with self.assertRaises(ProgModelInputException):
+            PiecewiseConstant(m.InputContainer, [900, 600], {'i': [2, 1, 4]})  # Not increasing
+
+    def test_piecewise_linear(self):
+        m = BatteryCircuit()
+        load = PiecewiseLinear(m.InputContainer, [0, 100], {'i': [0, 4]})
+        self.assertEqual(load(-1)['i'], 0)
+        self.assertEqual(load(50)['i'], 2)
+        self.assertEqual(load(200)['i'], 4)
+        with self.assertRaises(ProgModelInputException):
+            PiecewiseLinear(m.InputContainer, [], {'i': []})
+
+    def test_tabulated(self):
+        m = BatteryCircuit()
+        table = {'time': [0, 10, 20], 'i': [1, 3, 2], 'other': [0, 0, 0]}
+        load = Tabulated(m.InputContainer, table)
+        self.assertEqual(load(5)['i'], 2)
+        self.assertEqual(load(30)['i'], 2)
+        load = Tabulated(m.InputContainer, table, method = 'previous')
+        np.testing.assert_array_equal(load.evaluate(np.array([-1, 0, 5, 10, 25])), [[1, 1, 1, 3, 2]])
+
+        try:
+            import pandas as pd
+            load = Tabulated(m.InputContainer, pd.DataFrame(table))
+            self.assertEqual(load(15)['i'], 2.5)
+        except ImportError:
+            pass
+
+        with self.assertRaises(ProgModelInputException):
+            Tabulated(m.InputContainer, table, time_key = 't')
+        with self.assertRaises(ProgModelInputException):
+            Tabulated(m.InputContainer, {'time': [0], 'v': [1]})
+        with self.assertRaises(ProgModelInputException):
+            Tabulated(m.InputContainer, table, method = 'cubic')
+
+    def test_periodic(self):
+        m = BatteryCircuit()
+        load = Periodic(PiecewiseConstant(m.InputContainer, [10], {'i': [4, 1]}), 30)
+        np.testing.assert_array_equal(load.evaluate(np.array([0, 10, 29, 30, 45, 55])), [[4, 1, 1, 4, 1, 1]])
+        load = Periodic(PiecewiseConstant(m.InputContainer, [10], {'i': [4, 1]}), 30, t0 = 5)
+        self.assertEqual(load(0)['i'], 1)
+        self.assertEqual(load(5)['i'], 4)
+        with self.assertRaises(ProgModelInputException):
+            Periodic(load, 0)
+
+    def test_gaussian_noise(self):
+        m = BatteryCircuit()
+        base = PiecewiseConstant(m.InputContainer, [], {'i': [2]})
+        load = GaussianNoise(base, 0.1, rng = 42)
+        values = load.evaluate(np.zeros(10000))
+        self.assertAlmostEqual(np.mean(values), 2, delta = 0.01)
+        self.assertAlmostEqual(np.std(values), 0.1, delta = 0.01)
+
+        # Increasing with time
+        load = GaussianNoise(base, 0, std_slope = {'i': 1e-3}, rng = 42)
+        self.assertEqual(load(0)['i'], 2)
+        values = load.evaluate(np.full(10000, 100))
+        self.assertAlmostEqual(np.std(values), 0.1, delta = 0.01)
+
+        # Same seed, same loading
+        np.testing.assert_array_equal(
+            GaussianNoise(base, 0.1, rng = 1).evaluate(np.arange(10)),
+            GaussianNoise(base, 0.1, rng = 1).evaluate(np.arange(10)))
+
+    def test_simulation(self):
+        m = BatteryCircuit(process_noise = 0)
+        def future_loading(t, x = None):
+            if t < 600:
+                i = 2
+            elif t < 900:
+                i = 1
+            elif t < 1800:
+                i = 4
+            elif t < 3000:
+                i = 2
+            else:
+                i = 3
+            return m.InputContainer({'i': i})
+        profile = PiecewiseConstant(m.InputContainer, [600, 900, 1800, 3000], {'i': [2, 1, 4, 2, 3]})
+
+        # Same result as equivalent function, for step sizes that do not line up with changes
+        for dt in [2, 0.3, 1/3]:
+            result = m.simulate_to_threshold(future_loading, dt = dt, save_freq = 100)
+            result_profile = m.simulate_to_threshold(profile, dt = dt, save_freq = 100)
+            self.assertEqual(result.times, result_profile.times)
+            self.assertEqual([u['i'] for u in result.inputs], [u['i'] for u in result_profile.inputs])
+            np.testing.assert_array_almost_equal(result.states[-1].matrix, result_profile.states[-1].matrix)
+
+        # Variable step size (not chunked)
+        def next_time(t, x):
+            return 1 if t < 1000 else 2
+        result = m.simulate_to_threshold(future_loading, dt = next_time, save_freq = 100)
+        result_profile = m.simulate_to_threshold(profile, dt = next_time, save_freq = 100)
+        self.assertEqual(result.times, result_profile.times)
+
+        # Batch simulation
+        (times_of_event, results) = m.batch_simulate_to_threshold(profile, n_samples = 2, dt = 2, save_freq = 100)
+        result = m.simulate_to_threshold(future_loading, dt = 2, save_freq = 100)
+        self.assertAlmostEqual(times_of_event[0], result.times[-1])
+
+        # Chunked loading is exact for many steps
+        m = ThrownObject(process_noise = 0)
+        profile = PiecewiseConstant(m.InputContainer, [], {})
+        loading = profile.chunked(0.1)
+        t = 0
+        loading(t)
+        for _ in range(20000):
+            t = t + 0.05
+            loading(t)
+            t = t + 0.05
+        self.assertEqual(loading._times[loading._i - 1], t - 0.05)
+
+# This allows the module to be executed directly
+def run_tests():
+    unittest.main()
+
+def main():
+    l = unittest.TestLoader()
+    runner = unittest.TextTestRunner()
+    print("\n\nTesting Loading")
+    result = runner.run(l.loadTestsFromTestCase(TestLoading)).wasSuccessful()
+
+    if not result:
+        raise Exception("Failed test")
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,23 @@ class TestPowertrain(unittest.TestCase):
         (times, inputs, states, outputs, event_states) = powertrain.simulate_to(2, future_loading, dt=2e-5, save_freq=0.1)
         # Add additional tests
 
+    def test_dcmotor_next_state(self):
+        motor = DCMotor()
+        x = motor.initialize()
+        x0 = motor.StateContainer(x)
+        u = motor.InputContainer({'v_a': 1, 'v_b': 2, 'v_c': 3, 't_l': 0})
+
+        # next_state does not change x
+        x_next = motor.next_state(x, u, 1e-3)
+        self.assertEqual(x, x0)
+        self.assertNotEqual(x_next, x0)
+
+        # next_state_inplace writes into out
+        out = motor.StateContainer(x)
+        self.assertIs(motor.next_state_inplace(x, u, 1e-3, out), out)
+        self.assertEqual(out, x_next)
+        self.assertEqual(x, x0)
+
 # This allows the module to be executed directly
 def run_tests():
     unittest.main()
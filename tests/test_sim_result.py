@@ -1,8 +1,9 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
 import unittest
+import numpy as np
 
-from prog_models.sim_result import SimResult, LazySimResult
+from prog_models.sim_result import SimResult, LazySimResult, ColumnarSimResult
 
 
 class TestSimResult(unittest.TestCase):
@@ -35,8 +36,7 @@ class TestSimResult(unittest.TestCase):
         state = [{'a': i * 2.5, 'b': i * 5} for i in range(NUM_ELEMENTS)]
         result = SimResult(time, state)
         import pickle
-        pickle.dump(result, open('model_test.pkl', 'wb'))
-        result2 = pickle.load(open('model_test.pkl', 'rb'))
+        result2 = pickle.loads(pickle.dumps(result))  # In memory- no file left behind
         self.assertEqual(result, result2)
 
     def test_extend(self):
@@ -96,8 +96,7 @@ class TestSimResult(unittest.TestCase):
         self.assertNotEqual(sim_result, converted_lazy_result) # converted is not the same as the original SimResult
 
         import pickle # try pickle'ing
-        pickle.dump(lazy_result, open('model_test.pkl', 'wb'))
-        pickle_converted_result = pickle.load(open('model_test.pkl', 'rb'))
+        pickle_converted_result = pickle.loads(pickle.dumps(lazy_result))  # In memory- no file left behind
         self.assertEqual(converted_lazy_result, pickle_converted_result)
     
     def test_index(self):
@@ -537,7 +536,116 @@ class TestSimResult(unittest.TestCase):
         states = [{'a': i*(i%2), 'b': i*(i%2)} for i in range(NUM_ELEMENTS)]
         result = SimResult(time, states)
         self.assertDictEqual(result.monotonicity(), {'a': 0.0, 'b': 0.0})
-        
+
+    def test_to_numpy(self):
+        NUM_ELEMENTS = 5
+        time = list(range(NUM_ELEMENTS))
+        state = [{'a': i * 2.5, 'b': i * 5} for i in range(NUM_ELEMENTS)]
+        result = SimResult(time, state)
+        arr = result.to_numpy()
+        self.assertEqual(arr.shape, (NUM_ELEMENTS, 2))
+        self.assertListEqual(list(arr[:, 0]), [i * 2.5 for i in range(NUM_ELEMENTS)])
+        self.assertListEqual(list(result.to_numpy('b')), [i * 5 for i in range(NUM_ELEMENTS)])
+        arr = result.to_numpy(['b', 'a'])
+        self.assertListEqual(list(arr[1]), [5, 2.5])
+        self.assertEqual(SimResult().to_numpy().size, 0)
+
+    def test_columnar(self):
+        NUM_ELEMENTS = 5
+        time = list(range(NUM_ELEMENTS))
+        state = [{'a': i * 2.5, 'b': i * 5} for i in range(NUM_ELEMENTS)]
+        result = ColumnarSimResult(['a', 'b'], time, state, capacity = 2)  # Small capacity to test growth
+        self.assertEqual(len(result), NUM_ELEMENTS)
+        self.assertListEqual(result.times, time)
+        self.assertEqual(result, SimResult(time, state))
+        for i in range(NUM_ELEMENTS):
+            self.assertEqual(result.time(i), time[i])
+            self.assertEqual(result[i], state[i])
+            self.assertEqual(result[i]['a'], state[i]['a'])
+        self.assertEqual(result[-1], state[-1])
+        with self.assertRaises(IndexError):
+            result[NUM_ELEMENTS]
+
+        # Array access
+        self.assertTrue(np.array_equal(result.to_numpy(), SimResult(time, state).to_numpy()))
+        self.assertListEqual(list(result.to_numpy('b')), [i * 5 for i in range(NUM_ELEMENTS)])
+        self.assertListEqual(list(result.to_numpy(['b', 'a'])[1]), [5, 2.5])
+        self.assertListEqual(list(result.times_to_numpy()), time)
+
+        # Recorded values are copied
+        x = {'a': 1, 'b': 2}
+        result.record(5, x)
+        x['a'] = 10
+        self.assertEqual(result[-1]['a'], 1)
+
+        # Data are views into array
+        result[0]['a'] = -1
+        self.assertEqual(result.to_numpy('a')[0], -1)
+
+        # Modifying converts to lists
+        result.pop()
+        self.assertEqual(result, SimResult(time, [{'a': -1, 'b': 0}] + state[1:]))
+        result.record(5, {'a': 1, 'b': 2})
+        self.assertEqual(len(result), NUM_ELEMENTS + 1)
+        self.assertEqual(result.to_numpy().shape, (NUM_ELEMENTS + 1, 2))
+        result.clear()
+        self.assertEqual(len(result), 0)
+        self.assertListEqual(result.times, [])
+
+        # Vectorized
+        result = ColumnarSimResult(['a'], [0, 1], [{'a': np.array([1, 2, 3])}, {'a': np.array([4, 5, 6])}])
+        self.assertEqual(result.to_numpy().shape, (2, 1, 3))
+        self.assertListEqual(list(result[1]['a']), [4, 5, 6])
+
+        # Pickle (as SimResult)
+        import pickle
+        result2 = pickle.loads(pickle.dumps(result))
+        self.assertIsInstance(result2, SimResult)
+        self.assertListEqual(result2.times, [0, 1])
+
+    def test_columnar_extend(self):
+        time = [0, 1, 2]
+        state = [{'a': i * 2.5, 'b': i * 5} for i in range(3)]
+        time2 = [3, 4]
+        state2 = [{'a': i * 2.5, 'b': i * 5} for i in range(3, 5)]
+
+        # SimResult extended by ColumnarSimResult
+        result = SimResult(time, state)
+        result.extend(ColumnarSimResult(['a', 'b'], time2, state2))
+        self.assertEqual(result, SimResult(time + time2, state + state2))
+        self.assertIsInstance(result.times, list)
+
+        # ColumnarSimResult extended by SimResult
+        result = ColumnarSimResult(['a', 'b'], time, state)
+        result.extend(SimResult(time2, state2))
+        self.assertEqual(result, SimResult(time + time2, state + state2))
+        self.assertListEqual(list(result.to_numpy('b')), [0, 5, 10, 15, 20])
+
+        # ColumnarSimResult extended by ColumnarSimResult
+        result = ColumnarSimResult(['a', 'b'], time, state)
+        result.extend(ColumnarSimResult(['a', 'b'], time2, state2))
+        self.assertEqual(result, SimResult(time + time2, state + state2))
+
+        with self.assertRaises(ValueError):
+            SimResult(time, state).extend(state2)
+
+    def test_columnar_simulation(self):
+        from prog_models.models import BatteryCircuit
+        m = BatteryCircuit(process_noise = 0)
+        def future_loading(t, x = None):
+            return m.InputContainer({'i': 2})
+        config = {'dt': 1, 'save_freq': 5}
+        result = m.simulate_to_threshold(future_loading, **config)
+        result_col = m.simulate_to_threshold(future_loading, columnar_results = True, **config)
+        self.assertIsInstance(result_col.states, ColumnarSimResult)
+        self.assertListEqual(result.times, result_col.times)
+        self.assertEqual(result.states, result_col.states)
+        self.assertEqual(result.inputs, result_col.inputs)
+        self.assertEqual(result.outputs, result_col.outputs)
+        self.assertEqual(result.event_states, result_col.event_states)
+        self.assertTrue(np.array_equal(result.states.to_numpy(), result_col.states.to_numpy()))
+        self.assertEqual(result_col.outputs.to_numpy('v').shape, (len(result.times), ))
+
 # This allows the module to be executed directly
 def run_tests():
     unittest.main()
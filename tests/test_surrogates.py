@@ -1,5 +1,6 @@
 # Copyright © 2021 United States Government as represented by the Administrator of the National Aeronautics and Space Administration.  All Rights Reserved.
 
+import numpy as np
 import unittest
 import warnings
 
@@ -7,6 +8,11 @@ from prog_models.models import *
 from prog_models.exceptions import ProgModelInputException
 
 
+def load_empty(t = None, x = None):
+    # Defined at module level so it can be sent to worker processes
+    return {}
+
+
 class TestSurrogate(unittest.TestCase):
     def test_surrogate_improper_input(self):
         m = ThrownObject()
@@ -281,6 +287,104 @@ class TestSurrogate(unittest.TestCase):
         # Reset Warnings
         warnings.filterwarnings("default")
 
+    def test_surrogate_parallel(self):
+        m = ThrownObject()
+        surrogate = m.generate_surrogate([load_empty, load_empty], dt = 0.1, save_freq = 0.25, threshold_keys = 'impact', trim_data_to = 0.8)
+        surrogate_parallel = m.generate_surrogate([load_empty, load_empty], dt = 0.1, save_freq = 0.25, threshold_keys = 'impact', trim_data_to = 0.8, workers = 2)
+        np.testing.assert_array_almost_equal(surrogate_parallel.A, surrogate.A)
+        np.testing.assert_array_almost_equal(surrogate_parallel.E, surrogate.E)
+
+        with self.assertRaises(ProgModelInputException):
+            m.generate_surrogate([load_empty], workers = 0)
+
+    def test_surrogate_reduced_rank(self):
+        m = ThrownObject(process_noise = 0)
+        options = {'dt': 0.1, 'save_freq': 0.25, 'threshold_keys': 'impact'}
+        surrogate = m.generate_surrogate([load_empty], **options)
+        surrogate_reduced = m.generate_surrogate([load_empty], svd_rank = 3, **options)
+        self.assertIsNone(surrogate.basis)
+        self.assertEqual(surrogate_reduced.basis.shape, (5, 3))
+        self.assertEqual(surrogate_reduced.A_reduced.shape, (3, 3))
+        np.testing.assert_array_almost_equal(np.dot(surrogate_reduced.projection, surrogate_reduced.basis), np.eye(3))
+        np.testing.assert_array_almost_equal(surrogate_reduced.A, np.dot(surrogate_reduced.basis, np.dot(surrogate_reduced.A_reduced, surrogate_reduced.projection)))
+
+        # Energy threshold
+        self.assertEqual(m.generate_surrogate([load_empty], svd_energy = 0.999, **options).basis.shape, (5, 3))
+        self.assertEqual(m.generate_surrogate([load_empty], svd_energy = 0.999, svd_rank = 1, **options).basis.shape, (5, 1))
+
+        # Simulated in reduced coordinates, states are full at saved points
+        def future_load(t, x = None):
+            return surrogate.InputContainer({})
+        result = surrogate.simulate_to_threshold(future_load, threshold_keys = 'impact')
+        result_reduced = surrogate_reduced.simulate_to_threshold(future_load, threshold_keys = 'impact')
+        self.assertAlmostEqual(result_reduced.times[-1], result.times[-1])
+        self.assertEqual(list(result_reduced.states[-1].keys()), list(result.states[-1].keys()))
+        self.assertAlmostEqual(result_reduced.states[-1]['v'], result.states[-1]['v'], delta = 0.5)
+        x = surrogate_reduced.initialize()
+        np.testing.assert_array_almost_equal(surrogate_reduced.next_state(x, future_load(0), 0.25).matrix, np.dot(surrogate_reduced.A, x.matrix))
+
+        # Process noise (projected onto the modes)
+        surrogate_reduced.parameters['process_noise'] = 0.1
+        result_noise = surrogate_reduced.simulate_to_threshold(future_load, threshold_keys = 'impact', rng = 1)
+        result_noise2 = surrogate_reduced.simulate_to_threshold(future_load, threshold_keys = 'impact', rng = 1)
+        self.assertEqual(result_noise.times, result_noise2.times)
+        self.assertEqual(result_noise.states[-1]['x'], result_noise2.states[-1]['x'])
+
+        with self.assertRaises(ProgModelInputException):
+            m.generate_surrogate([load_empty], svd_rank = 0, **options)
+        with self.assertRaises(ProgModelInputException):
+            m.generate_surrogate([load_empty], svd_energy = 1.5, **options)
+
+    def test_surrogate_update(self):
+        m = BatteryCircuit(process_noise = 0)
+        def load_1(t, x = None):
+            return m.InputContainer({'i': 2 if t < 1000 else 3})
+        def load_2(t, x = None):
+            return m.InputContainer({'i': 4 if t < 501 else 1})
+        options = {'dt': 0.5, 'save_freq': 2, 'trim_data_to': 0.8}
+
+        # Same as generating with all loading functions at once
+        surrogate = m.generate_surrogate([load_1, load_2], **options)
+        surrogate_updated = m.generate_surrogate([load_1], **options)
+        self.assertEqual(surrogate_updated.training_data.shape, surrogate.training_data.shape)
+        surrogate_updated.update([load_2])
+        np.testing.assert_array_almost_equal(surrogate_updated.A, surrogate.A)
+        np.testing.assert_array_almost_equal(surrogate_updated.B, surrogate.B)
+        self.assertEqual(surrogate_updated.training_data.shape, surrogate.training_data.shape)  # Memory does not grow with data
+
+        # Reduced-rank
+        surrogate = m.generate_surrogate([load_1, load_2], svd_rank = 3, **options)
+        surrogate_updated = m.generate_surrogate([load_1], svd_rank = 3, **options)
+        surrogate_updated.update([load_2])
+        np.testing.assert_array_almost_equal(surrogate_updated.A_reduced, surrogate.A_reduced)
+        result = surrogate.simulate_to_threshold(load_1, save_freq = 100, horizon = 5000)
+        result_updated = surrogate_updated.simulate_to_threshold(load_1, save_freq = 100, horizon = 5000)
+        self.assertAlmostEqual(result_updated.times[-1], result.times[-1])
+
+        # Data (e.g., measured), same as simulated for load_2
+        surrogate = m.generate_surrogate([load_1], dt = 0.5, save_freq = 2)
+        surrogate.update([load_2])
+        surrogate_updated = m.generate_surrogate([load_1], dt = 0.5, save_freq = 2)
+        result = m.simulate_to_threshold(load_2, dt = 0.5, save_freq = 2)
+        (times, states) = (list(result.times), list(result.states))
+        if times[-1] % 2 != 0:
+            # Last time is not a multiple of the surrogate time step
+            (times, states) = (times[:-1], states[:-1])
+        states = [{**x, **m.output(x), **m.event_state(x)} for x in states]
+        surrogate_updated.update_data(states, [load_2(t + 1) for t in times[:-1]])
+        np.testing.assert_array_almost_equal(surrogate_updated.A, surrogate.A)
+        np.testing.assert_array_almost_equal(surrogate_updated.B, surrogate.B)
+
+        # Bad input
+        with self.assertRaises(ProgModelInputException):
+            surrogate.update([load_2], save_freq = 1)
+        with self.assertRaises(ProgModelInputException):
+            surrogate.update([load_2], trim_data_to = 2)
+        with self.assertRaises(ProgModelInputException):
+            surrogate.update_data(states[:1], [])
+        with self.assertRaises(ProgModelInputException):
+            surrogate.update_data(states, [])
+
     def test_surrogate_use_error_cases(self):
         m = ThrownObject()
         def load_eqn(t = None, x = None):